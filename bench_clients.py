@@ -0,0 +1,106 @@
+"""
+Benchmark client-side overhead against the local fake stack
+
+Runs DataKwipAPIClient and DataKwipMCPClient operations against stand-in
+servers in a child process (no Railway), and reports throughput and peak
+Python memory of the client per operation and page size. With --latency-ms 0
+the numbers are dominated by client work: request building, HTTP handling
+and JSON decoding.
+
+Usage:
+    python bench_clients.py
+    python bench_clients.py --entities 100000 --limits 10 1000 10000 --iterations 50
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+
+from clients import DataKwipAPIClient, DataKwipMCPClient
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+
+
+def bench(name: str, operation: Callable[[], object], iterations: int):
+    """Run an operation repeatedly and print throughput and peak memory.
+
+    Throughput is timed without tracemalloc; a shorter second pass measures
+    peak allocation, since tracing slows Python code down considerably.
+    """
+    operation()  # Warm-up (token fetch, connection setup)
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        operation()
+    duration = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    for _ in range(min(iterations, 5)):
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<40} {iterations / duration:>9.1f} ops/s "
+        f"{duration / iterations * 1000:>9.2f} ms/op {peak / 1024:>10.0f} KiB peak"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark clients against the fake stack")
+    parser.add_argument("--entities", type=int, default=10_000, help="Entities per organization")
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100, 1000], help="Page sizes")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per operation")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Injected server latency")
+    args = parser.parse_args()
+
+    stack_config = FakeStackConfig(entities_per_org=args.entities, latency_ms=args.latency_ms)
+
+    with FakeStackProcess(stack_config) as stack:
+        settings = stack.settings()
+        api_client = DataKwipAPIClient(
+            base_url=settings["railway_api_url"],
+            token_url=settings["oauth2_token_url"],
+            client_id=settings["functional_tests_client_id"],
+            client_secret=settings["functional_tests_client_secret"],
+            username=settings["functional_test_user_email"],
+            password=settings["functional_test_user_password"],
+        )
+        mcp_client = DataKwipMCPClient(base_url=settings["railway_mcp_url"])
+
+        print(f"Fake stack: {args.entities} entities/org, {args.latency_ms}ms injected latency\n")
+
+        with api_client, mcp_client:
+            bench("api.get_database_health", api_client.get_database_health, args.iterations)
+            bench("mcp.list_tools", mcp_client.list_tools, args.iterations)
+
+            limits: List[int] = args.limits
+            for limit in limits:
+                bench(
+                    f"api.list_entities(limit={limit})",
+                    lambda: api_client.list_entities(org_id=1, limit=limit),
+                    args.iterations,
+                )
+                bench(
+                    f"api.list_entity_tags(limit={limit})",
+                    lambda: api_client.list_entity_tags(org_id=1, limit=limit),
+                    args.iterations,
+                )
+                bench(
+                    f"mcp.query_entities(limit={limit})",
+                    lambda: mcp_client.query_entities(org_id=1, limit=limit),
+                    args.iterations,
+                )
+
+            entity_ids = list(range(1, 101))
+            bench(
+                "mcp.get_current_values(100 ids)",
+                lambda: mcp_client.get_current_values(entity_ids=entity_ids, org_id=1),
+                args.iterations,
+            )
+
+    print(f"\nServer requests: {stack.request_counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark data freshness: TimescaleDB write to API/MCP visibility
+
+Writes marker time-series points straight into TimescaleDB (DATABASE_URL,
+one committed INSERT per marker), then polls MCP get_current_values and the
+API /entityvalue endpoint concurrently with adaptive backoff until each
+serves the marker as the entity's current value. Prints the lag of every
+marker and the write-to-visible lag distribution per source; markers are
+deleted afterwards unless --keep-markers is given.
+
+A source that fails on its first read (e.g. an API without /entityvalue)
+is reported and left out. With --fake-stack the local stand-in servers are
+used, and written points become visible after --ingest-lag-ms.
+
+Usage:
+    python bench_freshness.py
+    python bench_freshness.py --samples 50 --interval 10 --max-p95 30
+    python bench_freshness.py --fake-stack --ingest-lag-ms 500 --samples 10
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from clients import DataKwipAPIClient, DataKwipMCPClient, TransportFactory
+from fixtures.fake_stack import FakeStack, FakeStackConfig
+from fixtures.freshness import DatabaseMarkerWriter, FreshnessProbe, FreshnessSample, MarkerPoint
+
+# Load environment
+load_dotenv()
+
+SOURCES = ["mcp", "api"]
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "railway_api_url",
+        "railway_mcp_url",
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+        "database_url",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def print_sample(number: int, results: Dict[str, FreshnessSample]):
+    parts = []
+    for name, sample in results.items():
+        if sample.visible:
+            parts.append(f"{name} {sample.lag * 1000:>7.0f}ms ({sample.polls} polls)")
+        else:
+            parts.append(f"{name} {'timeout':>9} ({sample.polls} polls, {sample.errors} errors)")
+    print(f"  #{number:<4} " + "   ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DB write to API/MCP visibility lag")
+    parser.add_argument("--samples", type=int, default=10, help="Markers to write")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between marker writes")
+    parser.add_argument(
+        "--timeout", type=float, default=120.0, help="Seconds to wait for a marker per source"
+    )
+    parser.add_argument(
+        "--sources", nargs="+", choices=SOURCES, default=SOURCES, help="Sources to poll"
+    )
+    parser.add_argument("--org-id", type=int, default=int(os.getenv("TEST_ORG_ID", "1")))
+    parser.add_argument(
+        "--entity-id",
+        type=int,
+        help="Entity to write markers to (default: first entity of the org)",
+    )
+    parser.add_argument(
+        "--max-p95", type=float, help="Fail if a source's p95 lag exceeds this many seconds"
+    )
+    parser.add_argument(
+        "--keep-markers", action="store_true", help="Leave marker rows in the database"
+    )
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    parser.add_argument("--ingest-lag-ms", type=float, default=250.0, help="Fake stack ingest lag")
+    parser.add_argument(
+        "--ingest-jitter-ms",
+        type=float,
+        default=250.0,
+        help="Fake stack extra ingest lag (0..jitter)",
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                # In-process, so markers can be written into the fake dataset
+                fake_stack = stack.enter_context(
+                    FakeStack(
+                        FakeStackConfig(
+                            ingest_lag_ms=args.ingest_lag_ms,
+                            ingest_jitter_ms=args.ingest_jitter_ms,
+                        )
+                    )
+                )
+                settings = fake_stack.settings()
+                dataset = fake_stack.dataset
+
+                def write(marker: MarkerPoint):
+                    dataset.write_value(
+                        marker.entity_id, marker.timestamp, marker.value, marker.unit
+                    )
+
+            else:
+                settings = env_settings()
+                write = stack.enter_context(
+                    DatabaseMarkerWriter(settings["database_url"], cleanup=not args.keep_markers)
+                )
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        transport_factory = TransportFactory()
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=settings["railway_api_url"],
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                transport_factory=transport_factory,
+            )
+        )
+        mcp_client = stack.enter_context(
+            DataKwipMCPClient(
+                base_url=settings["railway_mcp_url"],
+                transport_factory=transport_factory,
+            )
+        )
+
+        entity_id = args.entity_id
+        if entity_id is None:
+            try:
+                entities = api_client.list_entities(org_id=args.org_id, limit=1)
+            except Exception as e:
+                print(f"ERROR: could not list entities: {e}")
+                sys.exit(1)
+            if not entities:
+                print(f"ERROR: organization {args.org_id} has no entities (use --entity-id)")
+                sys.exit(1)
+            entity_id = entities[0]["id"]
+
+        sources = {
+            "mcp": lambda m: mcp_client.get_current_values([m.entity_id], org_id=m.org_id),
+            "api": lambda m: api_client.get_current_values([m.entity_id], org_id=m.org_id),
+        }
+        probe = stack.enter_context(
+            FreshnessProbe(
+                write,
+                {name: sources[name] for name in args.sources},
+                entity_id=entity_id,
+                org_id=args.org_id,
+                timeout=args.timeout,
+            )
+        )
+
+        print("=" * 70)
+        print(
+            f"Data freshness: {args.samples} markers on entity {entity_id} (org {args.org_id}), "
+            f"every {args.interval:g}s"
+        )
+        print("=" * 70)
+
+        # Warm-up doubles as the availability check (token fetch, connection setup)
+        for name, error in probe.drop_unavailable().items():
+            print(f"✗ {name}: unavailable, left out ({error})")
+        if not probe.sources:
+            print("ERROR: no source to poll")
+            sys.exit(1)
+        print(f"Polling: {', '.join(probe.sources)}\n")
+
+        try:
+            probe.run(args.samples, interval=args.interval, on_sample=print_sample)
+        except KeyboardInterrupt:
+            print("\nInterrupted")
+
+    print("\n" + "=" * 70)
+    print("Write-to-visible lag")
+    print("=" * 70)
+    print(probe.report())
+
+    failed = False
+    for name in probe.sources:
+        timeouts = probe.timeouts(name)
+        if timeouts:
+            print(f"✗ {name}: {timeouts} markers not visible within {args.timeout:g}s")
+            failed = True
+        p95 = probe.summary(name).p95 / 1000
+        if args.max_p95 is not None and p95 > args.max_p95:
+            print(f"✗ {name}: p95 lag {p95:.1f}s > {args.max_p95:g}s")
+            failed = True
+    if failed:
+        sys.exit(1)
+    print("✓ All markers visible")
+
+
+if __name__ == "__main__":
+    main()
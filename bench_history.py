@@ -0,0 +1,166 @@
+"""
+Inspect the benchmark history and check runs for latency regressions
+
+The test suite records every run in the SQLite file named by BENCHMARK_DB
+(per-operation latency histograms with git SHA, environment and dataset size).
+This script lists runs, shows an operation's trend, records merged xdist
+results, and checks a run's p95 against the recent baseline.
+
+Usage:
+    python bench_history.py runs
+    python bench_history.py show 42
+    python bench_history.py trend list_entities
+    python bench_history.py check              # latest run; exit 1 on regression
+    python bench_history.py record latency-results --environment railway --dataset-size 100000
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from fixtures.history import BenchmarkHistory
+from fixtures.latency import LatencyRecorder
+
+# Load environment
+load_dotenv()
+
+DEFAULT_WATCH = ["list_entities", "query_entities", "ui_login"]
+
+
+def print_runs(history: BenchmarkHistory, limit: int):
+    print(f"{'Run':>5}  {'Recorded (UTC)':<20} {'Commit':<10} {'Environment':<32} {'Dataset':>9}")
+    print("-" * 80)
+    for run in history.runs(limit=limit):
+        sha = (run.git_sha or "-")[:8] + ("*" if run.git_dirty else "")
+        dataset = run.dataset_size if run.dataset_size is not None else "-"
+        print(
+            f"{run.id:>5}  {run.recorded_at[:19]:<20} {sha:<10} {run.environment:<32} {dataset:>9}"
+        )
+
+
+def print_run(history: BenchmarkHistory, run_id: int):
+    run = history.get_run(run_id)
+    if run is None:
+        print(f"ERROR: Run {run_id} not found")
+        sys.exit(1)
+
+    print(
+        f"Run {run.id}: {run.recorded_at} {run.git_sha or 'unknown commit'}"
+        f"{' (dirty)' if run.git_dirty else ''}"
+    )
+    print(f"Environment: {run.environment}, dataset size: {run.dataset_size}\n")
+    print(f"{'Operation':<28} {'n':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    print("-" * 76)
+    for operation, s in history.operation_summaries(run_id).items():
+        print(
+            f"{operation:<28} {s.count:>6} {s.p50:>7.1f}ms {s.p95:>7.1f}ms "
+            f"{s.p99:>7.1f}ms {s.max:>7.1f}ms"
+        )
+
+
+def print_trend(history: BenchmarkHistory, operation: str, limit: int):
+    rows = history.trend(operation, limit=limit)
+    if not rows:
+        print(f"No runs recorded for {operation}")
+        return
+
+    print(f"{'Run':>5}  {'Commit':<10} {'Environment':<32} {'p50':>9} {'p95':>9} {'p99':>9}")
+    print("-" * 82)
+    for row in rows:
+        print(
+            f"{row['id']:>5}  {(row['git_sha'] or '-')[:8]:<10} {row['environment']:<32} "
+            f"{row['p50_ms']:>7.1f}ms {row['p95_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms"
+        )
+
+
+def check_run(history: BenchmarkHistory, run_id: int, args) -> bool:
+    regressions = history.detect_regressions(
+        run_id,
+        args.operations,
+        window=args.window,
+        min_runs=args.min_runs,
+        threshold=args.threshold,
+    )
+    for operation in args.operations:
+        baseline = history.baseline_p95(run_id, operation, args.window)
+        print(f"  {operation}: {len(baseline)} baseline runs")
+
+    if regressions:
+        for regression in regressions:
+            print(f"✗ {regression}")
+        return False
+
+    print(f"✓ No p95 regressions in run {run_id}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark history and regression checks")
+    parser.add_argument(
+        "--db", default=os.getenv("BENCHMARK_DB", "benchmarks.sqlite"), help="SQLite file"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = subparsers.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    show_parser = subparsers.add_parser("show", help="Percentiles of one run")
+    show_parser.add_argument("run_id", type=int)
+
+    trend_parser = subparsers.add_parser("trend", help="Percentiles of an operation over runs")
+    trend_parser.add_argument("operation")
+    trend_parser.add_argument("--limit", type=int, default=20)
+
+    check_parser = subparsers.add_parser("check", help="Check a run for p95 regressions")
+    check_parser.add_argument("run_id", type=int, nargs="?", help="Run to check (default: latest)")
+
+    record_parser = subparsers.add_parser("record", help="Record merged LATENCY_RESULTS_DIR files")
+    record_parser.add_argument("directory", help="Directory of per-worker latency JSON files")
+    record_parser.add_argument("--environment", required=True)
+    record_parser.add_argument("--dataset-size", type=int)
+
+    for sub in (check_parser, record_parser):
+        sub.add_argument("--operations", nargs="+", default=DEFAULT_WATCH)
+        sub.add_argument("--window", type=int, default=10, help="Baseline runs")
+        sub.add_argument("--min-runs", type=int, default=5, help="Minimum baseline runs")
+        sub.add_argument(
+            "--threshold", type=float, default=0.2, help="Minimum relative p95 increase"
+        )
+
+    args = parser.parse_args()
+
+    with BenchmarkHistory(args.db) as history:
+        if args.command == "runs":
+            print_runs(history, args.limit)
+
+        elif args.command == "show":
+            print_run(history, args.run_id)
+
+        elif args.command == "trend":
+            print_trend(history, args.operation, args.limit)
+
+        elif args.command == "check":
+            run_id = args.run_id or history.latest_run_id()
+            if run_id is None:
+                print("ERROR: No runs recorded")
+                sys.exit(1)
+            if not check_run(history, run_id, args):
+                sys.exit(1)
+
+        elif args.command == "record":
+            recorder = LatencyRecorder.load_dir(args.directory)
+            if not recorder.histograms:
+                print(f"ERROR: No latency results in {args.directory}")
+                sys.exit(1)
+            run_id = history.record_run(
+                recorder, environment=args.environment, dataset_size=args.dataset_size
+            )
+            print(f"✓ Run {run_id} recorded ({len(recorder.histograms)} operations)")
+            if not check_run(history, run_id, args):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark start-up (import) time of scripts and marker subsets
+
+Each measurement runs in a fresh interpreter: importing a client from the
+clients package the way a one-off script does, and pytest collection for
+each marker subset (`pytest --collect-only -m <marker>`). Every case is run
+twice: as is ("lazy") and with Playwright and python-keycloak imported up
+front ("eager"), which is what `import clients` used to cost before the
+package loaded its submodules on demand. The difference is the start-up
+time saved; the last column lists the heavy libraries actually loaded.
+Playwright and python-keycloak still load when a browser or admin client
+starts, so only runs and scripts that never start one avoid them entirely.
+
+Usage:
+    python bench_imports.py
+    python bench_imports.py --repeat 10 --markers api mcp
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).parent
+
+# Libraries whose import dominates start-up
+HEAVY_MODULES = ["playwright", "keycloak", "requests", "httpx", "psycopg2"]
+
+EAGER_PRELUDE = "import playwright.sync_api, keycloak\n"
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{prelude}{body}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+SCRIPT_CASES = {
+    "import clients": "import clients",
+    "API client (script)": "from clients import DataKwipAPIClient",
+    "Keycloak client (debug_realm.py)": "from clients import KeycloakAdminClient",
+}
+
+
+def pytest_case(marker: str) -> str:
+    args = ["--collect-only", "-q", "-p", "no:cacheprovider"]
+    if marker != "all":
+        args += ["-m", marker]
+    return (
+        "import contextlib, io, pytest\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    pytest.main({args!r})"
+    )
+
+
+def measure(body: str, eager: bool, repeat: int) -> Dict:
+    """Median start-up seconds of `body` in fresh interpreters, plus heavy modules loaded."""
+    code = PROBE.format(prelude=EAGER_PRELUDE if eager else "", body=body, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import-time start-up cost")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case (median is reported)")
+    parser.add_argument(
+        "--markers",
+        nargs="+",
+        default=["api", "mcp", "auth", "ui", "integration", "all"],
+        help="Marker subsets to collect ('all' = no -m filter)",
+    )
+    args = parser.parse_args()
+
+    cases: Dict[str, str] = dict(SCRIPT_CASES)
+    for marker in args.markers:
+        cases[f"pytest -m {marker}" if marker != "all" else "pytest (all)"] = pytest_case(marker)
+
+    # Warm the bytecode cache so the first case is not penalised
+    measure(pytest_case("all"), eager=True, repeat=1)
+
+    print("=" * 70)
+    print(f"Start-up time, median of {args.repeat} fresh interpreters")
+    print("=" * 70)
+    print(f"{'Case':<34} {'lazy':>8} {'eager':>8} {'saved':>8}  loaded (lazy)")
+
+    rows: List[Dict] = []
+    for name, body in cases.items():
+        lazy = measure(body, eager=False, repeat=args.repeat)
+        eager = measure(body, eager=True, repeat=args.repeat)
+        saved = eager["seconds"] - lazy["seconds"]
+        rows.append({"case": name, "lazy": lazy["seconds"], "eager": eager["seconds"]})
+        print(
+            f"{name:<34} {lazy['seconds'] * 1000:>6.0f}ms {eager['seconds'] * 1000:>6.0f}ms "
+            f"{saved * 1000:>6.0f}ms  {', '.join(lazy['loaded']) or '-'}"
+        )
+
+    total_saved = sum(row["eager"] - row["lazy"] for row in rows)
+    print("=" * 70)
+    print(f"✓ {total_saved * 1000:.0f}ms saved across {len(rows)} cases")
+
+
+if __name__ == "__main__":
+    main()
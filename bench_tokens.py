@@ -0,0 +1,158 @@
+"""
+Benchmark Keycloak token endpoint throughput per grant type
+
+Drives the realm token endpoint with the password, client_credentials and
+refresh_token grants in a closed loop at increasing concurrency (each worker
+sends its next request as soon as the previous one returns) and reports
+tokens per second, latency percentiles and error rates per level, plus each
+grant's peak throughput. Use it to size Keycloak and to pick the cheapest
+grant for service-to-service traffic.
+
+Every password and client_credentials request creates a Keycloak session;
+run large benchmarks against a non-production realm. A grant the realm
+rejects on its first request (e.g. client_credentials without a service
+account) is reported and left out. With --fake-stack the local stand-in
+Keycloak is used instead.
+
+Usage:
+    python bench_tokens.py
+    python bench_tokens.py --levels 1 2 4 8 16 32 64 --duration 20 --stop-error-rate 0.05
+    python bench_tokens.py --grants client_credentials refresh_token
+    python bench_tokens.py --fake-stack --latency-ms 20
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from clients import PoolConfig, TransportFactory
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+from fixtures.token_bench import GRANTS, LevelResult, TokenEndpointBenchmark, format_report
+
+# Load environment
+load_dotenv()
+
+# Same scope as DataKwipAPIClient's password grant
+SCOPE = "openid profile email datakwip:entity:list datakwip:entity:tag:list"
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def print_level(result: LevelResult):
+    status = "✓" if not result.errors else "✗"
+    print(
+        f"  {status} {result.grant:<19} x{result.concurrency:<4} "
+        f"{result.throughput:>8.1f} tokens/s  "
+        f"p95 {result.latency.p95:>6.0f}ms  {result.error_rate:>6.1%} errors"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Keycloak token endpoint throughput")
+    parser.add_argument("--grants", nargs="+", choices=GRANTS, default=GRANTS, help="Grant types")
+    parser.add_argument(
+        "--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Concurrency levels"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per grant and level")
+    parser.add_argument(
+        "--stop-error-rate",
+        type=float,
+        default=0.2,
+        help="Skip a grant's higher levels once a level exceeds this error rate",
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.01, help="Error rate allowed at peak throughput"
+    )
+    parser.add_argument("--scope", default=SCOPE, help="Requested scope")
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake stack injected latency")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                config = FakeStackConfig(latency_ms=args.latency_ms)
+                settings = stack.enter_context(FakeStackProcess(config)).settings()
+            else:
+                settings = env_settings()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        # Keep-alive for every worker, so connection setup stays out of the numbers
+        pool_size = max(args.levels)
+        transport_factory = TransportFactory(
+            PoolConfig(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        bench = stack.enter_context(
+            TokenEndpointBenchmark(
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                scope=args.scope,
+                transport_factory=transport_factory,
+            )
+        )
+
+        print("=" * 70)
+        print(f"Token endpoint: {settings['oauth2_token_url']}")
+        levels = ", ".join(map(str, sorted(args.levels)))
+        print(
+            f"Grants: {', '.join(args.grants)}; concurrency {levels}; "
+            f"{args.duration:g}s per level"
+        )
+        print("=" * 70)
+
+        grants = list(args.grants)
+        for grant, error in bench.unavailable(grants).items():
+            print(f"✗ {grant}: rejected, left out ({error})")
+            grants.remove(grant)
+        if not grants:
+            print("ERROR: no grant type accepted by the realm")
+            sys.exit(1)
+
+        try:
+            results = bench.run(
+                grants,
+                args.levels,
+                args.duration,
+                stop_error_rate=args.stop_error_rate,
+                on_result=print_level,
+            )
+        except KeyboardInterrupt:
+            print("\nInterrupted")
+            sys.exit(1)
+
+    print("\n" + format_report(results, max_error_rate=args.max_error_rate))
+    print("=" * 70)
+
+    samples = [sample for r in results for sample in r.error_samples]
+    if samples:
+        print("Errors:")
+        for sample in samples[:10]:
+            print(f"  ✗ {sample}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,21 @@
-import requests
-import os
+from clients import KeycloakAdminClient
 from dotenv import load_dotenv
+import os
 
 load_dotenv()
-admin_pwd = os.getenv('KEYCLOAK_ADMIN_PASSWORD')
-
-token_url = 'https://datakwip-ai.up.railway.app/realms/master/protocol/openid-connect/token'
-token_data = {
-    'grant_type': 'password',
-    'client_id': 'admin-cli',
-    'username': 'admin',
-    'password': admin_pwd
-}
 
-response = requests.post(token_url, data=token_data, verify=False)
-token = response.json()['access_token']
+client = KeycloakAdminClient(
+    server_url='https://datakwip-ai.up.railway.app',
+    realm_name='datakwip',
+    admin_username='admin',
+    admin_password=os.getenv('KEYCLOAK_ADMIN_PASSWORD'),
+    verify=False
+)
 
-headers = {'Authorization': 'Bearer ' + token}
-users_url = 'https://datakwip-ai.up.railway.app/admin/realms/datakwip/users'
-users_response = requests.get(users_url, headers=headers, verify=False)
+client.connect()
 
-users = users_response.json()
-for user in users:
+# Server-side search, streamed page by page (covers realms of any size)
+for user in client.iter_users(search='functional-test-user'):
     username = user.get('username', '')
     email = user.get('email', '')
     if 'functional-test-user' in username.lower() or 'functional-test-user' in email.lower():
@@ -1,15 +1,64 @@
-"""Client modules for DataKwip functional tests."""
-
-from .api_client import DataKwipAPIClient
-from .mcp_client import DataKwipMCPClient, MCPError
-from .ui_client import DataKwipUIClient, UITestError
-from .auth_client import KeycloakAdminClient
-
-__all__ = [
-    "DataKwipAPIClient",
-    "DataKwipMCPClient",
-    "MCPError",
-    "DataKwipUIClient",
-    "UITestError",
-    "KeycloakAdminClient",
-]
+"""Client modules for DataKwip functional tests.
+
+Submodules are imported on first attribute access (PEP 562), so
+``from clients import DataKwipAPIClient`` loads httpx but neither Playwright
+nor python-keycloak.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "DataKwipAPIClient": ".api_client",
+    "DataKwipMCPClient": ".mcp_client",
+    "MCPError": ".mcp_client",
+    "DataKwipUIClient": ".ui_client",
+    "UITestError": ".ui_client",
+    "KeycloakAdminClient": ".auth_client",
+    "AsyncKeycloakAdminClient": ".async_auth_client",
+    "RealmAudit": ".async_auth_client",
+    "RequestGovernor": ".governor",
+    "Cassette": ".cassette",
+    "CassetteMissError": ".cassette",
+    "ClientMetrics": ".metrics",
+    "MetricsRegistry": ".metrics",
+    "MetricsServer": ".metrics",
+    "CircuitBreaker": ".resilience",
+    "CircuitOpenError": ".resilience",
+    "Resilience": ".resilience",
+    "RetryPolicy": ".resilience",
+    "Span": ".tracing",
+    "SpanCollector": ".tracing",
+    "Tracer": ".tracing",
+    "PoolConfig": ".transport",
+    "TransportFactory": ".transport",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .api_client import DataKwipAPIClient
+    from .mcp_client import DataKwipMCPClient, MCPError
+    from .ui_client import DataKwipUIClient, UITestError
+    from .auth_client import KeycloakAdminClient
+    from .async_auth_client import AsyncKeycloakAdminClient, RealmAudit
+    from .governor import RequestGovernor
+    from .cassette import Cassette, CassetteMissError
+    from .metrics import ClientMetrics, MetricsRegistry, MetricsServer
+    from .resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy
+    from .tracing import Span, SpanCollector, Tracer
+    from .transport import PoolConfig, TransportFactory
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
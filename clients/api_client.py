@@ -1,5 +1,6 @@
 """DataKwip API client with OAuth2 authentication."""
 
+import threading
 import time
 from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
@@ -7,6 +8,14 @@ from datetime import datetime, timedelta
 import httpx
 from pydantic import BaseModel
 
+from .governor import GovernedTransport, RequestGovernor
+from .resilience import CircuitBreaker, Resilience, RetryPolicy
+from .tracing import Tracer, traced
+from .transport import TransportFactory
+
+# Methods that may be repeated after the request reached the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
 
 class TokenCache(BaseModel):
     """OAuth2 token cache."""
@@ -32,6 +41,10 @@ class DataKwipAPIClient:
         username: str,
         password: str,
         timeout: int = 30,
+        tracer: Optional[Tracer] = None,
+        resilience: Optional[Resilience] = None,
+        governor: Optional[RequestGovernor] = None,
+        transport_factory: Optional[TransportFactory] = None,
     ):
         """Initialize API client.
 
@@ -43,6 +56,12 @@ class DataKwipAPIClient:
             username: User email/username
             password: User password
             timeout: Request timeout in seconds
+            tracer: Optional request tracer (per-phase timing spans)
+            resilience: Retry and circuit breaker policy for API requests
+                (default: 3 attempts, breaker opens after 5 consecutive failures)
+            governor: Shared rate/concurrency governor (also applies to token requests)
+            transport_factory: Connection pool shared with other clients
+                (default: a pool of this client's own)
         """
         self.base_url = base_url.rstrip("/")
         self.token_url = token_url
@@ -52,14 +71,47 @@ class DataKwipAPIClient:
         self.password = password
         self.timeout = timeout
         self._token_cache: Optional[TokenCache] = None
-        self._client = httpx.Client(timeout=timeout)
+        self._token_lock = threading.Lock()
+        self.tracer = tracer or Tracer()
+        self.resilience = resilience or Resilience(RetryPolicy(), CircuitBreaker(self.base_url))
+        self.governor = governor
+        self.transport_factory = transport_factory or TransportFactory()
+
+        transport = self.transport_factory.transport()
+        if governor is not None:
+            transport = GovernedTransport(governor, transport)
+        self._client = httpx.Client(
+            timeout=timeout, event_hooks=self.tracer.event_hooks(), transport=transport
+        )
 
     def _get_access_token(self) -> str:
         """Get valid access token (cached or fetch new)."""
         if self._token_cache and not self._token_cache.is_expired():
+            self.tracer.cache_lookup("api_token", hit=True)
             return self._token_cache.access_token
 
-        # Fetch new token using password grant
+        # Concurrent callers share a single token fetch
+        with self._token_lock:
+            if self._token_cache and not self._token_cache.is_expired():
+                self.tracer.cache_lookup("api_token", hit=True)
+                return self._token_cache.access_token
+
+            self.tracer.cache_lookup("api_token", hit=False)
+            with self.tracer.span("token_refresh"):
+                return self._fetch_access_token()
+
+    def get_token_cache(self) -> TokenCache:
+        """Current token (fetched if missing or expired), e.g. to share with other processes."""
+        self._get_access_token()
+        return self._token_cache
+
+    def set_token_cache(self, token_cache: TokenCache):
+        """Use a token obtained elsewhere instead of running the password grant."""
+        with self._token_lock:
+            self._token_cache = token_cache
+
+    def _fetch_access_token(self) -> str:
+        """Fetch a new access token using the password grant."""
         data = {
             "grant_type": "password",
             "client_id": self.client_id,
@@ -105,7 +157,8 @@ class DataKwipAPIClient:
             httpx.Response object
 
         Raises:
-            httpx.HTTPStatusError: On HTTP error status
+            httpx.HTTPStatusError: On HTTP error status (after retries)
+            CircuitOpenError: When the API has failed repeatedly and calls fail fast
         """
         url = f"{self.base_url}{endpoint}"
         headers = {}
@@ -114,12 +167,24 @@ class DataKwipAPIClient:
             access_token = self._get_access_token()
             headers["Authorization"] = f"Bearer {access_token}"
 
-        response = self._client.request(
-            method=method, url=url, params=params, json=json, headers=headers
+        def send() -> httpx.Response:
+            with self.tracer.span(f"http {method}", **{"http.route": endpoint}):
+                return self._client.request(
+                    method=method, url=url, params=params, json=json, headers=headers
+                )
+
+        response = self.resilience.call(
+            send, idempotent=method.upper() in IDEMPOTENT_METHODS, tracer=self.tracer
         )
         response.raise_for_status()
         return response
 
+    def _decode(self, response: httpx.Response) -> Any:
+        """Decode a JSON response body (traced as json_decode)."""
+        with self.tracer.span("json_decode", **{"http.response.body.size": len(response.content)}):
+            return response.json()
+
+    @traced()
     def get_database_health(self) -> Dict[str, Any]:
         """Get database health status.
 
@@ -133,14 +198,18 @@ class DataKwipAPIClient:
             }
         """
         response = self._request("GET", "/health/databases", require_auth=False)
-        return response.json()
+        return self._decode(response)
 
-    def list_entities(self, org_id: int = 1, limit: int = 10) -> List[Dict[str, Any]]:
+    @traced()
+    def list_entities(
+        self, org_id: int = 1, limit: int = 10, offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """List entities from TimescaleDB.
 
         Args:
             org_id: Organization ID (default: 1)
             limit: Maximum number of entities to return
+            offset: Offset for pagination
 
         Returns:
             List of entity objects
@@ -158,15 +227,21 @@ class DataKwipAPIClient:
             ]
         """
         params = {"org_id": org_id, "limit": limit}
+        if offset:
+            params["offset"] = offset
         response = self._request("GET", "/entity", params=params)
-        return response.json()
+        return self._decode(response)
 
-    def list_entity_tags(self, org_id: int = 1, limit: int = 20) -> List[Dict[str, Any]]:
+    @traced()
+    def list_entity_tags(
+        self, org_id: int = 1, limit: int = 20, offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """List entity tags (EAV model).
 
         Args:
             org_id: Organization ID (default: 1)
             limit: Maximum number of tags to return
+            offset: Offset for pagination
 
         Returns:
             List of entity tag objects
@@ -183,8 +258,35 @@ class DataKwipAPIClient:
             ]
         """
         params = {"org_id": org_id, "limit": limit}
+        if offset:
+            params["offset"] = offset
         response = self._request("GET", "/entitytag", params=params)
-        return response.json()
+        return self._decode(response)
+
+    @traced()
+    def get_current_values(self, entity_ids: List[int], org_id: int = 1) -> List[Dict[str, Any]]:
+        """Get the most recent time-series value of each entity.
+
+        Args:
+            entity_ids: List of entity IDs
+            org_id: Organization ID (default: 1)
+
+        Returns:
+            List of current value objects (same shape as the MCP tool)
+
+        Example:
+            [
+                {
+                    "entity_id": 1,
+                    "timestamp": "2025-10-21T12:00:00Z",
+                    "value": 72.5,
+                    "unit": "°F"
+                }
+            ]
+        """
+        params = {"org_id": org_id, "entity_id": list(entity_ids)}
+        response = self._request("GET", "/entityvalue", params=params)
+        return self._decode(response)
 
     def close(self):
         """Close HTTP client."""
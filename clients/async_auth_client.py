@@ -0,0 +1,386 @@
+"""Async Keycloak admin client for concurrent realm audits."""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .api_client import TokenCache
+from .governor import AsyncGovernedTransport, RequestGovernor
+
+
+class RealmAudit(BaseModel):
+    """Result of a concurrent realm audit."""
+
+    realm: Dict[str, Any]
+    client: Optional[Dict[str, Any]] = None
+    user: Optional[Dict[str, Any]] = None
+    role_mappings: Optional[Dict[str, Any]] = None
+    duration: float = 0.0
+
+    @property
+    def realm_enabled(self) -> bool:
+        """Whether the audited realm is enabled."""
+        return self.realm.get("enabled") is True
+
+
+class AsyncKeycloakAdminClient:
+    """Async client for the Keycloak admin REST API (httpx based).
+
+    Covers the admin endpoints used by the functional tests (realm, clients,
+    users and role mappings) so that independent lookups can be awaited
+    concurrently instead of one after another.
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        realm_name: str,
+        admin_username: str,
+        admin_password: str,
+        verify: bool = True,
+        timeout: int = 30,
+        governor: Optional[RequestGovernor] = None,
+    ):
+        """Initialize async Keycloak admin client.
+
+        Args:
+            server_url: Keycloak server URL (e.g., https://auth.example.com)
+            realm_name: Realm name (e.g., 'datakwip')
+            admin_username: Admin username (authenticates against master realm)
+            admin_password: Admin password
+            verify: Verify SSL certificates
+            timeout: Request timeout in seconds
+            governor: Shared rate/concurrency governor
+        """
+        self.server_url = server_url.rstrip("/")
+        self.realm_name = realm_name
+        self.admin_username = admin_username
+        self.admin_password = admin_password
+        self.verify = verify
+        self.timeout = timeout
+        self.governor = governor
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token_cache: Optional[TokenCache] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def admin_url(self) -> str:
+        """Admin REST base URL for the target realm."""
+        return f"{self.server_url}/admin/realms/{self.realm_name}"
+
+    @property
+    def token_url(self) -> str:
+        """Token endpoint of the master realm (where the admin user exists)."""
+        return f"{self.server_url}/realms/master/protocol/openid-connect/token"
+
+    async def connect(self):
+        """Open the HTTP client and fetch an admin access token."""
+        if self._client is None:
+            transport = None
+            if self.governor is not None:
+                transport = AsyncGovernedTransport(
+                    self.governor, httpx.AsyncHTTPTransport(verify=self.verify)
+                )
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, verify=self.verify, transport=transport
+            )
+            self._token_lock = asyncio.Lock()
+        await self._get_access_token()
+
+    async def _get_access_token(self) -> str:
+        """Get valid admin access token (cached or fetch new)."""
+        if self._token_cache and not self._token_cache.is_expired():
+            return self._token_cache.access_token
+
+        # Concurrent callers share a single token fetch
+        async with self._token_lock:
+            if self._token_cache and not self._token_cache.is_expired():
+                return self._token_cache.access_token
+
+            data = {
+                "grant_type": "password",
+                "client_id": "admin-cli",
+                "username": self.admin_username,
+                "password": self.admin_password,
+            }
+
+            response = await self._client.post(self.token_url, data=data)
+            response.raise_for_status()
+
+            token_data = response.json()
+            expires_in = token_data.get("expires_in", 60)
+
+            self._token_cache = TokenCache(
+                access_token=token_data["access_token"],
+                expires_at=datetime.now() + timedelta(seconds=expires_in),
+                token_type=token_data.get("token_type", "Bearer"),
+            )
+
+        return self._token_cache.access_token
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+    ) -> httpx.Response:
+        """Make authenticated request against the realm admin API.
+
+        Args:
+            method: HTTP method (GET, POST, DELETE, ...)
+            path: Path relative to the realm admin URL (e.g., '/clients')
+            params: Query parameters
+            json: JSON request body
+
+        Returns:
+            httpx.Response object
+
+        Raises:
+            httpx.HTTPStatusError: On HTTP error status
+        """
+        if self._client is None:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        access_token = await self._get_access_token()
+        response = await self._client.request(
+            method,
+            f"{self.admin_url}{path}",
+            params=params,
+            json=json,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+        response.raise_for_status()
+        return response
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Make authenticated GET request and decode the JSON response."""
+        response = await self._request("GET", path, params=params)
+        return response.json()
+
+    async def get_realm_info(self) -> Dict[str, Any]:
+        """Get realm information.
+
+        Returns:
+            Realm configuration
+        """
+        return await self._get("")
+
+    async def verify_connection(self) -> bool:
+        """Verify admin connection is working.
+
+        Returns:
+            True if the target realm can be read
+        """
+        realm_info = await self.get_realm_info()
+        return realm_info is not None and realm_info.get("realm") == self.realm_name
+
+    async def list_clients(self) -> List[Dict[str, Any]]:
+        """List all clients in realm.
+
+        Returns:
+            List of client configurations
+        """
+        return await self._get("/clients")
+
+    async def get_client_by_client_id(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """Get client configuration by client ID.
+
+        The lookup is filtered server-side, so only the matching client is
+        transferred instead of the full client list.
+
+        Args:
+            client_id: Client ID (e.g., 'functional-tests')
+
+        Returns:
+            Client configuration or None if not found
+        """
+        clients = await self._get("/clients", params={"clientId": client_id})
+        for client in clients:
+            if client.get("clientId") == client_id:
+                return client
+
+        return None
+
+    async def list_users(self, max_users: int = 100) -> List[Dict[str, Any]]:
+        """List users in realm.
+
+        Args:
+            max_users: Maximum number of users to return
+
+        Returns:
+            List of user objects
+        """
+        return await self._get("/users", params={"max": max_users})
+
+    async def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get user by username.
+
+        Args:
+            username: Username or email to search for
+
+        Returns:
+            User object or None if not found
+        """
+        users = await self._get("/users", params={"username": username, "exact": "true"})
+
+        return users[0] if users else None
+
+    async def search_users(
+        self, search: str, first: int = 0, max_users: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Search users (one page).
+
+        Args:
+            search: Search string (matches username, email, first/last name)
+            first: Pagination offset
+            max_users: Page size
+
+        Returns:
+            List of matching user objects
+        """
+        return await self._get(
+            "/users",
+            params={
+                "search": search,
+                "first": first,
+                "max": max_users,
+                "briefRepresentation": "true",
+            },
+        )
+
+    async def create_user(
+        self, username: str, email: str, password: str, enabled: bool = True
+    ) -> str:
+        """Create a user with a permanent password (idempotent).
+
+        Args:
+            username: Username
+            email: Email address (marked as verified)
+            password: Initial password (not temporary)
+            enabled: Whether the user is enabled
+
+        Returns:
+            Keycloak user UUID (of the existing user if the username is taken)
+        """
+        payload = {
+            "username": username,
+            "email": email,
+            "enabled": enabled,
+            "emailVerified": True,
+            "credentials": [{"type": "password", "value": password, "temporary": False}],
+        }
+
+        try:
+            response = await self._request("POST", "/users", json=payload)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 409:
+                raise
+            # User already exists: return its ID
+            user = await self.get_user_by_username(username)
+            if user is None:
+                raise
+            return user["id"]
+
+        # Keycloak returns the new user's URL in the Location header
+        return response.headers["Location"].rstrip("/").rsplit("/", 1)[-1]
+
+    async def delete_user(self, user_id: str) -> bool:
+        """Delete a user.
+
+        Args:
+            user_id: Keycloak user UUID
+
+        Returns:
+            True if deleted, False if the user did not exist
+        """
+        try:
+            await self._request("DELETE", f"/users/{user_id}")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return False
+            raise
+
+        return True
+
+    async def get_user_role_mappings(self, user_id: str) -> Dict[str, Any]:
+        """Get realm and client role mappings of a user.
+
+        Args:
+            user_id: Keycloak user UUID
+
+        Returns:
+            Role mappings
+
+        Example:
+            {
+                "realmMappings": [{"name": "default-roles-datakwip", ...}],
+                "clientMappings": {"account": {...}}
+            }
+        """
+        return await self._get(f"/users/{user_id}/role-mappings")
+
+    async def _get_user_with_roles(self, username: str) -> tuple:
+        """Look up a user and, if found, its role mappings."""
+        user = await self.get_user_by_username(username)
+        if user is None:
+            return None, None
+
+        return user, await self.get_user_role_mappings(user["id"])
+
+    async def realm_audit(
+        self, client_id: Optional[str] = None, username: Optional[str] = None
+    ) -> RealmAudit:
+        """Audit realm, client and user configuration concurrently.
+
+        Realm info, the client lookup and the user lookup are independent and
+        are issued at the same time; the user's role mappings follow the user
+        lookup on the same branch, so the audit costs one admin round trip
+        (two for the user branch) instead of one per lookup.
+
+        Args:
+            client_id: Client ID to look up (e.g., 'functional-tests')
+            username: Username or email to look up together with its role mappings
+
+        Returns:
+            RealmAudit with the collected configuration (None for skipped or
+            missing lookups)
+        """
+        start_time = asyncio.get_running_loop().time()
+
+        async def _skipped(value: Any) -> Any:
+            return value
+
+        realm, client, (user, role_mappings) = await asyncio.gather(
+            self.get_realm_info(),
+            self.get_client_by_client_id(client_id) if client_id else _skipped(None),
+            self._get_user_with_roles(username) if username else _skipped((None, None)),
+        )
+
+        return RealmAudit(
+            realm=realm,
+            client=client,
+            user=user,
+            role_mappings=role_mappings,
+            duration=asyncio.get_running_loop().time() - start_time,
+        )
+
+    async def close(self):
+        """Close HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._token_cache = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
@@ -1,8 +1,14 @@
 """Keycloak admin client for authentication tests."""
 
-from typing import Any, Dict, List, Optional
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
-from keycloak import KeycloakAdmin, KeycloakOpenIDConnection
+if TYPE_CHECKING:
+    from keycloak import KeycloakAdmin
+
+    from .governor import RequestGovernor
 
 
 class KeycloakAdminClient:
@@ -15,6 +21,8 @@ class KeycloakAdminClient:
         admin_username: str,
         admin_password: str,
         verify: bool = True,
+        token: Optional[Dict[str, Any]] = None,
+        governor: Optional["RequestGovernor"] = None,
     ):
         """Initialize Keycloak admin client.
 
@@ -24,17 +32,25 @@ class KeycloakAdminClient:
             admin_username: Admin username
             admin_password: Admin password
             verify: Verify SSL certificates
+            token: Admin token to start from instead of logging in (refreshed
+                automatically by python-keycloak when it expires)
+            governor: Shared rate/concurrency governor (admin and token requests)
         """
         self.server_url = server_url.rstrip("/")
         self.realm_name = realm_name
         self.admin_username = admin_username
         self.admin_password = admin_password
         self.verify = verify
+        self.token = token
+        self.governor = governor
 
-        self._admin: Optional[KeycloakAdmin] = None
+        self._admin: Optional["KeycloakAdmin"] = None
 
     def connect(self):
         """Connect to Keycloak admin API."""
+        # python-keycloak (and requests) load on first connect, not on import
+        from keycloak import KeycloakAdmin
+
         # Create admin client that authenticates via master realm
         # but performs admin operations on the target realm
         self._admin = KeycloakAdmin(
@@ -44,7 +60,49 @@ class KeycloakAdminClient:
             username=self.admin_username,
             password=self.admin_password,
             verify=self.verify,
+            token=self.token,
         )
+        if self.governor is not None:
+            self._govern_sessions()
+
+    def _govern_sessions(self):
+        """Route python-keycloak's requests sessions through the governor.
+
+        Depends on python-keycloak private attributes (checked against 7.x):
+        ``KeycloakAdmin.connection._s`` (admin API session) and
+        ``connection.keycloak_openid.connection._s`` (token endpoint session).
+        Versions without them stay ungoverned, with a warning.
+        """
+        from .governor import govern_requests_session
+
+        connection = self._admin.connection
+        openid = getattr(connection, "keycloak_openid", None)
+        sessions = [
+            getattr(connection, "_s", None),
+            getattr(getattr(openid, "connection", None), "_s", None),
+        ]
+        if any(session is None for session in sessions):
+            warnings.warn(
+                "python-keycloak does not expose its requests sessions; "
+                "Keycloak admin requests are not governed",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+            return
+        for session in sessions:
+            govern_requests_session(session, self.governor)
+
+    @property
+    def admin_token(self) -> Dict[str, Any]:
+        """Current admin token (logs in if needed); reused by later connect() calls."""
+        if not self._admin:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        connection = self._admin.connection
+        if connection.token is None:
+            connection.get_token()
+        self.token = connection.token
+        return self.token
 
     def verify_connection(self) -> bool:
         """Verify admin connection is working.
@@ -158,6 +216,75 @@ class KeycloakAdminClient:
 
         return self._admin.get_users({"max": max_users})
 
+    def iter_users(
+        self,
+        page_size: int = 100,
+        search: Optional[str] = None,
+        prefetch: int = 4,
+        brief_representation: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all users in realm, page by page.
+
+        Pages are requested with ``first``/``max`` offsets. Up to ``prefetch``
+        pages are fetched concurrently ahead of the consumer, so memory stays
+        bounded at ``(prefetch + 1) * page_size`` users regardless of realm size.
+        Iteration stops at the first short page.
+
+        Args:
+            page_size: Number of users per admin API request
+            search: Optional search string (matches username, email, first/last name)
+            prefetch: Number of pages fetched ahead concurrently
+            brief_representation: Request brief user representations (smaller pages)
+
+        Yields:
+            User objects in Keycloak's listing order
+        """
+        if not self._admin:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        def fetch_page(first: int) -> List[Dict[str, Any]]:
+            query: Dict[str, Any] = {"first": first, "max": page_size}
+            if search:
+                query["search"] = search
+            if brief_representation:
+                query["briefRepresentation"] = True
+            return self._admin.get_users(query)
+
+        executor = ThreadPoolExecutor(max_workers=max(prefetch, 1))
+        try:
+            pending = deque(
+                executor.submit(fetch_page, i * page_size) for i in range(max(prefetch, 1))
+            )
+            next_first = len(pending) * page_size
+
+            while pending:
+                page = pending.popleft().result()
+                yield from page
+
+                if len(page) < page_size:
+                    break
+
+                pending.append(executor.submit(fetch_page, next_first))
+                next_first += page_size
+        finally:
+            # Drop pages prefetched past the end (or past an early consumer exit)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def count_users(self, search: Optional[str] = None) -> int:
+        """Count users in realm without fetching them.
+
+        Args:
+            search: Optional search string (same semantics as iter_users)
+
+        Returns:
+            Number of matching users
+        """
+        if not self._admin:
+            raise RuntimeError("Not connected. Call connect() first.")
+
+        query = {"search": search} if search else {}
+        return self._admin.users_count(query)
+
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username.
 
@@ -0,0 +1,200 @@
+"""Record and replay the HTTP exchanges of the httpx-based clients.
+
+A Cassette plugs into a TransportFactory, so every API and MCP client built
+from that factory is recorded or replayed at the transport level (below
+retries, tracing and the governor):
+
+- record: requests go to the network; each response is stored under a key
+  made of method, path, sorted query and a digest of the normalized body.
+- replay: responses are served from memory; nothing touches the network.
+  Repeated requests get the recorded responses in order, then start over.
+
+Secrets never reach the file: request headers are not stored, token
+requests are keyed by grant type and scope only (not credentials), and
+token values in responses are replaced. JSON-RPC ids are dropped from the
+key and the stored response; on replay the response carries the id of the
+request being answered. Hosts are not part of the key, so a cassette
+recorded against one environment replays with another's settings.
+
+The file is gzipped JSON with each distinct response body stored once and
+an index from request key to (status, content type, body) entries.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+RECORD = "record"
+REPLAY = "replay"
+
+CASSETTE_VERSION = 1
+
+# Response JSON fields holding credentials
+SECRET_FIELDS = {"access_token", "refresh_token", "id_token"}
+SCRUBBED = "scrubbed"
+
+# Form fields that identify a token request; credentials are left out of the key
+FORM_KEY_FIELDS = ("grant_type", "scope")
+
+
+class CassetteMissError(Exception):
+    """A request in replay mode that was never recorded."""
+
+    def __init__(self, key: str):
+        self.key = key
+        super().__init__(f"No recorded response for {key} (re-record the cassette)")
+
+
+def _normalize_request(request: httpx.Request) -> Tuple[str, Any]:
+    """Cassette key of a request, and its JSON-RPC id (None for other requests)."""
+    params = sorted(request.url.params.multi_items())
+    key = f"{request.method} {request.url.path}"
+    if params:
+        key += f"?{urlencode(params)}"
+
+    body = request.content
+    if not body:
+        return key, None
+
+    rpc_id = None
+    content_type = request.headers.get("content-type", "")
+    if "json" in content_type:
+        payload = json.loads(body)
+        if isinstance(payload, dict) and "jsonrpc" in payload:
+            rpc_id = payload.pop("id", None)
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    elif "x-www-form-urlencoded" in content_type:
+        fields = [(k, v) for k, v in parse_qsl(body.decode()) if k in FORM_KEY_FIELDS]
+        canonical = urlencode(sorted(fields))
+    else:
+        canonical = body.decode("utf-8", errors="replace")
+
+    return f"{key} {hashlib.sha1(canonical.encode()).hexdigest()[:16]}", rpc_id
+
+
+def _scrub_body(text: str, content_type: str) -> str:
+    """Response body with token values replaced and JSON-RPC ids removed."""
+    if "json" not in content_type:
+        return text
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return text
+    if isinstance(payload, dict):
+        for field in SECRET_FIELDS & payload.keys():
+            payload[field] = SCRUBBED
+        if "jsonrpc" in payload:
+            payload["id"] = None
+    return json.dumps(payload, separators=(",", ":"))
+
+
+class Cassette:
+    """Recorded request/response pairs, kept in memory and saved to one file.
+
+    Args:
+        path: Cassette file (gzipped JSON)
+        mode: RECORD (start empty, save() writes the file) or REPLAY (load the file)
+
+    Example:
+        >>> cassette = Cassette("cassettes/api.json.gz", mode=RECORD)
+        >>> factory = TransportFactory(cassette=cassette)
+        >>> DataKwipAPIClient(..., transport_factory=factory).list_entities()
+        >>> cassette.save()
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = REPLAY):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._bodies: List[str] = []
+        self._body_index: Dict[str, int] = {}
+        self._interactions: Dict[str, List[Tuple[int, str, int]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == REPLAY:
+            self.load()
+
+    def __len__(self) -> int:
+        """Number of recorded exchanges."""
+        return sum(len(entries) for entries in self._interactions.values())
+
+    def record(self, request: httpx.Request, response: httpx.Response):
+        """Store a response (its body must have been read)."""
+        key, _ = _normalize_request(request)
+        content_type = response.headers.get("content-type", "")
+        body = _scrub_body(response.content.decode("utf-8", errors="replace"), content_type)
+
+        with self._lock:
+            body_id = self._body_index.get(body)
+            if body_id is None:
+                body_id = self._body_index[body] = len(self._bodies)
+                self._bodies.append(body)
+            self._interactions.setdefault(key, []).append(
+                (response.status_code, content_type, body_id)
+            )
+
+    def play(self, request: httpx.Request) -> httpx.Response:
+        """Recorded response for a request.
+
+        Raises:
+            CassetteMissError: When no matching request was recorded
+        """
+        key, rpc_id = _normalize_request(request)
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                raise CassetteMissError(key)
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = (cursor + 1) % len(entries)
+            status, content_type, body_id = entries[cursor]
+            body = self._bodies[body_id]
+
+        if rpc_id is not None:
+            payload = json.loads(body)
+            payload["id"] = rpc_id
+            body = json.dumps(payload, separators=(",", ":"))
+
+        return httpx.Response(
+            status,
+            headers={"content-type": content_type} if content_type else None,
+            content=body.encode(),
+            extensions={"http_version": b"HTTP/1.1"},
+            request=request,
+        )
+
+    def save(self) -> Path:
+        """Write the cassette file."""
+        with self._lock:
+            data = {
+                "version": CASSETTE_VERSION,
+                "bodies": self._bodies,
+                "interactions": {
+                    key: [list(e) for e in entries] for key, entries in self._interactions.items()
+                },
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        return self.path
+
+    def load(self):
+        """Read the cassette file into memory."""
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}: {data.get('version')}")
+
+        with self._lock:
+            self._bodies = data["bodies"]
+            self._body_index = {body: i for i, body in enumerate(self._bodies)}
+            self._interactions = {
+                key: [tuple(e) for e in entries] for key, entries in data["interactions"].items()
+            }
+            self._cursors = {}
@@ -0,0 +1,316 @@
+"""Client-side rate and concurrency governor shared by all clients.
+
+A RequestGovernor keeps one token bucket per host (requests/second with a
+burst allowance) and an optional cap on requests in flight across every
+client that shares it. It plugs in below the clients as an httpx transport
+(GovernedTransport / AsyncGovernedTransport) or a requests adapter (for
+python-keycloak), so a load test cannot flood the shared deployment or the
+Keycloak token endpoint no matter how many workers it runs.
+
+When a host answers 429 or 503 its rate is halved (down to a floor) and a
+Retry-After delay pauses the bucket; successful responses raise the rate
+back towards the configured one in small steps (AIMD).
+
+Stats separate time spent throttled (waiting for a token or an in-flight
+slot) from time spent waiting on the server.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .resilience import parse_retry_after
+
+# Responses that make the governor slow down for the host
+SLOW_DOWN_STATUSES = {429, 503}
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate can adapt.
+
+    Args:
+        rate: Tokens (requests) per second
+        burst: Bucket size (requests allowed back-to-back)
+        min_rate: Floor for adaptive slow-down
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.min_rate = min_rate if min_rate is not None else rate / 10
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns seconds to wait before using it (0 if available now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for the next `seconds`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def slow_down(self, factor: float = 0.5):
+        """Multiplicative decrease of the refill rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.rate * factor, self.min_rate)
+
+    def speed_up(self, step: float = 0.05):
+        """Additive increase (a fraction of the base rate), capped at the base rate."""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.rate + self.base_rate * step, self.base_rate)
+
+
+class HostStats(BaseModel):
+    """Governor accounting for one host."""
+
+    requests: int = 0
+    throttled_requests: int = 0  # Requests that had to wait at all
+    throttled_seconds: float = 0.0
+    server_seconds: float = 0.0
+    slow_downs: int = 0  # 429/503 responses
+    current_rate: Optional[float] = None
+
+
+class RequestGovernor:
+    """Per-host rate limits and a global in-flight cap, shared by clients.
+
+    Args:
+        rate: Default requests/second per host (None = no rate limit)
+        burst: Requests a host may receive back-to-back
+        max_in_flight: Concurrent requests across all hosts (None = no cap)
+        host_rates: Per-host overrides of `rate`, keyed by host[:port]
+        adaptive: Slow down on 429/503 and recover on success
+
+    Example:
+        >>> governor = RequestGovernor(rate=20, burst=5, max_in_flight=8)
+        >>> api = DataKwipAPIClient(..., governor=governor)
+        >>> mcp = DataKwipMCPClient(..., governor=governor)
+        >>> print(governor.report())
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_in_flight: Optional[int] = None,
+        host_rates: Optional[Dict[str, float]] = None,
+        adaptive: bool = True,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.host_rates = host_rates or {}
+        self.adaptive = adaptive
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._stats: Dict[str, HostStats] = {}
+        self._slots = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.host_rates.get(host, self.rate)
+                self._buckets[host] = TokenBucket(rate, self.burst) if rate else None
+                self._stats[host] = HostStats(current_rate=rate)
+            return self._buckets[host]
+
+    # Sync
+
+    def acquire(self, host: str) -> float:
+        """Block until a request to host may be sent; returns seconds waited."""
+        start = time.perf_counter()
+        bucket = self._bucket(host)
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                time.sleep(delay)
+        if self._slots is not None:
+            self._slots.acquire()
+        return time.perf_counter() - start
+
+    def release(self):
+        """Free the in-flight slot taken by acquire()."""
+        if self._slots is not None:
+            self._slots.release()
+
+    # Async (the in-flight cap is shared with sync callers, so it is polled)
+
+    async def acquire_async(self, host: str) -> float:
+        """Async acquire(): waits without blocking the event loop."""
+        start = time.perf_counter()
+        bucket = self._bucket(host)
+        if bucket is not None:
+            delay = bucket.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if self._slots is not None:
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+        return time.perf_counter() - start
+
+    # Feedback
+
+    def record(self, host: str, throttled: float, server: float, response=None):
+        """Account one exchange and adapt the host's rate to its status code.
+
+        Args:
+            host: host[:port] the request went to
+            throttled: Seconds spent in acquire()
+            server: Seconds from sending to the full response body
+            response: httpx or requests response (None if the request failed)
+        """
+        bucket = self._bucket(host)
+        status = response.status_code if response is not None else None
+
+        if bucket is not None and self.adaptive and status is not None:
+            if status in SLOW_DOWN_STATUSES:
+                bucket.slow_down()
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after:
+                    bucket.pause(retry_after)
+            else:
+                bucket.speed_up()
+
+        with self._lock:
+            stats = self._stats[host]
+            stats.requests += 1
+            stats.throttled_seconds += throttled
+            stats.server_seconds += server
+            if throttled >= 0.001:
+                stats.throttled_requests += 1
+            if status in SLOW_DOWN_STATUSES:
+                stats.slow_downs += 1
+            stats.current_rate = bucket.rate if bucket is not None else None
+
+    def stats(self) -> Dict[str, HostStats]:
+        """Copy of the per-host stats."""
+        with self._lock:
+            return {host: stats.model_copy() for host, stats in self._stats.items()}
+
+    def report(self) -> str:
+        """Printable per-host summary of throttled vs server time."""
+        lines = [
+            f"{'Host':<28} {'requests':>8} {'throttled':>10} {'wait':>9} {'server':>9} "
+            f"{'429/503':>8} {'rate':>8}"
+        ]
+        for host, s in sorted(self.stats().items()):
+            rate = f"{s.current_rate:.1f}/s" if s.current_rate else "-"
+            lines.append(
+                f"{host:<28} {s.requests:>8} {s.throttled_requests:>10} "
+                f"{s.throttled_seconds:>8.2f}s {s.server_seconds:>8.2f}s "
+                f"{s.slow_downs:>8} {rate:>8}"
+            )
+        return "\n".join(lines)
+
+
+def _host(request: httpx.Request) -> str:
+    return request.url.netloc.decode("ascii")
+
+
+class GovernedTransport(httpx.BaseTransport):
+    """httpx transport that waits for the governor before each request.
+
+    Args:
+        governor: Shared governor
+        transport: Transport doing the actual I/O (default: httpx.HTTPTransport())
+    """
+
+    def __init__(self, governor: RequestGovernor, transport: Optional[httpx.BaseTransport] = None):
+        self.governor = governor
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        host = _host(request)
+        throttled = self.governor.acquire(host)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.transport.handle_request(request)
+            response.read()  # Hold the slot until the body has arrived
+            return response
+        finally:
+            self.governor.release()
+            self.governor.record(host, throttled, time.perf_counter() - start, response)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncGovernedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of GovernedTransport."""
+
+    def __init__(
+        self, governor: RequestGovernor, transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.governor = governor
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = _host(request)
+        throttled = await self.governor.acquire_async(host)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = await self.transport.handle_async_request(request)
+            await response.aread()
+            return response
+        finally:
+            self.governor.release()
+            self.governor.record(host, throttled, time.perf_counter() - start, response)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class GovernedAdapter:
+    """requests adapter that waits for the governor before each request.
+
+    Implements the adapter interface (send/close) by delegation instead of
+    subclassing requests' BaseAdapter, so importing the governor does not
+    import requests.
+    """
+
+    def __init__(self, governor: RequestGovernor, adapter):
+        self.governor = governor
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        host = request.url.split("/")[2]
+        throttled = self.governor.acquire(host)
+        start = time.perf_counter()
+        response = None
+        try:
+            response = self.adapter.send(request, **kwargs)
+            return response
+        finally:
+            self.governor.release()
+            self.governor.record(host, throttled, time.perf_counter() - start, response)
+
+    def close(self):
+        self.adapter.close()
+
+
+def govern_requests_session(session, governor: RequestGovernor):
+    """Route a requests.Session (as used by python-keycloak) through the governor."""
+    for prefix in ("https://", "http://"):
+        adapter = session.get_adapter(prefix)
+        if not isinstance(adapter, GovernedAdapter):
+            session.mount(prefix, GovernedAdapter(governor, adapter))
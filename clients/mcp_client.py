@@ -1,10 +1,19 @@
 """DataKwip MCP client with JSON-RPC 2.0 support."""
 
+import itertools
 import json
 from typing import Any, Dict, List, Optional
 
 import httpx
 
+from .governor import GovernedTransport, RequestGovernor
+from .resilience import CircuitBreaker, Resilience, RetryPolicy
+from .tracing import Tracer, traced
+from .transport import TransportFactory
+
+# Read-only tools: safe to call again after the server has seen the request
+IDEMPOTENT_TOOLS = {"query_entities", "get_current_values"}
+
 
 class MCPError(Exception):
     """MCP protocol error."""
@@ -19,22 +28,67 @@ class MCPError(Exception):
 class DataKwipMCPClient:
     """Client for DataKwip MCP server using JSON-RPC 2.0."""
 
-    def __init__(self, base_url: str, timeout: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: int = 30,
+        tracer: Optional[Tracer] = None,
+        resilience: Optional[Resilience] = None,
+        governor: Optional[RequestGovernor] = None,
+        transport_factory: Optional[TransportFactory] = None,
+    ):
         """Initialize MCP client.
 
         Args:
             base_url: Base URL of MCP server
             timeout: Request timeout in seconds
+            tracer: Optional request tracer (per-phase timing spans)
+            resilience: Retry and circuit breaker policy for JSON-RPC calls
+                (default: 3 attempts, breaker opens after 5 consecutive failures)
+            governor: Shared rate/concurrency governor
+            transport_factory: Connection pool shared with other clients
+                (default: a pool of this client's own)
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
-        self._client = httpx.Client(timeout=timeout)
-        self._request_id = 0
+        self.tracer = tracer or Tracer()
+        self.resilience = resilience or Resilience(RetryPolicy(), CircuitBreaker(self.base_url))
+        self.governor = governor
+        self.transport_factory = transport_factory or TransportFactory()
+
+        transport = self.transport_factory.transport()
+        if governor is not None:
+            transport = GovernedTransport(governor, transport)
+        self._client = httpx.Client(
+            timeout=timeout, event_hooks=self.tracer.event_hooks(), transport=transport
+        )
+        self._request_ids = itertools.count(1)  # Thread-safe under the GIL
 
     def _get_next_id(self) -> int:
         """Get next JSON-RPC request ID."""
-        self._request_id += 1
-        return self._request_id
+        return next(self._request_ids)
+
+    def _post(self, request_payload: Dict[str, Any], idempotent: bool) -> Dict[str, Any]:
+        """POST a JSON-RPC request (with retries) and decode the response.
+
+        Raises:
+            httpx.HTTPStatusError: On HTTP error (after retries)
+            CircuitOpenError: When the server has failed repeatedly and calls fail fast
+        """
+
+        def send() -> httpx.Response:
+            with self.tracer.span("http POST", **{"rpc.method": request_payload["method"]}):
+                return self._client.post(
+                    f"{self.base_url}/mcp",
+                    json=request_payload,
+                    headers={"Content-Type": "application/json"},
+                )
+
+        response = self.resilience.call(send, idempotent=idempotent, tracer=self.tracer)
+        response.raise_for_status()
+
+        with self.tracer.span("json_decode", **{"http.response.body.size": len(response.content)}):
+            return response.json()
 
     def _call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call MCP tool using JSON-RPC 2.0.
@@ -48,7 +102,8 @@ class DataKwipMCPClient:
 
         Raises:
             MCPError: On MCP protocol error
-            httpx.HTTPStatusError: On HTTP error
+            httpx.HTTPStatusError: On HTTP error (after retries)
+            CircuitOpenError: When the server has failed repeatedly and calls fail fast
         """
         request_payload = {
             "jsonrpc": "2.0",
@@ -57,14 +112,7 @@ class DataKwipMCPClient:
             "params": {"name": tool_name, "arguments": arguments},
         }
 
-        response = self._client.post(
-            f"{self.base_url}/mcp",
-            json=request_payload,
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
-
-        result = response.json()
+        result = self._post(request_payload, idempotent=tool_name in IDEMPOTENT_TOOLS)
 
         # Check for JSON-RPC error
         if "error" in result:
@@ -77,6 +125,7 @@ class DataKwipMCPClient:
 
         return result.get("result")
 
+    @traced()
     def query_entities(
         self,
         org_id: int = 1,
@@ -122,11 +171,13 @@ class DataKwipMCPClient:
             content = result["content"]
             if isinstance(content, list) and len(content) > 0:
                 text_content = content[0].get("text", "[]")
-                return json.loads(text_content)
+                with self.tracer.span("json_decode", **{"mcp.content.size": len(text_content)}):
+                    return json.loads(text_content)
 
         # Fallback: assume result is already the data
         return result if isinstance(result, list) else []
 
+    @traced()
     def get_current_values(
         self, entity_ids: List[int], org_id: int = 1
     ) -> List[Dict[str, Any]]:
@@ -161,11 +212,13 @@ class DataKwipMCPClient:
             content = result["content"]
             if isinstance(content, list) and len(content) > 0:
                 text_content = content[0].get("text", "[]")
-                return json.loads(text_content)
+                with self.tracer.span("json_decode", **{"mcp.content.size": len(text_content)}):
+                    return json.loads(text_content)
 
         # Fallback: assume result is already the data
         return result if isinstance(result, list) else []
 
+    @traced()
     def list_tools(self) -> List[Dict[str, Any]]:
         """List available MCP tools.
 
@@ -187,14 +240,7 @@ class DataKwipMCPClient:
             "method": "tools/list",
         }
 
-        response = self._client.post(
-            f"{self.base_url}/mcp",
-            json=request_payload,
-            headers={"Content-Type": "application/json"},
-        )
-        response.raise_for_status()
-
-        result = response.json()
+        result = self._post(request_payload, idempotent=True)
 
         if "error" in result:
             error = result["error"]
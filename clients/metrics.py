@@ -0,0 +1,486 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+A MetricsRegistry holds counters, gauges and histograms with fixed label
+names and renders them in the Prometheus text format (0.0.4, also accepted by
+OpenMetrics scrapers). It can be served on a local ``/metrics`` endpoint
+(MetricsServer) or written atomically to a file for node_exporter's textfile
+collector (write_textfile).
+
+ClientMetrics defines the DataKwip client metrics on top of a registry:
+
+    datakwip_client_operation_duration_seconds   per client method / MCP tool
+    datakwip_http_request_duration_seconds       per HTTP exchange (incl. retries)
+    datakwip_token_refreshes_total               OAuth2 token fetches
+    datakwip_cache_requests_total                cache lookups by result (hit/miss)
+    datakwip_retries_total                       retried requests per client
+    datakwip_circuit_state                       0 closed, 1 half-open, 2 open
+    datakwip_browser_step_duration_seconds       Playwright steps (login, navigation, query)
+    datakwip_check_duration_seconds              synthetic monitor checks
+
+Operation, HTTP and token metrics come from the clients' Tracer spans
+(``Tracer(..., metrics=metrics)``), so they work with or without a span
+collector. Retry, circuit breaker, governor and connection pool state is read
+from the tracked objects when the registry is collected.
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .resilience import CLOSED, HALF_OPEN, OPEN
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; HTTP and API operations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Seconds; browser steps include page loads and the Keycloak redirect
+BROWSER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CIRCUIT_STATES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """A metric family: one value per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        with self._lock:
+            return [
+                (self.name, tuple(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+    def value(self, **labels: Any) -> float:
+        """Current value for one label combination (0 if never set)."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: Any):
+        """Mirror a running total kept elsewhere (e.g. Resilience.retries)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def value(self, **labels: Any) -> float:
+        """Number of observations for one label combination."""
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def _samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                labels = tuple(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, state["buckets"]):
+                    cumulative += count
+                    samples.append(
+                        (
+                            f"{self.name}_bucket",
+                            labels + (("le", _format_value(bound)),),
+                            cumulative,
+                        )
+                    )
+                samples.append((f"{self.name}_sum", labels, state["sum"]))
+                samples.append((f"{self.name}_count", labels, state["count"]))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metrics plus callbacks that refresh pulled values before collection.
+
+    Args:
+        const_labels: Labels added to every sample (e.g. {"worker": "gw0"})
+
+    Example:
+        >>> registry = MetricsRegistry()
+        >>> requests = registry.counter("app_requests_total", "Requests", ["route"])
+        >>> requests.inc(route="/entity")
+        >>> print(registry.exposition())
+    """
+
+    def __init__(self, const_labels: Optional[Dict[str, str]] = None):
+        self.const_labels = tuple((const_labels or {}).items())
+        self._metrics: Dict[str, _Metric] = {}
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(
+        self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs
+    ) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with another type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_callback(self, callback: Callable[[], None]):
+        """Run callback before every collection (to copy state into gauges/counters)."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def exposition(self) -> str:
+        """All metrics in the Prometheus text format."""
+        with self._lock:
+            callbacks = list(self._callbacks)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for callback in callbacks:
+            callback()
+
+        lines = []
+        for metric in metrics:
+            samples = metric._samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in samples:
+                lines.append(
+                    f"{name}{_format_labels(self.const_labels + labels)} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Union[str, Path]) -> Path:
+        """Atomically write the exposition for node_exporter's textfile collector (*.prom)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(self.exposition())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+
+class MetricsServer:
+    """Serves a registry on http://host:port/metrics from a daemon thread.
+
+    Args:
+        registry: Registry to expose
+        port: TCP port (0 picks a free one; see .port)
+        host: Interface to bind (default: localhost only)
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 9464, host: str = "127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.exposition().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the test output
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},  # stop() waits for one poll
+            name="metrics-server",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class ClientMetrics:
+    """DataKwip client metrics, fed by tracer spans, clients and tracked objects.
+
+    Args:
+        registry: Registry to define the metrics in (default: a new one)
+
+    Example:
+        >>> metrics = ClientMetrics()
+        >>> tracer = Tracer(service_name="datakwip-api-client", metrics=metrics)
+        >>> api = DataKwipAPIClient(..., tracer=tracer)
+        >>> metrics.track_resilience("api", api.resilience)
+        >>> MetricsServer(metrics.registry, port=9464).start()
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.operation_seconds = r.histogram(
+            "datakwip_client_operation_duration_seconds",
+            "Client method (API endpoint or MCP tool) duration, "
+            "including token refresh and retries",
+            ["service", "operation", "outcome"],
+        )
+        self.http_seconds = r.histogram(
+            "datakwip_http_request_duration_seconds",
+            "Single HTTP exchange duration (each retry attempt counts)",
+            ["service", "method", "route", "status"],
+        )
+        self.token_refreshes = r.counter(
+            "datakwip_token_refreshes_total", "OAuth2 tokens fetched", ["service", "outcome"]
+        )
+        self.cache_requests = r.counter(
+            "datakwip_cache_requests_total", "Cache lookups by result", ["cache", "result"]
+        )
+        self.retries = r.counter(
+            "datakwip_retries_total", "Requests retried by the client", ["client"]
+        )
+        self.circuit_state = r.gauge(
+            "datakwip_circuit_state",
+            "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+            ["client"],
+        )
+        self.circuit_opened = r.counter(
+            "datakwip_circuit_opened_total", "Times the circuit breaker opened", ["client"]
+        )
+        self.browser_step_seconds = r.histogram(
+            "datakwip_browser_step_duration_seconds",
+            "Playwright step duration",
+            ["step", "outcome"],
+            buckets=BROWSER_BUCKETS,
+        )
+        self.check_seconds = r.histogram(
+            "datakwip_check_duration_seconds", "Synthetic check duration", ["check", "outcome"]
+        )
+        self.check_up = r.gauge(
+            "datakwip_check_up", "1 if the last run of the check passed", ["check"]
+        )
+
+    # Fed by Tracer / clients
+
+    def observe_span(self, span) -> None:
+        """Record a finished tracer span (root operations, HTTP exchanges, token refreshes)."""
+        outcome = "error" if span.error else "ok"
+        seconds = (span.end_ns - span.start_ns) / 1e9
+        if span.parent_id is None:
+            self.operation_seconds.observe(
+                seconds, service=span.service, operation=span.name, outcome=outcome
+            )
+        elif span.name.startswith("http "):
+            route = span.attributes.get("http.route") or span.attributes.get("rpc.method", "")
+            self.http_seconds.observe(
+                seconds,
+                service=span.service,
+                method=span.name[5:],
+                route=route,
+                status=span.attributes.get("http.status_code", "error"),
+            )
+        elif span.name == "token_refresh":
+            self.token_refreshes.inc(service=span.service, outcome=outcome)
+
+    def observe_cache(self, cache: str, hit: bool) -> None:
+        """Record one cache lookup."""
+        self.cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+    @contextmanager
+    def browser_step(self, step: str) -> Iterator[None]:
+        """Time a browser step."""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            self.browser_step_seconds.observe(
+                time.perf_counter() - start, step=step, outcome=outcome
+            )
+
+    def observe_check(self, result) -> None:
+        """Record a synthetic monitor CheckResult (usable as Monitor(on_result=...))."""
+        outcome = "ok" if result.ok else "error"
+        self.check_seconds.observe(result.duration, check=result.check, outcome=outcome)
+        self.check_up.set(1 if result.ok else 0, check=result.check)
+
+    # Pulled at collection time
+
+    def track_resilience(self, client: str, resilience) -> None:
+        """Export a Resilience's retry count and circuit breaker state."""
+
+        def collect():
+            self.retries.set(resilience.retries, client=client)
+            if resilience.breaker is not None:
+                self.circuit_state.set(CIRCUIT_STATES[resilience.breaker.state], client=client)
+                self.circuit_opened.set(resilience.breaker.opened_count, client=client)
+
+        self.registry.add_callback(collect)
+
+    def track_governor(self, governor) -> None:
+        """Export a RequestGovernor's per-host throttling."""
+        throttled = self.registry.counter(
+            "datakwip_governor_throttled_seconds_total",
+            "Time requests waited for the governor",
+            ["host"],
+        )
+        rate = self.registry.gauge(
+            "datakwip_governor_rate",
+            "Current allowed requests/second (after adaptive slow-down)",
+            ["host"],
+        )
+
+        def collect():
+            for host, stats in governor.stats().items():
+                throttled.set(stats.throttled_seconds, host=host)
+                if stats.current_rate:
+                    rate.set(stats.current_rate, host=host)
+
+        self.registry.add_callback(collect)
+
+    def track_transport(self, factory) -> None:
+        """Export a TransportFactory's requests and new connections per host."""
+        requests = self.registry.counter(
+            "datakwip_pool_requests_total", "Requests sent through the shared pool", ["host"]
+        )
+        connections = self.registry.counter(
+            "datakwip_pool_connections_total", "New connections opened by the shared pool", ["host"]
+        )
+
+        def collect():
+            for host, stats in factory.stats().items():
+                requests.set(stats.requests, host=host)
+                connections.set(stats.new_connections, host=host)
+
+        self.registry.add_callback(collect)
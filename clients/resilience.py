@@ -0,0 +1,235 @@
+"""Retry, backoff and circuit breaking for the httpx-based clients.
+
+A Resilience policy wraps one HTTP exchange:
+
+- Idempotent calls are retried on transient failures (transport errors and
+  429/502/503/504) with full-jitter exponential backoff, or after the delay
+  the server asks for in ``Retry-After``. Read and write timeouts are not
+  retried: a hung service would otherwise cost every call max_attempts
+  times the client timeout.
+- Non-idempotent calls are only retried when the request never reached the
+  server (connection refused, connect timeout, pool timeout).
+- A CircuitBreaker counts consecutive failures (transport errors and 5xx)
+  and, once open, fails calls immediately with CircuitOpenError instead of
+  letting every test wait out the timeout. After ``reset_timeout`` one trial
+  call is let through; its outcome closes or re-opens the circuit.
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Set
+
+import httpx
+from pydantic import BaseModel
+
+from .tracing import Tracer
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Errors raised before the request was sent (safe to retry any method)
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# Errors after the full client timeout was spent waiting on the server (never retried)
+TIMED_OUT_ERRORS = (httpx.ReadTimeout, httpx.WriteTimeout)
+
+
+class CircuitOpenError(Exception):
+    """Call rejected because the circuit breaker is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        self.name = name
+        self.retry_in = retry_in
+        super().__init__(f"Circuit '{name}' is open (next trial in {retry_in:.1f}s)")
+
+
+class RetryPolicy(BaseModel):
+    """When and how long to wait before retrying."""
+
+    max_attempts: int = 3
+    backoff_base: float = 0.2  # Seconds; attempt n waits up to base * 2**n
+    backoff_max: float = 5.0
+    retry_statuses: Set[int] = {429, 502, 503, 504}
+    respect_retry_after: bool = True
+    max_retry_after: float = 30.0  # Give up instead of waiting longer than this
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number `attempt` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def retry_after(self, response: httpx.Response) -> Optional[float]:
+        """Delay requested by the response's Retry-After header."""
+        return parse_retry_after(response.headers.get("Retry-After"))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header value (delay in seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker, shared by all threads of a client.
+
+    Args:
+        name: Reported in CircuitOpenError (e.g. the service host)
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a trial call
+    """
+
+    def __init__(
+        self, name: str = "default", failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            elapsed = time.monotonic() - self._opened_at
+            if self.state == OPEN and elapsed >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(self.name, max(self.reset_timeout - elapsed, 0.0))
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened_count += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+class Resilience:
+    """Retry policy plus circuit breaker applied to each HTTP exchange.
+
+    Args:
+        retry: Retry policy (None disables retries)
+        breaker: Circuit breaker (None disables circuit breaking)
+
+    Example:
+        >>> resilience = Resilience(RetryPolicy(max_attempts=4), CircuitBreaker("api"))
+        >>> response = resilience.call(lambda: client.get(url), idempotent=True)
+    """
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.retry = retry
+        self.breaker = breaker
+        self.retries = 0  # Retries performed (all calls)
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        send: Callable[[], httpx.Response],
+        idempotent: bool = True,
+        tracer: Optional[Tracer] = None,
+    ) -> httpx.Response:
+        """Send a request, retrying transient failures.
+
+        Args:
+            send: Performs one attempt and returns the response
+            idempotent: Whether the request may be repeated after it was sent
+            tracer: Records backoff waits as retry_wait spans
+
+        Returns:
+            The first non-retryable response, or the last one when retries run out
+
+        Raises:
+            CircuitOpenError: When the circuit breaker rejects the call
+            httpx.TransportError: When the last attempt failed without a response
+        """
+        tracer = tracer or Tracer()
+        attempt = 0
+        while True:
+            if self.breaker is not None:
+                self.breaker.before_call()
+
+            error: Optional[httpx.TransportError] = None
+            response: Optional[httpx.Response] = None
+            try:
+                response = send()
+            except httpx.TransportError as e:
+                error = e
+
+            if self.breaker is not None:
+                if error is not None or response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+            delay = self._retry_delay(attempt, idempotent, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            with tracer.span("retry_wait", **{"retry.attempt": attempt, "retry.delay_s": delay}):
+                time.sleep(delay)
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        idempotent: bool,
+        response: Optional[httpx.Response],
+        error: Optional[httpx.TransportError],
+    ) -> Optional[float]:
+        """Seconds to wait before retrying, or None to stop."""
+        policy = self.retry
+        if policy is None or attempt + 1 >= policy.max_attempts:
+            return None
+
+        if error is not None:
+            if isinstance(error, TIMED_OUT_ERRORS):
+                return None
+            if not idempotent and not isinstance(error, NOT_SENT_ERRORS):
+                return None
+            return policy.backoff(attempt)
+
+        if not idempotent or response.status_code not in policy.retry_statuses:
+            return None
+
+        if policy.respect_retry_after:
+            requested = policy.retry_after(response)
+            if requested is not None:
+                return requested if requested <= policy.max_retry_after else None
+        return policy.backoff(attempt)
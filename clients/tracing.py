@@ -0,0 +1,399 @@
+"""Client-side request tracing for the httpx-based clients.
+
+A Tracer records nested spans for each client operation:
+
+    list_entities                 (public client method)
+    ├── token_refresh             (only when the OAuth2 token is fetched)
+    │   └── http POST             (token endpoint, with its own phases)
+    ├── http GET                  (one per HTTP exchange)
+    │   ├── connect / tls         (new connections only)
+    │   ├── send
+    │   ├── server                (request sent -> response headers)
+    │   └── download              (response body)
+    ├── retry_wait                (backoff before a retried exchange)
+    └── json_decode
+
+HTTP phases come from httpcore's ``trace`` request extension, which the
+tracer's httpx request hook attaches to every request; the response hook
+records the status code. Spans go to an in-process SpanCollector and can be
+exported as OTLP/JSON (one trace per line, readable by the OpenTelemetry
+Collector's otlpjsonfile receiver). With ClientMetrics attached, finished
+spans also feed latency histograms and token refresh counters.
+"""
+
+import contextlib
+import contextvars
+import functools
+import itertools
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterator, List, Optional, Union
+
+import httpx
+from pydantic import BaseModel, PrivateAttr
+
+if TYPE_CHECKING:
+    from .metrics import ClientMetrics
+
+# httpcore trace events ("<prefix>.<name>.started/complete/failed") -> phase span name
+HTTP_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.connect_unix_socket": "connect",
+    "connection.start_tls": "tls",
+    "http2.send_connection_init": "connect",
+    "http11.send_request_headers": "send",
+    "http11.send_request_body": "send",
+    "http2.send_request_headers": "send",
+    "http2.send_request_body": "send",
+    "http11.receive_response_headers": "server",
+    "http2.receive_response_headers": "server",
+    "http11.receive_response_body": "download",
+    "http2.receive_response_body": "download",
+}
+
+# Columns of the per-operation breakdown, in request order
+BREAKDOWN_PHASES = [
+    "token_refresh",
+    "connect",
+    "tls",
+    "send",
+    "server",
+    "download",
+    "json_decode",
+    "retry_wait",
+]
+_COLUMN_LABELS = {"token_refresh": "token", "json_decode": "decode", "retry_wait": "retry"}
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "datakwip_current_span", default=None
+)
+
+
+class Span(BaseModel):
+    """One timed step of a client operation."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    service: str = "datakwip-client"
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = {}
+    error: Optional[str] = None
+    seq: int = 0
+
+    _phase_starts: Dict[str, int] = PrivateAttr(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+
+class SpanCollector:
+    """Thread-safe in-process store of finished spans.
+
+    Args:
+        max_spans: Oldest spans are dropped beyond this many
+    """
+
+    def __init__(self, max_spans: int = 100_000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            span.seq = next(self._seq)
+            self._spans.append(span)
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest span (0 when empty)."""
+        with self._lock:
+            return self._spans[-1].seq if self._spans else 0
+
+    def spans(self, since_seq: int = 0) -> List[Span]:
+        """Finished spans with a sequence number above since_seq."""
+        with self._lock:
+            return [span for span in self._spans if span.seq > since_seq]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    # Analysis
+
+    @staticmethod
+    def phase_totals(spans: List[Span]) -> List[Dict[str, Any]]:
+        """Per-root-span time in each phase, in milliseconds.
+
+        Phases nested under token_refresh count towards token_refresh only.
+        Time not covered by a phase (pool waits, client code) is "other".
+        """
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+
+        rows = []
+        for root in children.get(None, []):
+            phases = dict.fromkeys(BREAKDOWN_PHASES, 0.0)
+            stack = list(children.get(root.span_id, []))
+            while stack:
+                span = stack.pop()
+                if span.name in phases:
+                    phases[span.name] += span.duration_ms
+                    if span.name == "token_refresh":
+                        continue
+                stack.extend(children.get(span.span_id, []))
+            phases["other"] = max(root.duration_ms - sum(phases.values()), 0.0)
+            rows.append(
+                {"operation": root.name, "total": root.duration_ms, "error": root.error, **phases}
+            )
+        return rows
+
+    def breakdown(self, since_seq: int = 0) -> str:
+        """Printable mean time per phase for each operation traced since since_seq."""
+        rows = self.phase_totals(self.spans(since_seq))
+        if not rows:
+            return "No traced requests"
+
+        columns = BREAKDOWN_PHASES + ["other"]
+        header = f"{'Operation':<24} {'n':>4} {'total':>9}" + "".join(
+            f" {_COLUMN_LABELS.get(name, name):>8}" for name in columns
+        )
+        lines = [header, "-" * len(header)]
+
+        by_operation: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_operation.setdefault(row["operation"], []).append(row)
+
+        for operation, op_rows in by_operation.items():
+            n = len(op_rows)
+            mean = {key: sum(r[key] for r in op_rows) / n for key in ["total"] + columns}
+            errors = sum(1 for r in op_rows if r["error"])
+            name = f"{operation} ({errors} err)" if errors else operation
+            lines.append(
+                f"{name:<24} {n:>4} {mean['total']:>7.1f}ms"
+                + "".join(f" {mean[key]:>6.1f}ms" for key in columns)
+            )
+
+        slowest = max(rows, key=lambda r: r["total"])
+        lines.append(
+            f"Slowest: {slowest['operation']} {slowest['total']:.1f}ms ("
+            + ", ".join(f"{key} {slowest[key]:.1f}ms" for key in columns if slowest[key] >= 0.05)
+            + ")"
+        )
+        return "\n".join(lines)
+
+    # Export
+
+    def export_otlp_json(self, path: Union[str, Path], since_seq: int = 0) -> int:
+        """Append spans to an OTLP/JSON file, one trace per line.
+
+        Returns:
+            Number of traces written
+        """
+        traces: Dict[str, List[Span]] = {}
+        for span in self.spans(since_seq):
+            traces.setdefault(span.trace_id, []).append(span)
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a") as f:
+            for spans in traces.values():
+                f.write(json.dumps(_otlp_request(spans), separators=(",", ":")) + "\n")
+        return len(traces)
+
+
+class Tracer:
+    """Creates spans for client operations and hooks them into httpx.
+
+    A tracer with neither a collector nor metrics is disabled: span() is a
+    no-op and no httpx hooks are installed.
+
+    Args:
+        collector: Destination for finished spans (None: spans are not kept)
+        service_name: Reported as service.name in exported spans
+        metrics: ClientMetrics fed with every finished span (and cache lookups)
+
+    Example:
+        >>> collector = SpanCollector()
+        >>> client = DataKwipAPIClient(..., tracer=Tracer(collector))
+        >>> client.list_entities(org_id=1)
+        >>> print(collector.breakdown())
+    """
+
+    def __init__(
+        self,
+        collector: Optional[SpanCollector] = None,
+        service_name: str = "datakwip-client",
+        metrics: Optional["ClientMetrics"] = None,
+    ):
+        self.collector = collector
+        self.service_name = service_name
+        self.metrics = metrics
+
+    @property
+    def enabled(self) -> bool:
+        return self.collector is not None or self.metrics is not None
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time a block as a child of the current span (or as a new trace)."""
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            service=self.service_name,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if self.collector is not None:
+                self.collector.add(span)
+            if self.metrics is not None:
+                self.metrics.observe_span(span)
+
+    def cache_lookup(self, cache: str, hit: bool):
+        """Count a cache hit or miss (no-op without metrics)."""
+        if self.metrics is not None:
+            self.metrics.observe_cache(cache, hit)
+
+    def event_hooks(self) -> Dict[str, List[Callable]]:
+        """httpx event_hooks for a client (empty when disabled)."""
+        if not self.enabled:
+            return {}
+        return {"request": [self._on_request], "response": [self._on_response]}
+
+    def _on_request(self, request: httpx.Request):
+        span = _current_span.get()
+        if span is None:
+            return
+        span.attributes.update(
+            {
+                "http.method": request.method,
+                "http.url": str(request.url.copy_with(query=None)),
+                "net.connection.reused": True,
+            }
+        )
+        if self.collector is not None:
+            request.extensions["trace"] = self._on_trace
+
+    def _on_response(self, response: httpx.Response):
+        span = _current_span.get()
+        if span is not None:
+            span.attributes["http.status_code"] = response.status_code
+            span.attributes["http.flavor"] = response.http_version
+
+    def _on_trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback: turn started/complete pairs into phase spans."""
+        parent = _current_span.get()
+        if parent is None or self.collector is None:
+            return
+
+        event, _, stage = event_name.rpartition(".")
+        phase = HTTP_PHASES.get(event)
+        if phase is None:
+            return
+
+        now = time.time_ns()
+        if stage == "started":
+            parent._phase_starts[event] = now
+            if phase == "connect":
+                parent.attributes["net.connection.reused"] = False
+            return
+
+        start_ns = parent._phase_starts.pop(event, now)
+        self.collector.add(
+            Span(
+                name=phase,
+                trace_id=parent.trace_id,
+                span_id=secrets.token_hex(8),
+                parent_id=parent.span_id,
+                service=self.service_name,
+                start_ns=start_ns,
+                end_ns=now,
+                error=repr(info.get("exception")) if stage == "failed" else None,
+            )
+        )
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run a client method inside a root span of its tracer."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.tracer.span(span_name):
+                return func(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_request(spans: List[Span]) -> Dict[str, Any]:
+    """ExportTraceServiceRequest (OTLP/JSON) for the spans of one trace."""
+    otlp_spans = []
+    for span in spans:
+        otlp_span = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_id or "",
+            "name": span.name,
+            # SPAN_KIND_CLIENT for HTTP exchanges, SPAN_KIND_INTERNAL otherwise
+            "kind": 3 if span.name.startswith("http ") else 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+            # STATUS_CODE_OK / STATUS_CODE_ERROR
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        otlp_spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": spans[0].service}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": "clients.tracing"}, "spans": otlp_spans}],
+            }
+        ]
+    }
@@ -0,0 +1,179 @@
+"""Shared, tuned HTTP connection pools for the httpx-based clients.
+
+A TransportFactory owns one httpx connection pool (limits, keep-alive
+expiry, optional HTTP/2) and hands out SharedTransport handles to clients.
+Clients created from the same factory reuse each other's connections, so
+the API client, the MCP client and the token endpoint calls of many clients
+pay for TCP and TLS setup once per host instead of once per client. The pool
+is closed when the last client using it closes.
+
+Each handle counts requests, new TCP connections and TLS handshakes per host
+(via httpcore's ``trace`` extension, chained with the Tracer's callback), so
+connection reuse can be measured without request tracing.
+
+HTTP/2 needs the ``h2`` package (``pip install -e ".[http2]"``); it is only
+negotiated over TLS, plain-HTTP hosts keep using HTTP/1.1.
+
+With a Cassette, handles record every exchange, or replay recorded ones
+without opening a pool at all (see clients/cassette.py).
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .cassette import RECORD, REPLAY, Cassette
+
+
+class PoolConfig(BaseModel):
+    """Connection pool settings."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    http2: bool = False
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class ConnectionStats(BaseModel):
+    """Requests and connection setups for one host."""
+
+    requests: int = 0
+    new_connections: int = 0
+    tls_handshakes: int = 0
+    http2_requests: int = 0
+
+    @property
+    def reuse_rate(self) -> float:
+        """Fraction of requests sent on an already open connection."""
+        if not self.requests:
+            return 0.0
+        return max(self.requests - self.new_connections, 0) / self.requests
+
+
+class TransportFactory:
+    """One tuned connection pool shared by several clients.
+
+    Args:
+        pool: Pool limits, keep-alive expiry and HTTP/2 (default: PoolConfig())
+        verify: Verify TLS certificates
+        cassette: Record exchanges into, or replay them from, this cassette
+
+    Example:
+        >>> factory = TransportFactory(PoolConfig(http2=True, max_connections=20))
+        >>> api = DataKwipAPIClient(..., transport_factory=factory)
+        >>> mcp = DataKwipMCPClient(..., transport_factory=factory)
+        >>> print(factory.report())
+    """
+
+    def __init__(
+        self,
+        pool: Optional[PoolConfig] = None,
+        verify: bool = True,
+        cassette: Optional[Cassette] = None,
+    ):
+        self.pool = pool or PoolConfig()
+        self.verify = verify
+        self.cassette = cassette
+        self._transport: Optional[httpx.HTTPTransport] = None
+        self._users = 0
+        self._stats: Dict[str, ConnectionStats] = {}
+        self._lock = threading.Lock()
+
+    def transport(self) -> "SharedTransport":
+        """A handle on the shared pool for one client (closing it releases the handle)."""
+        with self._lock:
+            replaying = self.cassette is not None and self.cassette.mode == REPLAY
+            if self._transport is None and not replaying:
+                self._transport = httpx.HTTPTransport(
+                    verify=self.verify, http2=self.pool.http2, limits=self.pool.limits()
+                )
+            self._users += 1
+            return SharedTransport(self, self._transport)
+
+    def _release(self):
+        with self._lock:
+            self._users -= 1
+            if self._users == 0 and self._transport is not None:
+                self._transport.close()
+                self._transport = None
+
+    def _record(self, host: str, new_connection: bool, tls: bool, http_version: Optional[str]):
+        with self._lock:
+            stats = self._stats.setdefault(host, ConnectionStats())
+            stats.requests += 1
+            stats.new_connections += int(new_connection)
+            stats.tls_handshakes += int(tls)
+            stats.http2_requests += int(http_version == "HTTP/2")
+
+    def stats(self) -> Dict[str, ConnectionStats]:
+        """Copy of the per-host connection stats."""
+        with self._lock:
+            return {host: stats.model_copy() for host, stats in self._stats.items()}
+
+    def report(self) -> str:
+        """Printable per-host connection reuse summary."""
+        lines = [
+            f"{'Host':<28} {'requests':>8} {'new conn':>9} {'tls':>5} {'reuse':>7} {'http/2':>7}"
+        ]
+        for host, s in sorted(self.stats().items()):
+            lines.append(
+                f"{host:<28} {s.requests:>8} {s.new_connections:>9} {s.tls_handshakes:>5} "
+                f"{s.reuse_rate:>7.1%} {s.http2_requests:>7}"
+            )
+        return "\n".join(lines)
+
+
+class SharedTransport(httpx.BaseTransport):
+    """A client's handle on a TransportFactory pool; counts connection setups."""
+
+    def __init__(self, factory: TransportFactory, transport: Optional[httpx.HTTPTransport]):
+        self.factory = factory
+        self.transport = transport
+        self._closed = False
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        cassette = self.factory.cassette
+        if cassette is not None and cassette.mode == REPLAY:
+            response = cassette.play(request)
+            self.factory._record(
+                request.url.netloc.decode("ascii"), False, False, response.http_version
+            )
+            return response
+
+        setup = {"connect": False, "tls": False}
+        inner_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: Dict[str, Any]):
+            if event_name == "connection.connect_tcp.started":
+                setup["connect"] = True
+            elif event_name == "connection.start_tls.started":
+                setup["tls"] = True
+            if inner_trace is not None:
+                inner_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+        response = self.transport.handle_request(request)
+        self.factory._record(
+            request.url.netloc.decode("ascii"),
+            setup["connect"],
+            setup["tls"],
+            response.extensions.get("http_version", b"").decode("ascii") or None,
+        )
+        if cassette is not None and cassette.mode == RECORD:
+            response.read()
+            cassette.record(request, response)
+        return response
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.factory._release()
@@ -1,9 +1,13 @@
 """DataKwip UI client with Playwright automation."""
 
-from typing import Any, Dict, List, Optional
+import contextlib
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, List, Optional
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright, Browser, Page, BrowserContext
+if TYPE_CHECKING:
+    from playwright.sync_api import Browser, BrowserContext, Page
+
+    from .metrics import ClientMetrics
 
 
 class UITestError(Exception):
@@ -24,6 +28,8 @@ class DataKwipUIClient:
         browser_type: str = "chromium",
         timeout: int = 60000,
         screenshot_dir: Optional[str] = None,
+        storage_state: Optional[str] = None,
+        metrics: Optional["ClientMetrics"] = None,
     ):
         """Initialize UI client.
 
@@ -35,6 +41,9 @@ class DataKwipUIClient:
             browser_type: Browser type (chromium, firefox, webkit)
             timeout: Default timeout in milliseconds
             screenshot_dir: Directory to save screenshots on failure
+            storage_state: Saved browser storage state (cookies, local storage)
+                to start from, e.g. a session logged in by another worker
+            metrics: Optional ClientMetrics recording browser step timings
         """
         self.base_url = base_url.rstrip("/")
         self.username = username
@@ -43,14 +52,20 @@ class DataKwipUIClient:
         self.browser_type = browser_type
         self.timeout = timeout
         self.screenshot_dir = Path(screenshot_dir) if screenshot_dir else None
+        self.storage_state = storage_state
+        self.metrics = metrics
 
         self._playwright = None
-        self._browser: Optional[Browser] = None
-        self._context: Optional[BrowserContext] = None
-        self._page: Optional[Page] = None
+        self._browser: Optional["Browser"] = None
+        self._context: Optional["BrowserContext"] = None
+        self._page: Optional["Page"] = None
+        self._logged_in = False  # This context went through login() successfully
 
     def start(self):
         """Start Playwright and browser."""
+        # Playwright loads when a browser is started, not when this module is imported
+        from playwright.sync_api import sync_playwright
+
         self._playwright = sync_playwright().start()
 
         # Get browser launcher
@@ -66,10 +81,15 @@ class DataKwipUIClient:
         # Launch browser
         self._browser = launcher.launch(headless=self.headless)
 
+        self._open_context()
+
+    def _open_context(self):
+        """Create the browser context and page (from storage_state if set)."""
         # Create context with reasonable viewport
         self._context = self._browser.new_context(
             viewport={"width": 1920, "height": 1080},
             ignore_https_errors=True,  # Allow self-signed certs in dev
+            storage_state=self.storage_state,
         )
 
         # Set default timeout
@@ -78,6 +98,12 @@ class DataKwipUIClient:
         # Create page
         self._page = self._context.new_page()
 
+    def _step(self, name: str) -> ContextManager[None]:
+        """Time a browser step into metrics (no-op without metrics)."""
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.browser_step(name)
+
     def _save_screenshot(self, name: str):
         """Save screenshot on failure."""
         if self.screenshot_dir and self._page:
@@ -86,9 +112,33 @@ class DataKwipUIClient:
             self._page.screenshot(path=str(screenshot_path))
             print(f"Screenshot saved: {screenshot_path}")
 
-    def login(self) -> bool:
+    def save_storage_state(self, path: str) -> str:
+        """Save cookies and local storage so other browsers can reuse this session.
+
+        Args:
+            path: JSON file to write
+
+        Returns:
+            The path written
+        """
+        if not self._context:
+            raise UITestError("Browser not started. Call start() first.")
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._context.storage_state(path=path)
+        return path
+
+    def login(self, reuse_session: bool = True) -> bool:
         """Login to DataKwip UI via Keycloak.
 
+        When the browser already holds a valid session (restored from
+        storage_state, or from an earlier login() of this client), the Keycloak
+        form is skipped, so repeated calls only cost a page load.
+
+        Args:
+            reuse_session: Accept an existing session (False always goes
+                through the login form)
+
         Returns:
             True if login successful
 
@@ -98,22 +148,41 @@ class DataKwipUIClient:
         if not self._page:
             raise UITestError("Browser not started. Call start() first.")
 
+        has_session = bool(self.storage_state) or self._logged_in
+        if has_session and not reuse_session:
+            # Drop the existing session so the form is actually exercised
+            self._context.close()
+            self.storage_state = None
+            self._logged_in = False
+            self._open_context()
+
         try:
             # Navigate to home page
-            self._page.goto(self.base_url)
+            with self._step("page_load"):
+                self._page.goto(self.base_url)
+
+            # Existing session still valid: no redirect to Keycloak
+            if self.storage_state or self._logged_in:
+                with self._step("session_check"):
+                    self._page.wait_for_load_state("networkidle")
+                if "realms/datakwip" not in self._page.url:
+                    return True
 
-            # Wait for redirect to Keycloak login page
-            self._page.wait_for_url("**/realms/datakwip/protocol/openid-connect/**", timeout=10000)
+            with self._step("keycloak_login"):
+                # Wait for redirect to Keycloak login page
+                self._page.wait_for_url(
+                    "**/realms/datakwip/protocol/openid-connect/**", timeout=10000
+                )
 
-            # Fill login form
-            self._page.fill('input[name="username"]', self.username)
-            self._page.fill('input[name="password"]', self.password)
+                # Fill login form
+                self._page.fill('input[name="username"]', self.username)
+                self._page.fill('input[name="password"]', self.password)
 
-            # Submit form
-            self._page.click('input[type="submit"]')
+                # Submit form
+                self._page.click('input[type="submit"]')
 
-            # Wait for redirect back to app
-            self._page.wait_for_url(f"{self.base_url}/**", timeout=10000)
+                # Wait for redirect back to app
+                self._page.wait_for_url(f"{self.base_url}/**", timeout=10000)
 
             # Verify we're logged in (check for logout button or user menu)
             # This depends on your UI structure
@@ -125,6 +194,7 @@ class DataKwipUIClient:
                 if "realms/datakwip" in current_url:
                     raise UITestError("Still on login page after submission")
 
+            self._logged_in = True
             return True
 
         except Exception as e:
@@ -144,12 +214,13 @@ class DataKwipUIClient:
             raise UITestError("Browser not started. Call start() first.")
 
         try:
-            # Click on Data Explorer link/button
-            # Adjust selector based on your UI structure
-            self._page.click('a[href*="data-explorer"], a:has-text("Data Explorer")')
+            with self._step("navigate_data_explorer"):
+                # Click on Data Explorer link/button
+                # Adjust selector based on your UI structure
+                self._page.click('a[href*="data-explorer"], a:has-text("Data Explorer")')
 
-            # Wait for page load
-            self._page.wait_for_load_state("networkidle")
+                # Wait for page load
+                self._page.wait_for_load_state("networkidle")
 
             # Verify we're on the right page
             current_url = self._page.url
@@ -178,15 +249,16 @@ class DataKwipUIClient:
             raise UITestError("Browser not started. Call start() first.")
 
         try:
-            if query:
-                # Fill query input
-                self._page.fill('textarea[name="query"], input[name="query"]', query)
+            with self._step("execute_query"):
+                if query:
+                    # Fill query input
+                    self._page.fill('textarea[name="query"], input[name="query"]', query)
 
-            # Click execute/run button
-            self._page.click('button:has-text("Execute"), button:has-text("Run")')
+                # Click execute/run button
+                self._page.click('button:has-text("Execute"), button:has-text("Run")')
 
-            # Wait for results to load
-            self._page.wait_for_selector('[data-testid="query-results"]', timeout=15000)
+                # Wait for results to load
+                self._page.wait_for_selector('[data-testid="query-results"]', timeout=15000)
 
             # Extract results count or other metadata
             # Adjust selectors based on your UI structure
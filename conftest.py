@@ -1,20 +1,61 @@
 """Pytest configuration and fixtures."""
 
 import os
+from datetime import datetime
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, Dict, Generator, List, Optional
+from urllib.parse import urlparse
 
 import pytest
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
 from clients import (
+    Cassette,
+    ClientMetrics,
     DataKwipAPIClient,
     DataKwipMCPClient,
-    DataKwipUIClient,
-    KeycloakAdminClient,
+    CircuitBreaker,
+    MetricsRegistry,
+    MetricsServer,
+    PoolConfig,
+    RequestGovernor,
+    Resilience,
+    RetryPolicy,
+    SpanCollector,
+    Tracer,
+    TransportFactory,
 )
 
+from clients.api_client import TokenCache
+from fixtures.latency import LatencyBudget, LatencyRecorder
+from fixtures.parallel import (
+    DURATIONS_CACHE_KEY,
+    DurationRecorder,
+    SharedSessionCache,
+    marker_group,
+)
+
+# Browser and Keycloak clients are imported by their fixtures only; Playwright
+# and python-keycloak load when such a client starts (not for pytest -m api)
+if TYPE_CHECKING:
+    from clients import AsyncKeycloakAdminClient, DataKwipUIClient, KeycloakAdminClient
+    from fixtures.db_stats import DatabaseTime, StatementSampler
+    from fixtures.fake_stack import FakeStack
+    from fixtures.history import Regression
+
+# Latency regressions found by the benchmark history (reported at session end)
+regressions_key = pytest.StashKey[List["Regression"]]()
+
+# Request spans of the session, and the newest span seen when each test started
+trace_collector_key = pytest.StashKey[SpanCollector]()
+trace_start_key = pytest.StashKey[int]()
+
+# pg_stat_statements sampler (DB_STATS=true), and each test's database time
+db_stats_sampler_key = pytest.StashKey["StatementSampler"]()
+db_time_key = pytest.StashKey["DatabaseTime"]()
+db_stats_top_key = pytest.StashKey[int]()
+
 
 class TestConfig(BaseSettings):
     """Test configuration from environment variables."""
@@ -48,6 +89,95 @@ class TestConfig(BaseSettings):
     test_entity_limit: int = 10
     test_tag_limit: int = 20
 
+    # Database (optional, for test data setup)
+    database_url: Optional[str] = None
+
+    # Open-loop stress tests (requests/second and phase durations in seconds)
+    stress_rate: float = 5.0
+    stress_duration: float = 10.0
+    stress_ramp: float = 2.0
+    stress_workers: int = 16
+
+    # Latency sampling and per-endpoint percentile budgets (milliseconds)
+    latency_samples: int = 20
+    latency_warmup: int = 2
+    latency_budgets: Dict[str, LatencyBudget] = {
+        "get_database_health": LatencyBudget(p50=500, p95=1000, p99=2000),
+        "list_entities": LatencyBudget(p50=250, p95=500, p99=1000),
+        "list_entity_tags": LatencyBudget(p50=400, p95=800, p99=1600),
+        "list_tools": LatencyBudget(p50=500, p95=1000, p99=2000),
+        "query_entities": LatencyBudget(p50=250, p95=500, p99=1000),
+        "get_current_values": LatencyBudget(p50=500, p95=1000, p99=2000),
+        # Write-to-visible lag of marker points (fixtures/freshness.py)
+        "freshness_mcp": LatencyBudget(p95=30000),
+        "freshness_api": LatencyBudget(p95=30000),
+    }
+    latency_results_dir: Optional[str] = None
+
+    # Data freshness probe (markers written via DATABASE_URL)
+    freshness_samples: int = 3
+    freshness_interval: float = 1.0
+    freshness_timeout: float = 60.0
+
+    # /health/databases sampling (seconds between polls)
+    health_sample_interval: float = 0.1
+
+    # Per-test database time from pg_stat_statements (needs DATABASE_URL)
+    db_stats: bool = False
+    db_stats_role: Optional[str] = None  # Only count the API's database role
+    db_stats_top: int = 5
+
+    # Database ground-truth verification (rows per API/MCP page while streaming)
+    ground_truth_page_size: int = 1000
+
+    # Multi-org sweep (orgs from core.org, or the fake stack's orgs)
+    sweep_workers: int = 4
+    sweep_samples: int = 3
+
+    # Token endpoint throughput per grant type (closed loop, seconds per concurrency level)
+    token_bench_levels: List[int] = [1, 4]
+    token_bench_duration: float = 1.0
+
+    # Benchmark history (SQLite) and p95 regression detection
+    benchmark_db: Optional[str] = None
+    benchmark_environment: Optional[str] = None  # Default: API hostname
+    benchmark_dataset_size: Optional[int] = None
+    benchmark_watch: List[str] = ["list_entities", "query_entities", "ui_login"]
+    benchmark_baseline_runs: int = 10
+    benchmark_regression_threshold: float = 0.2
+    benchmark_fail_on_regression: bool = True
+
+    # Client request tracing (per-phase spans; optional OTLP/JSON export)
+    trace_requests: bool = True
+    trace_export_path: Optional[str] = None
+
+    # Prometheus metrics: /metrics on localhost and/or a textfile-collector file (off unless set)
+    metrics_port: Optional[int] = None  # xdist workers use port + 1 + worker number
+    metrics_textfile: Optional[str] = None  # Written at session end (one file per worker)
+
+    # Retries (idempotent calls, jittered exponential backoff) and circuit breaking
+    retry_max_attempts: int = 3
+    retry_backoff_base: float = 0.2
+    retry_backoff_max: float = 5.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_timeout: float = 30.0
+
+    # Client-side rate/concurrency governor shared by all clients (off unless set)
+    governor_rate: Optional[float] = None  # Requests/second per host
+    governor_burst: int = 5
+    governor_max_in_flight: Optional[int] = None
+    governor_host_rates: Dict[str, float] = {}  # Per host[:port] overrides
+
+    # Connection pool shared by the API and MCP clients (HTTP/2 needs the http2 extra)
+    http2: bool = False
+    pool_max_connections: int = 100
+    pool_max_keepalive: int = 20
+    pool_keepalive_expiry: float = 30.0
+
+    # Parallel runs (pytest-xdist): share tokens and browser login across workers
+    share_session_resources: bool = True
+    ui_storage_state_ttl: int = 300  # Seconds a shared browser session is reused
+
     # Timeouts
     api_timeout: int = 30
     mcp_timeout: int = 30
@@ -63,10 +193,226 @@ class TestConfig(BaseSettings):
         env_file = ".env"
         case_sensitive = False
 
+    def resilience(self, name: str) -> Resilience:
+        """Retry and circuit breaker policy for one service client."""
+        return Resilience(
+            RetryPolicy(
+                max_attempts=self.retry_max_attempts,
+                backoff_base=self.retry_backoff_base,
+                backoff_max=self.retry_backoff_max,
+            ),
+            CircuitBreaker(
+                name,
+                failure_threshold=self.circuit_failure_threshold,
+                reset_timeout=self.circuit_reset_timeout,
+            ),
+        )
+
+
+def pytest_addoption(parser):
+    """Register DataKwip command line options."""
+    group = parser.getgroup("datakwip")
+    group.addoption(
+        "--fake-stack",
+        action="store_true",
+        default=False,
+        help="Run against local stand-in API/MCP/Keycloak servers instead of Railway",
+    )
+    group.addoption(
+        "--fake-stack-entities",
+        type=int,
+        default=1000,
+        help="Entities per organization served by the fake stack",
+    )
+    group.addoption(
+        "--fake-stack-latency-ms",
+        type=float,
+        default=0.0,
+        help="Latency injected into every fake stack response",
+    )
+    group.addoption(
+        "--record-cassette",
+        metavar="PATH",
+        help="Record the API/MCP HTTP exchanges of this run into a cassette file",
+    )
+    group.addoption(
+        "--replay-cassette",
+        metavar="PATH",
+        help="Serve API/MCP requests from a recorded cassette (offline; "
+        "Keycloak admin and UI tests are skipped)",
+    )
+    group.addoption(
+        "--shard-by-marker",
+        action="store_true",
+        default=False,
+        help="With -n: group tests by marker (ui, auth, api, mcp) into shards "
+        "balanced by the durations of earlier runs",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Record test durations for sharding; use xdist group scheduling when sharding by marker."""
+    if not hasattr(config, "workerinput") and config.pluginmanager.has_plugin("cacheprovider"):
+        # The controller sees every worker's reports
+        config.pluginmanager.register(DurationRecorder(config), "datakwip-durations")
+
+    if config.getoption("--shard-by-marker") and getattr(config.option, "numprocesses", None):
+        # Workers append the xdist_group to node IDs only in loadgroup mode
+        config.option.dist = "loadgroup"
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Duration-balanced marker shards (--shard-by-marker)."""
+    if not config.getoption("--shard-by-marker"):
+        return None
+
+    from fixtures.sharding import MarkerShardScheduling
+
+    cache = getattr(config, "cache", None)
+    durations = cache.get(DURATIONS_CACHE_KEY, {}) if cache is not None else {}
+    return MarkerShardScheduling(config, log, durations=durations)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Group tests by marker for sharding; skip tests the fake stack or a cassette cannot serve."""
+    if config.getoption("--shard-by-marker"):
+        # Must run before xdist's own hook, which turns the group into a node ID suffix
+        for item in items:
+            if not item.get_closest_marker("xdist_group"):
+                item.add_marker(pytest.mark.xdist_group(marker_group(item.keywords)))
+
+    if config.getoption("--replay-cassette"):
+        # Only API/MCP traffic is recorded (python-keycloak and the browser bypass httpx)
+        skip_offline = pytest.mark.skip(
+            reason="Keycloak admin and UI traffic is not in the cassette"
+        )
+        # Stress tests run for a fixed duration; against recorded responses they measure nothing
+        skip_slow = pytest.mark.skip(reason="Slow (fixed-duration) tests are not replayed")
+        offline_fixtures = {"ui_client", "auth_client", "async_auth_client"}
+        for item in items:
+            fixtures = set(getattr(item, "fixturenames", ()))
+            if {"ui", "auth", "integration"} & set(item.keywords) or offline_fixtures & fixtures:
+                item.add_marker(skip_offline)
+            elif "slow" in item.keywords:
+                item.add_marker(skip_slow)
+
+    if not config.getoption("--fake-stack"):
+        return
+
+    skip_ui = pytest.mark.skip(reason="UI is not served by the fake stack")
+    for item in items:
+        if "ui" in item.keywords or "ui_client" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip_ui)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Fail the build when the benchmark history flagged a latency regression."""
+    if session.config.stash.get(regressions_key, None) and exitstatus == 0:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """Report the tests with most database time, and benchmark history latency regressions."""
+    db_times = []
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            properties = dict(getattr(report, "user_properties", ()))
+            if getattr(report, "when", None) == "call" and "db_time_ms" in properties:
+                db_times.append(
+                    (properties["db_time_ms"], properties["db_other_ms"], report.nodeid)
+                )
+    if db_times:
+        terminalreporter.section("database time (pg_stat_statements)")
+        terminalreporter.line(f"{'DB':>10} {'other':>10}  test")
+        for db_ms, other_ms, nodeid in sorted(db_times, reverse=True)[:10]:
+            terminalreporter.line(f"{db_ms:>8.1f}ms {other_ms:>8.1f}ms  {nodeid}")
+
+    regressions = config.stash.get(regressions_key, None)
+    if not regressions:
+        return
+
+    terminalreporter.section("latency regressions", red=True)
+    for regression in regressions:
+        terminalreporter.line(f"✗ {regression}", red=True)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """Remember where this test's request spans start; snapshot pg_stat_statements around it."""
+    collector = item.config.stash.get(trace_collector_key, None)
+    if collector is not None:
+        item.stash[trace_start_key] = collector.last_seq
+
+    sampler = item.config.stash.get(db_stats_sampler_key, None)
+    before = None
+    if sampler is not None:
+        try:
+            before = sampler.snapshot()
+        except Exception as e:
+            print(f"Warning: pg_stat_statements snapshot failed: {e}")
+
+    yield
+
+    if before is not None:
+        try:
+            item.stash[db_time_key] = sampler.diff(before, sampler.snapshot())
+        except Exception as e:
+            print(f"Warning: pg_stat_statements snapshot failed: {e}")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach database time to every test, and a traced request breakdown to failed tests."""
+    outcome = yield
+    report = outcome.get_result()
+    if report.when != "call":
+        return
+
+    db_time = item.stash.get(db_time_key, None)
+    if db_time is not None:
+        top = item.config.stash[db_stats_top_key]
+        report.sections.append(("Database time", db_time.format(top)))
+        report.user_properties.append(("db_time_ms", round(db_time.db_ms, 1)))
+        report.user_properties.append(("db_other_ms", round(db_time.other_ms, 1)))
+
+    if not report.failed:
+        return
+
+    collector = item.config.stash.get(trace_collector_key, None)
+    since = item.stash.get(trace_start_key, 0)
+    if collector is not None and collector.spans(since):
+        report.sections.append(("Request trace breakdown", collector.breakdown(since)))
+
+
+@pytest.fixture(scope="session")
+def fake_stack(request) -> Generator[Optional["FakeStack"], None, None]:
+    """Start the local fake stack when --fake-stack is given (None otherwise)."""
+    if not request.config.getoption("--fake-stack"):
+        yield None
+        return
+
+    from fixtures.fake_stack import FakeStack, FakeStackConfig
+
+    stack = FakeStack(
+        FakeStackConfig(
+            entities_per_org=request.config.getoption("--fake-stack-entities"),
+            latency_ms=request.config.getoption("--fake-stack-latency-ms"),
+        )
+    )
+    stack.start()
+    yield stack
+    stack.stop()
+
 
 @pytest.fixture(scope="session")
-def config() -> TestConfig:
+def config(fake_stack) -> TestConfig:
     """Load test configuration from environment."""
+    if fake_stack is not None:
+        return TestConfig(**fake_stack.settings())
+
     # Load .env file
     env_path = Path(__file__).parent / ".env"
     if env_path.exists():
@@ -82,7 +428,148 @@ def config() -> TestConfig:
 
 
 @pytest.fixture(scope="session")
-def api_client(config: TestConfig) -> Generator[DataKwipAPIClient, None, None]:
+def trace_collector(request, config: TestConfig) -> Generator[Optional[SpanCollector], None, None]:
+    """Collector for client request spans (None when TRACE_REQUESTS=false).
+
+    With TRACE_EXPORT_PATH set, spans are written there as OTLP/JSON at the
+    end of the session (one file per xdist worker).
+    """
+    if not config.trace_requests:
+        yield None
+        return
+
+    collector = SpanCollector()
+    request.config.stash[trace_collector_key] = collector
+    yield collector
+
+    if config.trace_export_path:
+        path = Path(config.trace_export_path)
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        if worker:
+            path = path.with_name(f"{path.stem}-{worker}{path.suffix}")
+        traces = collector.export_otlp_json(path)
+        print(f"\n✓ {traces} request traces exported to {path}")
+
+
+@pytest.fixture(scope="session")
+def request_governor(config: TestConfig) -> Generator[Optional[RequestGovernor], None, None]:
+    """Rate and concurrency governor shared by all clients (None when not configured)."""
+    if not (config.governor_rate or config.governor_host_rates or config.governor_max_in_flight):
+        yield None
+        return
+
+    governor = RequestGovernor(
+        rate=config.governor_rate,
+        burst=config.governor_burst,
+        max_in_flight=config.governor_max_in_flight,
+        host_rates=config.governor_host_rates,
+    )
+    yield governor
+    if governor.stats():
+        print(f"\nRequest governor (throttled vs server time):\n{governor.report()}")
+
+
+@pytest.fixture(scope="session")
+def cassette(request) -> Generator[Optional[Cassette], None, None]:
+    """Cassette to record into (--record-cassette) or replay from (--replay-cassette), else None."""
+    record_path = request.config.getoption("--record-cassette")
+    replay_path = request.config.getoption("--replay-cassette")
+    if record_path and replay_path:
+        raise pytest.UsageError("Use either --record-cassette or --replay-cassette")
+    if replay_path:
+        yield Cassette(replay_path, mode="replay")
+        return
+    if not record_path:
+        yield None
+        return
+
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        raise pytest.UsageError("Record cassettes in a serial run (without -n)")
+    recorder = Cassette(record_path, mode="record")
+    yield recorder
+    recorder.save()
+    print(f"\n✓ {len(recorder)} HTTP exchanges recorded to {record_path}")
+
+
+@pytest.fixture(scope="session")
+def transport_factory(
+    config: TestConfig, cassette: Optional[Cassette]
+) -> Generator[TransportFactory, None, None]:
+    """Connection pool shared by the API and MCP clients; prints reuse rates at the end."""
+    factory = TransportFactory(
+        PoolConfig(
+            max_connections=config.pool_max_connections,
+            max_keepalive_connections=config.pool_max_keepalive,
+            keepalive_expiry=config.pool_keepalive_expiry,
+            http2=config.http2,
+        ),
+        cassette=cassette,
+    )
+    yield factory
+    if factory.stats():
+        print(f"\nConnection reuse:\n{factory.report()}")
+
+
+@pytest.fixture(scope="session")
+def client_metrics(
+    config: TestConfig,
+    request_governor: Optional[RequestGovernor],
+    transport_factory: TransportFactory,
+) -> Generator[Optional[ClientMetrics], None, None]:
+    """Prometheus metrics of all clients (None unless METRICS_PORT or METRICS_TEXTFILE is set).
+
+    Served on http://127.0.0.1:METRICS_PORT/metrics during the session and/or
+    written to METRICS_TEXTFILE at the end (per xdist worker, with a worker label).
+    """
+    if config.metrics_port is None and not config.metrics_textfile:
+        yield None
+        return
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    metrics = ClientMetrics(MetricsRegistry({"worker": worker} if worker else None))
+    metrics.track_transport(transport_factory)
+    if request_governor is not None:
+        metrics.track_governor(request_governor)
+
+    server = None
+    if config.metrics_port is not None:
+        port = config.metrics_port + (int(worker[2:]) + 1 if worker else 0)
+        server = MetricsServer(metrics.registry, port=port).start()
+        print(f"\n✓ Metrics at {server.url}")
+
+    yield metrics
+
+    if server is not None:
+        server.stop()
+    if config.metrics_textfile:
+        path = Path(config.metrics_textfile)
+        if worker:
+            path = path.with_name(f"{path.stem}-{worker}{path.suffix}")
+        metrics.registry.write_textfile(path)
+        print(f"\n✓ Metrics written to {path}")
+
+
+@pytest.fixture(scope="session")
+def shared_session_cache(
+    config: TestConfig, tmp_path_factory, client_metrics: Optional[ClientMetrics]
+) -> Optional[SharedSessionCache]:
+    """Cache shared by all xdist workers of this run (None in serial runs or when disabled)."""
+    if not config.share_session_resources or not os.environ.get("PYTEST_XDIST_WORKER"):
+        return None
+
+    # Workers get <root>/popen-gwN as basetemp; the root is common to all of them
+    return SharedSessionCache(tmp_path_factory.getbasetemp().parent, metrics=client_metrics)
+
+
+@pytest.fixture(scope="session")
+def api_client(
+    config: TestConfig,
+    trace_collector: Optional[SpanCollector],
+    shared_session_cache: Optional[SharedSessionCache],
+    request_governor: Optional[RequestGovernor],
+    transport_factory: TransportFactory,
+    client_metrics: Optional[ClientMetrics],
+) -> Generator[DataKwipAPIClient, None, None]:
     """Create DataKwip API client."""
     client = DataKwipAPIClient(
         base_url=config.railway_api_url,
@@ -92,25 +579,95 @@ def api_client(config: TestConfig) -> Generator[DataKwipAPIClient, None, None]:
         username=config.functional_test_user_email,
         password=config.functional_test_user_password,
         timeout=config.api_timeout,
+        tracer=Tracer(trace_collector, service_name="datakwip-api-client", metrics=client_metrics),
+        resilience=config.resilience("api"),
+        governor=request_governor,
+        transport_factory=transport_factory,
     )
+    if client_metrics is not None:
+        client_metrics.track_resilience("api", client.resilience)
+
+    if shared_session_cache is not None:
+        # One password grant for all workers
+        def fetch_token():
+            token = client.get_token_cache()
+            remaining = (token.expires_at - datetime.now()).total_seconds()
+            # A minute of slack, but never stale on arrival with short-lived (<= 60s) tokens
+            ttl = max(remaining * 0.8, remaining - 60)
+            return token.model_dump(mode="json"), ttl
+
+        key = f"api_token:{config.oauth2_token_url}:{config.functional_test_user_email}"
+        client.set_token_cache(TokenCache(**shared_session_cache.get_or_create(key, fetch_token)))
+
     yield client
     client.close()
 
 
 @pytest.fixture(scope="session")
-def mcp_client(config: TestConfig) -> Generator[DataKwipMCPClient, None, None]:
+def mcp_client(
+    config: TestConfig,
+    trace_collector: Optional[SpanCollector],
+    request_governor: Optional[RequestGovernor],
+    transport_factory: TransportFactory,
+    client_metrics: Optional[ClientMetrics],
+) -> Generator[DataKwipMCPClient, None, None]:
     """Create DataKwip MCP client."""
     client = DataKwipMCPClient(
         base_url=config.railway_mcp_url,
         timeout=config.mcp_timeout,
+        tracer=Tracer(trace_collector, service_name="datakwip-mcp-client", metrics=client_metrics),
+        resilience=config.resilience("mcp"),
+        governor=request_governor,
+        transport_factory=transport_factory,
     )
+    if client_metrics is not None:
+        client_metrics.track_resilience("mcp", client.resilience)
     yield client
     client.close()
 
 
+@pytest.fixture(scope="session")
+def ui_storage_state(
+    config: TestConfig, shared_session_cache: Optional[SharedSessionCache], tmp_path_factory
+) -> Optional[str]:
+    """Browser storage state of a logged-in session, created once for all workers.
+
+    UI clients start from it so their login() skips the Keycloak form.
+    None in serial runs or when SHARE_SESSION_RESOURCES=false.
+    """
+    if shared_session_cache is None:
+        return None
+
+    def log_in():
+        from clients import DataKwipUIClient
+
+        path = str(tmp_path_factory.getbasetemp().parent / "ui-storage-state.json")
+        client = DataKwipUIClient(
+            base_url=config.railway_ui_url,
+            username=config.functional_test_user_email,
+            password=config.functional_test_user_password,
+            headless=config.headless_browser,
+            browser_type=config.browser_type,
+            timeout=config.ui_timeout * 1000,
+        )
+        try:
+            client.start()
+            client.login()
+            client.save_storage_state(path)
+        finally:
+            client.close()
+        return path, config.ui_storage_state_ttl
+
+    return shared_session_cache.get_or_create(f"ui_storage_state:{config.railway_ui_url}", log_in)
+
+
 @pytest.fixture(scope="function")
-def ui_client(config: TestConfig) -> Generator[DataKwipUIClient, None, None]:
+def ui_client(
+    config: TestConfig, ui_storage_state: Optional[str], client_metrics: Optional[ClientMetrics]
+) -> Generator["DataKwipUIClient", None, None]:
     """Create DataKwip UI client (function-scoped for isolation)."""
+    from clients import DataKwipUIClient
+
     screenshot_dir = None
     if config.screenshot_on_failure:
         screenshot_dir = str(Path(__file__).parent / "screenshots")
@@ -123,20 +680,192 @@ def ui_client(config: TestConfig) -> Generator[DataKwipUIClient, None, None]:
         browser_type=config.browser_type,
         timeout=config.ui_timeout * 1000,  # Convert to milliseconds
         screenshot_dir=screenshot_dir,
+        storage_state=ui_storage_state,
+        metrics=client_metrics,
     )
     yield client
     client.close()
 
 
 @pytest.fixture(scope="session")
-def auth_client(config: TestConfig) -> Generator[KeycloakAdminClient, None, None]:
+def auth_client(
+    config: TestConfig,
+    shared_session_cache: Optional[SharedSessionCache],
+    request_governor: Optional[RequestGovernor],
+) -> Generator["KeycloakAdminClient", None, None]:
     """Create Keycloak admin client."""
+    from clients import KeycloakAdminClient
+
     client = KeycloakAdminClient(
         server_url=config.keycloak_base_url,
         realm_name=config.keycloak_realm,
         admin_username=config.keycloak_admin,
         admin_password=config.keycloak_admin_password,
         verify=False,  # Allow self-signed certs in dev
+        governor=request_governor,
     )
+
+    if shared_session_cache is not None:
+        # One admin login for all workers; each connect() starts from this token
+        def log_in():
+            client.connect()
+            token = client.admin_token
+            return token, token.get("expires_in", 60) / 2
+
+        key = f"keycloak_admin_token:{config.keycloak_base_url}:{config.keycloak_admin}"
+        client.token = shared_session_cache.get_or_create(key, log_in)
+
     yield client
     client.close()
+
+
+@pytest.fixture(scope="function")
+async def async_auth_client(
+    config: TestConfig, request_governor: Optional[RequestGovernor]
+) -> AsyncGenerator["AsyncKeycloakAdminClient", None]:
+    """Create async Keycloak admin client (function-scoped, bound to the test's event loop)."""
+    from clients import AsyncKeycloakAdminClient
+
+    client = AsyncKeycloakAdminClient(
+        server_url=config.keycloak_base_url,
+        realm_name=config.keycloak_realm,
+        admin_username=config.keycloak_admin,
+        admin_password=config.keycloak_admin_password,
+        verify=False,  # Allow self-signed certs in dev
+        timeout=config.auth_timeout,
+        governor=request_governor,
+    )
+    yield client
+    await client.close()
+
+
+@pytest.fixture(scope="session")
+def db_test_user(config: TestConfig) -> Dict[str, Any]:
+    """Ensure the functional test user exists in core.user and is linked to the test org.
+
+    Requires DATABASE_URL; skips otherwise. Tests against the live database
+    request it (``request.getfixturevalue("db_test_user")`` where only their
+    live branch needs it), so the user setup runs once per session.
+    """
+    if not config.database_url:
+        pytest.skip("DATABASE_URL not set")
+
+    from create_test_user_in_db import create_test_user_in_database
+
+    return create_test_user_in_database(
+        database_url=config.database_url,
+        email=config.functional_test_user_email,
+        org_id=config.test_org_id,
+    )
+
+
+@pytest.fixture(scope="session", autouse=True)
+def db_stats_sampler(
+    request, config: TestConfig
+) -> Generator[Optional["StatementSampler"], None, None]:
+    """pg_stat_statements sampler when DB_STATS=true (None otherwise).
+
+    While it is active, each test's call phase is bracketed by snapshots; the
+    diff is attached to the test report as a "Database time" section and as
+    db_time_ms / db_other_ms user properties (JUnit XML).
+    """
+    if not config.db_stats:
+        yield None
+        return
+    if not config.database_url:
+        print("Warning: DB_STATS needs DATABASE_URL; database time is not recorded")
+        yield None
+        return
+
+    from fixtures import database
+    from fixtures.db_stats import StatementSampler
+
+    try:
+        sampler = StatementSampler(database.connect(config.database_url), role=config.db_stats_role)
+    except Exception as e:
+        print(f"Warning: database time is not recorded: {e}")
+        yield None
+        return
+
+    request.config.stash[db_stats_sampler_key] = sampler
+    request.config.stash[db_stats_top_key] = config.db_stats_top
+    yield sampler
+    del request.config.stash[db_stats_sampler_key]
+    sampler.close()
+
+
+@pytest.fixture(scope="session")
+def ground_truth(config: TestConfig, fake_stack) -> Generator[Optional[Callable], None, None]:
+    """Ground-truth digests per (kind, org_id) for fixtures.ground_truth.verify.
+
+    Computed in Postgres through a connection pool when DATABASE_URL is set,
+    streamed from the synthetic dataset with --fake-stack, None otherwise.
+    """
+    from fixtures import ground_truth as gt
+
+    if fake_stack is not None:
+        dataset = fake_stack.dataset
+        yield gt.stream_truth(
+            {gt.ENTITIES: dataset.entities, gt.TAGS: dataset.tags}, config.ground_truth_page_size
+        )
+        return
+    if not config.database_url:
+        yield None
+        return
+
+    from fixtures import database
+
+    pool = database.connection_pool(config.database_url, minconn=1, maxconn=4)
+    yield gt.database_truth(pool)
+    pool.closeall()
+
+
+@pytest.fixture(scope="session")
+def latency_recorder(
+    request, config: TestConfig, fake_stack
+) -> Generator[LatencyRecorder, None, None]:
+    """Session-wide latency histograms, one per measured operation.
+
+    With LATENCY_RESULTS_DIR set, histograms are written there per xdist
+    worker; LatencyRecorder.load_dir() merges them. With BENCHMARK_DB set, the
+    run is stored in the benchmark history and checked for p95 regressions
+    (xdist workers only write results; record the merged directory with
+    bench_history.py).
+    """
+    recorder = LatencyRecorder()
+    yield recorder
+
+    if not recorder.histograms:
+        return
+
+    print(f"\n{recorder.report()}")
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if config.latency_results_dir:
+        recorder.save(Path(config.latency_results_dir) / f"{worker or 'main'}.json")
+
+    if config.benchmark_db and worker is None:
+        from fixtures.history import BenchmarkHistory
+
+        environment = config.benchmark_environment
+        dataset_size = config.benchmark_dataset_size
+        if fake_stack is not None:
+            environment = environment or f"fake-stack ({fake_stack.config.latency_ms:g}ms)"
+            dataset_size = dataset_size or fake_stack.config.entities_per_org
+        else:
+            environment = environment or urlparse(config.railway_api_url).hostname
+
+        with BenchmarkHistory(config.benchmark_db) as history:
+            run_id = history.record_run(
+                recorder, environment=environment, dataset_size=dataset_size
+            )
+            regressions = history.detect_regressions(
+                run_id,
+                config.benchmark_watch,
+                window=config.benchmark_baseline_runs,
+                threshold=config.benchmark_regression_threshold,
+            )
+        print(f"✓ Benchmark run {run_id} recorded in {config.benchmark_db}")
+        if regressions and config.benchmark_fail_on_regression:
+            request.config.stash[regressions_key] = regressions
+        for regression in regressions:
+            print(f"✗ Latency regression: {regression}")
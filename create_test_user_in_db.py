@@ -4,7 +4,11 @@ Create functional test user in DataKwip database and link to org_id=1
 This script:
 1. Gets the Keycloak UUID for the test user
 2. Creates the user in core.user table (if not exists)
-3. Links the user to org_id=1 in org_user table
+3. Links the user to org_id=1 in org_user table (and org_admin)
+
+Steps 2-3 run as one INSERT ... ON CONFLICT statement in one transaction,
+so the whole database setup is a single round trip and safe to re-run.
+Fixtures can call create_test_user_in_database() directly.
 
 Usage:
     python create_test_user_in_db.py
@@ -12,32 +16,32 @@ Usage:
 
 import os
 import sys
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from typing import Any, Dict, Optional
+
 from dotenv import load_dotenv
 
+from fixtures import database
+
 # Load environment
 load_dotenv()
 
-# Get database URL from Railway environment variables
-# You'll need to get this from: railway variables --service datakwip-timescaledb
-DATABASE_URL = os.getenv('DATABASE_URL')
-if not DATABASE_URL:
-    print("ERROR: DATABASE_URL environment variable not set")
-    print("Get it with: railway variables --service datakwip-timescaledb | grep DATABASE_URL")
-    sys.exit(1)
-
 # Test user details
 TEST_USER_EMAIL = "functional-test-user@datakwip.local"
 TEST_ORG_ID = 1
 
-# Keycloak user ID - we'll fetch this from Keycloak
-# For now, we'll create the user WITHOUT keycloak_user_id and link it later
-KEYCLOAK_USER_ID = None  # Will be fetched from Keycloak or left NULL
 
-def get_keycloak_user_uuid():
+class OrganizationNotFoundError(Exception):
+    """Target organization does not exist in core.org."""
+
+    def __init__(self, org_id: int, available: list):
+        self.org_id = org_id
+        self.available = available
+        super().__init__(f"Organization with id={org_id} does not exist")
+
+
+def get_keycloak_user_uuid(email: str = TEST_USER_EMAIL) -> Optional[str]:
     """Get the Keycloak UUID for the test user"""
-    from python_keycloak import KeycloakAdmin
+    from clients import KeycloakAdminClient
 
     keycloak_base_url = os.getenv('KEYCLOAK_BASE_URL')
     keycloak_realm = os.getenv('KEYCLOAK_REALM')
@@ -50,26 +54,23 @@ def get_keycloak_user_uuid():
         return None
 
     try:
-        # Connect to Keycloak admin
-        keycloak_admin = KeycloakAdmin(
+        # Admin login happens in the master realm, lookups in the target realm
+        with KeycloakAdminClient(
             server_url=keycloak_base_url,
-            username=admin_user,
-            password=admin_password,
-            realm_name="master",  # Login to master realm
-            user_realm_name=keycloak_realm,  # Target realm
-            verify=True
-        )
-
-        # Search for user by email
-        users = keycloak_admin.get_users({"email": TEST_USER_EMAIL})
-
-        if not users:
-            print(f"WARNING: User {TEST_USER_EMAIL} not found in Keycloak")
+            realm_name=keycloak_realm,
+            admin_username=admin_user,
+            admin_password=admin_password,
+            verify=False,  # Allow self-signed certs in dev
+        ) as keycloak_admin:
+            user = keycloak_admin.get_user_by_username(email)
+
+        if not user:
+            print(f"WARNING: User {email} not found in Keycloak")
             print("User will be created in DB without keycloak_user_id")
             return None
 
-        keycloak_uuid = users[0]['id']
-        print(f"✓ Found Keycloak user: {TEST_USER_EMAIL}")
+        keycloak_uuid = user['id']
+        print(f"✓ Found Keycloak user: {email}")
         print(f"  Keycloak UUID: {keycloak_uuid}")
         return keycloak_uuid
 
@@ -79,129 +80,108 @@ def get_keycloak_user_uuid():
         return None
 
 
-def create_test_user_in_database():
-    """Create test user in database and link to org"""
+def create_test_user_in_database(
+    database_url: Optional[str] = None,
+    email: str = TEST_USER_EMAIL,
+    org_id: int = TEST_ORG_ID,
+    keycloak_uuid: Optional[str] = None,
+    lookup_keycloak: bool = True,
+) -> Dict[str, Any]:
+    """Create test user in database and link to org.
+
+    Args:
+        database_url: Connection URL (default: DATABASE_URL from environment)
+        email: Test user email
+        org_id: Organization to link the user to (with org_admin)
+        keycloak_uuid: Keycloak UUID to store (looked up if not given)
+        lookup_keycloak: Look up the Keycloak UUID when keycloak_uuid is None
+
+    Returns:
+        Setup result (see fixtures.database.ensure_test_user)
+
+    Raises:
+        OrganizationNotFoundError: If the organization does not exist
+    """
+    if keycloak_uuid is None and lookup_keycloak:
+        keycloak_uuid = get_keycloak_user_uuid(email)
+
+    conn = database.connect(database_url)
+    try:
+        with conn:
+            result = database.ensure_test_user(
+                conn, email=email, org_id=org_id, keycloak_user_id=keycloak_uuid
+            )
+
+        if result is None:
+            raise OrganizationNotFoundError(org_id, database.list_orgs(conn))
+
+        return dict(result, email=email)
+
+    finally:
+        conn.close()
+
 
+def main():
+    """Create the functional test user and print a summary."""
     print("\n" + "="*70)
     print("Creating Functional Test User in DataKwip Database")
     print("="*70 + "\n")
 
-    # Get Keycloak UUID
-    keycloak_uuid = get_keycloak_user_uuid()
-
-    # Connect to database
-    print(f"Connecting to database...")
-    conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        database_url = database.get_database_url()
+    except RuntimeError:
+        print("ERROR: DATABASE_URL environment variable not set")
+        print("Get it with: railway variables --service datakwip-timescaledb | grep DATABASE_URL")
+        sys.exit(1)
 
     try:
-        # Check if org_id=1 exists
-        cur.execute("SELECT id, org_key FROM core.org WHERE id = %s", (TEST_ORG_ID,))
-        org = cur.fetchone()
-
-        if not org:
-            print(f"ERROR: Organization with id={TEST_ORG_ID} does not exist!")
-            print("\nAvailable organizations:")
-            cur.execute("SELECT id, org_key FROM core.org ORDER BY id")
-            orgs = cur.fetchall()
-            for o in orgs:
-                print(f"  org_id={o['id']}, key={o['org_key']}")
-
-            print("\nPlease run the simulator first to create organizations:")
-            print("  cd ../datakwip-simulator")
-            print("  python src/service_main.py")
-            conn.close()
-            sys.exit(1)
-
-        print(f"✓ Organization found: id={org['id']}, key={org['org_key']}")
-
-        # Check if user already exists
-        cur.execute("SELECT id, email, keycloak_user_id FROM core.user WHERE email = %s", (TEST_USER_EMAIL,))
-        existing_user = cur.fetchone()
-
-        if existing_user:
-            user_id = existing_user['id']
-            print(f"✓ User already exists: id={user_id}, email={existing_user['email']}")
-
-            # Update keycloak_user_id if we have it and it's not set
-            if keycloak_uuid and not existing_user['keycloak_user_id']:
-                cur.execute("""
-                    UPDATE core.user
-                    SET keycloak_user_id = %s
-                    WHERE id = %s
-                """, (keycloak_uuid, user_id))
-                conn.commit()
-                print(f"  ✓ Updated keycloak_user_id: {keycloak_uuid}")
-        else:
-            # Create new user
-            cur.execute("""
-                INSERT INTO core.user (email, keycloak_user_id)
-                VALUES (%s, %s)
-                RETURNING id
-            """, (TEST_USER_EMAIL, keycloak_uuid))
-
-            user_id = cur.fetchone()['id']
-            conn.commit()
-            print(f"✓ User created: id={user_id}, email={TEST_USER_EMAIL}")
-            if keycloak_uuid:
-                print(f"  keycloak_user_id: {keycloak_uuid}")
-
-        # Check if org_user relationship exists
-        cur.execute("""
-            SELECT 1 FROM core.org_user
-            WHERE user_id = %s AND org_id = %s
-        """, (user_id, TEST_ORG_ID))
-
-        if cur.fetchone():
-            print(f"✓ User already linked to organization {TEST_ORG_ID}")
-        else:
-            # Link user to organization
-            cur.execute("""
-                INSERT INTO core.org_user (user_id, org_id)
-                VALUES (%s, %s)
-            """, (user_id, TEST_ORG_ID))
-            conn.commit()
-            print(f"✓ User linked to organization {TEST_ORG_ID}")
-
-        # Grant org_admin permissions (optional but recommended for testing)
-        cur.execute("""
-            SELECT 1 FROM core.org_admin
-            WHERE user_id = %s AND org_id = %s
-        """, (user_id, TEST_ORG_ID))
-
-        if cur.fetchone():
-            print(f"✓ User already has org_admin permissions")
-        else:
-            cur.execute("""
-                INSERT INTO core.org_admin (user_id, org_id)
-                VALUES (%s, %s)
-            """, (user_id, TEST_ORG_ID))
-            conn.commit()
-            print(f"✓ User granted org_admin permissions for org {TEST_ORG_ID}")
-
-        print("\n" + "="*70)
-        print("SUCCESS! Test user configured for functional tests")
-        print("="*70)
-        print(f"\nUser details:")
-        print(f"  Database ID: {user_id}")
-        print(f"  Email: {TEST_USER_EMAIL}")
-        print(f"  Organization: {TEST_ORG_ID} ({org['org_key']})")
-        print(f"  Keycloak UUID: {keycloak_uuid or 'Not linked (NULL)'}")
-        print(f"  Permissions: org_admin")
-        print("\nYou can now run the functional tests:")
-        print("  pytest tests/test_api.py -v")
+        print(f"Connecting to database...")
+        result = create_test_user_in_database(database_url)
+
+    except OrganizationNotFoundError as e:
+        print(f"ERROR: Organization with id={e.org_id} does not exist!")
+        print("\nAvailable organizations:")
+        for o in e.available:
+            print(f"  org_id={o['id']}, key={o['org_key']}")
+
+        print("\nPlease run the simulator first to create organizations:")
+        print("  cd ../datakwip-simulator")
+        print("  python src/service_main.py")
+        sys.exit(1)
 
     except Exception as e:
         print(f"\nERROR: {e}")
-        conn.rollback()
         import traceback
         traceback.print_exc()
         sys.exit(1)
 
-    finally:
-        cur.close()
-        conn.close()
+    user_id = result['user_id']
+    print(f"✓ Organization found: id={result['org_id']}, key={result['org_key']}")
+    if result['created']:
+        print(f"✓ User created: id={user_id}, email={result['email']}")
+    else:
+        print(f"✓ User already exists: id={user_id}, email={result['email']}")
+    print(
+        f"✓ User linked to organization {result['org_id']}"
+        if result['linked'] else f"✓ User already linked to organization {result['org_id']}"
+    )
+    print(
+        f"✓ User granted org_admin permissions for org {result['org_id']}"
+        if result['granted'] else f"✓ User already has org_admin permissions"
+    )
+
+    print("\n" + "="*70)
+    print("SUCCESS! Test user configured for functional tests")
+    print("="*70)
+    print(f"\nUser details:")
+    print(f"  Database ID: {user_id}")
+    print(f"  Email: {result['email']}")
+    print(f"  Organization: {result['org_id']} ({result['org_key']})")
+    print(f"  Keycloak UUID: {result['keycloak_user_id'] or 'Not linked (NULL)'}")
+    print(f"  Permissions: org_admin")
+    print("\nYou can now run the functional tests:")
+    print("  pytest tests/test_api.py -v")
 
 
 if __name__ == "__main__":
-    create_test_user_in_database()
+    main()
@@ -30,14 +30,19 @@ if functional_test_client:
 else:
     print("\n✗ functional-tests client NOT FOUND")
 
-# Try getting users
-users = client._admin.get_users({"max": 10})
-print(f"\nFound {len(users)} users")
-for u in users[:10]:
-    print(f"  - {u.get('username')} <{u.get('email', 'N/A')}>")
+# Count users, then stream every page instead of only the first one
+user_count = client.count_users()
+print(f"\nRealm has {user_count} users")
+print("First 10 users:")
+
+test_user = []
+for i, u in enumerate(client.iter_users(page_size=200, brief_representation=True)):
+    if i < 10:
+        print(f"  - {u.get('username')} <{u.get('email', 'N/A')}>")
+    if u.get('email') == 'functional-test-user@datakwip.local':
+        test_user.append(u)
 
 # Search for functional test user
-test_user = [u for u in users if u.get('email') == 'functional-test-user@datakwip.local']
 if test_user:
     print("\n✓ FOUND functional-test-user@datakwip.local!")
 else:
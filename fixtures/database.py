@@ -0,0 +1,315 @@
+"""Database helpers for test data setup in the DataKwip ``core`` schema.
+
+Functions here never commit: run them inside ``with conn:`` (psycopg2 commits
+on success and rolls back on error) so every call is a single transaction.
+
+The user upserts (link_users_to_org, ensure_test_user) rely on a unique
+constraint or index on ``core.user (email)`` for ``ON CONFLICT (email)``;
+without one they raise RuntimeError. Links in ``core.org_user`` and
+``core.org_admin`` need no constraint: rows are only inserted where no
+``(user_id, org_id)`` row exists yet.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import psycopg2
+from psycopg2.errors import InvalidColumnReference
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+# One statement: upsert users, then link them to their org (and org_admin).
+# ON CONFLICT (email) keeps repeated runs idempotent and race-free; the link
+# tables are guarded with NOT EXISTS, so they stay free of duplicates even
+# without a unique (user_id, org_id) constraint.
+_LINK_USERS_SQL = """
+WITH input (email, keycloak_user_id, org_id) AS (
+    VALUES %s
+),
+upserted AS (
+    INSERT INTO core.user AS u (email, keycloak_user_id)
+    SELECT email, keycloak_user_id FROM input
+    ON CONFLICT (email) DO UPDATE
+        SET keycloak_user_id = COALESCE(u.keycloak_user_id, EXCLUDED.keycloak_user_id)
+    RETURNING u.id, u.email
+),
+org_users AS (
+    INSERT INTO core.org_user (user_id, org_id)
+    SELECT upserted.id, input.org_id
+    FROM upserted JOIN input USING (email)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM core.org_user ou WHERE ou.user_id = upserted.id AND ou.org_id = input.org_id
+    )
+    ON CONFLICT DO NOTHING
+){org_admin_cte}
+SELECT id, email FROM upserted
+"""
+
+_ORG_ADMIN_CTE = """,
+org_admins AS (
+    INSERT INTO core.org_admin (user_id, org_id)
+    SELECT upserted.id, input.org_id
+    FROM upserted JOIN input USING (email)
+    WHERE NOT EXISTS (
+        SELECT 1 FROM core.org_admin oa WHERE oa.user_id = upserted.id AND oa.org_id = input.org_id
+    )
+    ON CONFLICT DO NOTHING
+)"""
+
+# One round trip: upsert a single user and link it to an existing org.
+# Returns no row if the org does not exist (nothing is written then).
+_ENSURE_USER_SQL = """
+WITH org AS (
+    SELECT id, org_key FROM core.org WHERE id = %(org_id)s
+),
+upserted AS (
+    INSERT INTO core.user AS u (email, keycloak_user_id)
+    SELECT %(email)s, %(keycloak_user_id)s::varchar FROM org
+    ON CONFLICT (email) DO UPDATE
+        SET keycloak_user_id = COALESCE(u.keycloak_user_id, EXCLUDED.keycloak_user_id)
+    RETURNING u.id, u.keycloak_user_id, (xmax = 0) AS created
+),
+org_users AS (
+    INSERT INTO core.org_user (user_id, org_id)
+    SELECT upserted.id, org.id FROM upserted, org
+    WHERE NOT EXISTS (
+        SELECT 1 FROM core.org_user ou WHERE ou.user_id = upserted.id AND ou.org_id = org.id
+    )
+    ON CONFLICT DO NOTHING
+    RETURNING user_id
+),
+org_admins AS (
+    INSERT INTO core.org_admin (user_id, org_id)
+    SELECT upserted.id, org.id FROM upserted, org
+    WHERE %(org_admin)s AND NOT EXISTS (
+        SELECT 1 FROM core.org_admin oa WHERE oa.user_id = upserted.id AND oa.org_id = org.id
+    )
+    ON CONFLICT DO NOTHING
+    RETURNING user_id
+)
+SELECT
+    org.id AS org_id,
+    org.org_key,
+    upserted.id AS user_id,
+    upserted.keycloak_user_id,
+    upserted.created,
+    EXISTS (SELECT 1 FROM org_users) AS linked,
+    EXISTS (SELECT 1 FROM org_admins) AS granted
+FROM org, upserted
+"""
+
+_UNLINK_USERS_SQL = """
+WITH doomed AS (
+    SELECT id FROM core.user WHERE email = ANY(%(emails)s)
+),
+org_admins AS (
+    DELETE FROM core.org_admin WHERE user_id IN (SELECT id FROM doomed)
+),
+org_users AS (
+    DELETE FROM core.org_user WHERE user_id IN (SELECT id FROM doomed)
+),
+users AS (
+    DELETE FROM core.user WHERE id IN (SELECT id FROM doomed) RETURNING id
+)
+SELECT count(*) AS deleted FROM users
+"""
+
+
+@contextmanager
+def _email_conflict_target() -> Iterator[None]:
+    """Turn a missing unique constraint on core.user (email) into a clear error."""
+    try:
+        yield
+    except InvalidColumnReference as e:
+        raise RuntimeError(
+            "core.user has no unique constraint or index on email, which the user upsert "
+            "needs (ON CONFLICT (email)). Add one with: "
+            "CREATE UNIQUE INDEX ON core.user (email)"
+        ) from e
+
+
+def get_database_url() -> str:
+    """Get the TimescaleDB connection URL from the environment.
+
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError(
+            "DATABASE_URL environment variable not set. Get it with: "
+            "railway variables --service datakwip-timescaledb | grep DATABASE_URL"
+        )
+    return database_url
+
+
+def connect(database_url: Optional[str] = None):
+    """Open a psycopg2 connection (RealDictCursor rows).
+
+    Args:
+        database_url: Connection URL (default: DATABASE_URL from environment)
+
+    Returns:
+        psycopg2 connection
+    """
+    return psycopg2.connect(database_url or get_database_url(), cursor_factory=RealDictCursor)
+
+
+def connection_pool(
+    database_url: Optional[str] = None, minconn: int = 1, maxconn: int = 4
+) -> ThreadedConnectionPool:
+    """Open a thread-safe psycopg2 connection pool (RealDictCursor rows).
+
+    The pool does not block when exhausted, so maxconn must cover the number
+    of threads borrowing connections at the same time.
+
+    Args:
+        database_url: Connection URL (default: DATABASE_URL from environment)
+        minconn: Connections opened up front
+        maxconn: Upper bound on open connections
+
+    Returns:
+        psycopg2 ThreadedConnectionPool (call closeall() when done)
+    """
+    return ThreadedConnectionPool(
+        minconn, maxconn, database_url or get_database_url(), cursor_factory=RealDictCursor
+    )
+
+
+@contextmanager
+def pooled(pool: ThreadedConnectionPool) -> Iterator:
+    """Borrow a pool connection for one transaction, then return it."""
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def get_org(conn, org_id: int) -> Optional[Dict]:
+    """Get organization by ID.
+
+    Returns:
+        {"id": ..., "org_key": ...} or None if not found
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, org_key FROM core.org WHERE id = %s", (org_id,))
+        return cur.fetchone()
+
+
+def list_orgs(conn) -> List[Dict]:
+    """List all organizations ordered by ID."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, org_key FROM core.org ORDER BY id")
+        return cur.fetchall()
+
+
+def link_users_to_org(
+    conn,
+    users: Iterable[Tuple[str, Optional[str]]],
+    org_id: int,
+    org_admin: bool = True,
+) -> Dict[str, int]:
+    """Upsert users into core.user and link them to an organization in bulk.
+
+    All rows go out in a single multi-row statement, so linking hundreds of
+    users costs one round trip.
+
+    Args:
+        conn: psycopg2 connection (caller owns the transaction)
+        users: (email, keycloak_user_id) pairs; keycloak_user_id may be None
+        org_id: Organization to link the users to
+        org_admin: Also grant org_admin permissions
+
+    Returns:
+        Mapping of email to core.user ID
+
+    Raises:
+        RuntimeError: If core.user has no unique constraint on email
+    """
+    # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement
+    rows = list({email: (email, keycloak_id, org_id) for email, keycloak_id in users}.values())
+    if not rows:
+        return {}
+
+    sql = _LINK_USERS_SQL.format(org_admin_cte=_ORG_ADMIN_CTE if org_admin else "")
+
+    with conn.cursor() as cur, _email_conflict_target():
+        result = execute_values(
+            cur,
+            sql,
+            rows,
+            template="(%s, %s::varchar, %s::integer)",
+            page_size=len(rows),
+            fetch=True,
+        )
+
+    return {row["email"]: row["id"] for row in result}
+
+
+def ensure_test_user(
+    conn,
+    email: str,
+    org_id: int,
+    keycloak_user_id: Optional[str] = None,
+    org_admin: bool = True,
+) -> Optional[Dict]:
+    """Create or update a user and link it to an organization in one statement.
+
+    Args:
+        conn: psycopg2 connection (caller owns the transaction)
+        email: User email
+        org_id: Organization to link the user to
+        keycloak_user_id: Keycloak UUID (only set if the user has none yet)
+        org_admin: Also grant org_admin permissions
+
+    Returns:
+        None if the organization does not exist, otherwise:
+            {
+                "org_id": 1, "org_key": "test-org", "user_id": 42,
+                "keycloak_user_id": "...", "created": False,
+                "linked": False, "granted": False
+            }
+        where created/linked/granted tell whether this call wrote the row.
+
+    Raises:
+        RuntimeError: If core.user has no unique constraint on email
+    """
+    with conn.cursor() as cur, _email_conflict_target():
+        cur.execute(
+            _ENSURE_USER_SQL,
+            {
+                "org_id": org_id,
+                "email": email,
+                "keycloak_user_id": keycloak_user_id,
+                "org_admin": org_admin,
+            },
+        )
+        return cur.fetchone()
+
+
+def unlink_users(conn, emails: Sequence[str]) -> int:
+    """Remove users and their org_user/org_admin links in one statement.
+
+    Args:
+        conn: psycopg2 connection (caller owns the transaction)
+        emails: Emails of the users to remove
+
+    Returns:
+        Number of core.user rows deleted
+    """
+    if not emails:
+        return 0
+
+    with conn.cursor() as cur:
+        cur.execute(_UNLINK_USERS_SQL, {"emails": list(emails)})
+        return cur.fetchone()["deleted"]
+
+
+def find_user_emails(conn, pattern: str) -> List[str]:
+    """Find core.user emails matching a LIKE pattern."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT email FROM core.user WHERE email LIKE %s ORDER BY email", (pattern,))
+        return [row["email"] for row in cur.fetchall()]
@@ -0,0 +1,266 @@
+"""Per-test database time from pg_stat_statements snapshots.
+
+StatementSampler snapshots the cumulative counters of ``pg_stat_statements``
+(and, when TimescaleDB is installed, ``timescaledb_information.job_stats``)
+before and after a test and diffs them. The result, DatabaseTime, holds the
+statements that ran in between with their calls, rows and execution time,
+plus the background jobs that ran. Comparing its total with the test's wall
+time splits end-to-end latency into database time and everything else
+(network, service code, client).
+
+The counters are server-wide: statements from other clients and from
+parallel xdist workers that run in the same window are counted too. Filter
+by the API's database role (``role``) to keep the attribution honest. The
+sampling role needs pg_read_all_stats to see other roles' query texts.
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# Statements issued by the sampler itself are left out of every diff
+_OWN_QUERY_MARKERS = ("pg_stat_statements", "timescaledb_information.job_stats")
+
+_JOB_STATS_SQL = """
+SELECT job_id, hypertable_name, last_run_status, total_runs, total_failures,
+       extract(epoch FROM last_run_duration) * 1000 AS last_run_ms
+FROM timescaledb_information.job_stats
+"""
+
+
+class StatementStats(BaseModel):
+    """Counters of one normalized statement accumulated during a test."""
+
+    query: str
+    calls: int = 0
+    rows: int = 0
+    total_ms: float = 0.0
+    shared_blks_hit: int = 0
+    shared_blks_read: int = 0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+
+class JobRun(BaseModel):
+    """TimescaleDB job (compression, retention, continuous aggregate) that ran during a test."""
+
+    job_id: int
+    hypertable: Optional[str] = None
+    runs: int
+    failures: int = 0
+    last_run_ms: Optional[float] = None
+    last_status: Optional[str] = None
+
+
+class DatabaseTime(BaseModel):
+    """Database work between two snapshots, against the wall time of the same window."""
+
+    wall_ms: float
+    statements: List[StatementStats] = []
+    jobs: List[JobRun] = []
+
+    @property
+    def db_ms(self) -> float:
+        return sum(s.total_ms for s in self.statements)
+
+    @property
+    def other_ms(self) -> float:
+        """Wall time not spent executing statements (network, services, client)."""
+        return max(self.wall_ms - self.db_ms, 0.0)
+
+    @property
+    def calls(self) -> int:
+        return sum(s.calls for s in self.statements)
+
+    def top(self, by: str = "total_ms", limit: int = 5) -> List[StatementStats]:
+        """Statements with the highest total_ms, calls or rows."""
+        return sorted(self.statements, key=lambda s: getattr(s, by), reverse=True)[:limit]
+
+    def headline(self) -> str:
+        share = self.db_ms / self.wall_ms if self.wall_ms else 0.0
+        return (
+            f"DB {self.db_ms:.1f}ms ({len(self.statements)} statements, {self.calls} calls) of "
+            f"{self.wall_ms:.1f}ms ({share:.0%}), other {self.other_ms:.1f}ms"
+        )
+
+    def format(self, limit: int = 5) -> str:
+        """Headline plus the top statements by total time, calls and rows (one table)."""
+        lines = [self.headline()]
+        top: List[StatementStats] = []
+        for by in ("total_ms", "calls", "rows"):
+            top += [s for s in self.top(by, limit) if s not in top]
+        if top:
+            lines.append(f"{'total':>9} {'mean':>8} {'calls':>6} {'rows':>7} {'read':>6}  query")
+            for s in sorted(top, key=lambda s: s.total_ms, reverse=True):
+                query = " ".join(s.query.split())
+                lines.append(
+                    f"{s.total_ms:>7.1f}ms {s.mean_ms:>6.2f}ms {s.calls:>6} {s.rows:>7} "
+                    f"{s.shared_blks_read:>6}  {query[:80]}"
+                )
+        for job in self.jobs:
+            duration = f"{job.last_run_ms:.0f}ms" if job.last_run_ms is not None else "?"
+            lines.append(
+                f"job {job.job_id} ({job.hypertable or '-'}): {job.runs} run(s), "
+                f"{job.failures} failed, last {duration} {job.last_status or ''}".rstrip()
+            )
+        return "\n".join(lines)
+
+
+class Snapshot:
+    """Cumulative counters at one point in time (plain tuples: thousands of rows per test)."""
+
+    def __init__(
+        self,
+        taken_at: float,
+        statements: Dict[Tuple, Tuple[str, int, int, float, int, int]],
+        jobs: Dict[int, JobRun],
+    ):
+        self.taken_at = taken_at
+        # (userid, dbid, queryid) -> (query, calls, rows, total_ms, blks_hit, blks_read)
+        self.statements = statements
+        self.jobs = jobs
+
+
+class StatementSampler:
+    """Snapshots pg_stat_statements (and TimescaleDB job stats) over one connection.
+
+    Args:
+        conn: psycopg2 connection (switched to autocommit; the sampler owns it)
+        role: Only count statements of this database role (e.g. the API's)
+        current_database_only: Only count statements against the connection's database
+        include_jobs: Also diff timescaledb_information.job_stats when available
+
+    Raises:
+        RuntimeError: If the pg_stat_statements extension is not installed
+
+    Example:
+        >>> sampler = StatementSampler(database.connect(), role="datakwip_api")
+        >>> before = sampler.snapshot()
+        >>> api_client.list_entities(org_id=1)
+        >>> print(sampler.diff(before, sampler.snapshot()).format())
+    """
+
+    def __init__(
+        self,
+        conn,
+        role: Optional[str] = None,
+        current_database_only: bool = True,
+        include_jobs: bool = True,
+    ):
+        self.conn = conn
+        self.conn.autocommit = True
+
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+            if cur.fetchone() is None:
+                raise RuntimeError(
+                    "pg_stat_statements is not installed (CREATE EXTENSION pg_stat_statements; "
+                    "it must also be in shared_preload_libraries)"
+                )
+            cur.execute("SELECT * FROM pg_stat_statements LIMIT 0")
+            columns = {column.name for column in cur.description}
+            cur.execute(
+                "SELECT to_regclass('timescaledb_information.job_stats') IS NOT NULL AS present"
+            )
+            self.jobs_available = include_jobs and bool(_first_value(cur.fetchone()))
+
+        # Postgres 13 split total_time into planning and execution time
+        time_column = "total_exec_time" if "total_exec_time" in columns else "total_time"
+        conditions, self._params = [], []
+        if role is not None:
+            conditions.append("userid = (SELECT oid FROM pg_roles WHERE rolname = %s)")
+            self._params.append(role)
+        if current_database_only:
+            conditions.append(
+                "dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+            )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        self._statements_sql = (
+            f"SELECT userid, dbid, queryid, query, calls, rows, {time_column} AS total_ms, "
+            f"shared_blks_hit, shared_blks_read FROM pg_stat_statements {where}"
+        )
+
+    def snapshot(self) -> Snapshot:
+        """Current cumulative counters."""
+        taken_at = time.perf_counter()
+        statements = {}
+        jobs = {}
+        with self.conn.cursor() as cur:
+            cur.execute(self._statements_sql, self._params)
+            for row in cur.fetchall():
+                query = row["query"] or ""
+                if any(marker in query for marker in _OWN_QUERY_MARKERS):
+                    continue
+                statements[(row["userid"], row["dbid"], row["queryid"])] = (
+                    query,
+                    row["calls"],
+                    row["rows"],
+                    float(row["total_ms"]),
+                    row["shared_blks_hit"],
+                    row["shared_blks_read"],
+                )
+            if self.jobs_available:
+                cur.execute(_JOB_STATS_SQL)
+                for row in cur.fetchall():
+                    jobs[row["job_id"]] = JobRun(
+                        job_id=row["job_id"],
+                        hypertable=row["hypertable_name"],
+                        runs=row["total_runs"] or 0,
+                        failures=row["total_failures"] or 0,
+                        last_run_ms=(
+                            float(row["last_run_ms"]) if row["last_run_ms"] is not None else None
+                        ),
+                        last_status=row["last_run_status"],
+                    )
+        return Snapshot(taken_at=taken_at, statements=statements, jobs=jobs)
+
+    @staticmethod
+    def diff(before: Snapshot, after: Snapshot) -> DatabaseTime:
+        """Database work done between two snapshots.
+
+        Statements first seen after `before` count in full; statements whose
+        counters went down (pg_stat_statements_reset, eviction) are skipped.
+        """
+        statements = []
+        for key, (query, calls, rows, total_ms, hit, read) in after.statements.items():
+            _, calls0, rows0, total0, hit0, read0 = before.statements.get(
+                key, (query, 0, 0, 0.0, 0, 0)
+            )
+            if calls <= calls0:
+                continue
+            statements.append(
+                StatementStats(
+                    query=query,
+                    calls=calls - calls0,
+                    rows=rows - rows0,
+                    total_ms=total_ms - total0,
+                    shared_blks_hit=hit - hit0,
+                    shared_blks_read=read - read0,
+                )
+            )
+
+        jobs = []
+        for job_id, job in after.jobs.items():
+            runs0 = before.jobs[job_id].runs if job_id in before.jobs else 0
+            failures0 = before.jobs[job_id].failures if job_id in before.jobs else 0
+            if job.runs > runs0:
+                jobs.append(
+                    job.model_copy(
+                        update={"runs": job.runs - runs0, "failures": job.failures - failures0}
+                    )
+                )
+
+        return DatabaseTime(
+            wall_ms=(after.taken_at - before.taken_at) * 1000, statements=statements, jobs=jobs
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+def _first_value(row):
+    """First column of a row from either a tuple or a RealDictCursor."""
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
@@ -0,0 +1,713 @@
+"""Local stand-in servers for the DataKwip API, MCP connector and Keycloak.
+
+Serves the endpoints the clients in ``clients/`` call, from a synthetic
+dataset of configurable size and with injected latency, so the suite can run
+in a sandbox and client-side overhead can be profiled without Railway:
+
+- API: ``/health/databases``, ``/entity``, ``/entitytag``, ``/entityvalue``
+- MCP: JSON-RPC ``/mcp`` with ``tools/list`` and the ``query_entities`` /
+  ``get_current_values`` tools
+- Keycloak: the realm token endpoint (password, client_credentials and
+  refresh_token grants) plus the read-only admin endpoints used by the auth
+  tests
+
+Points written with FakeDataset.write_value() become current after
+``ingest_lag_ms`` (plus up to ``ingest_jitter_ms``), standing in for the
+ingest pipeline in freshness probes.
+
+Usage:
+    python -m fixtures.fake_stack --entities 100000 --latency-ms 20
+"""
+
+import argparse
+import json
+import multiprocessing
+import math
+import random
+import re
+import secrets
+import signal
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel
+
+from .seeder import EQUIPMENT_TYPES, TAG_KEYS, UNITS
+
+
+class FakeStackConfig(BaseModel):
+    """Dataset size, latency and credentials of the fake stack."""
+
+    host: str = "127.0.0.1"
+    orgs: int = 3
+    entities_per_org: int = 1000
+    tags_per_entity: int = 5
+    users: int = 25
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    ingest_lag_ms: float = 0.0
+    ingest_jitter_ms: float = 0.0
+    token_lifetime: int = 300
+
+    realm: str = "datakwip"
+    client_id: str = "functional-tests"
+    client_secret: str = "functional-tests-secret"
+    username: str = "functional-test-user@datakwip.local"
+    password: str = "FunctionalTest2025!"
+    admin_username: str = "admin"
+    admin_password: str = "admin"
+
+
+class FakeDataset:
+    """Deterministic synthetic entities, tags and values (computed on demand)."""
+
+    def __init__(self, config: FakeStackConfig):
+        self.config = config
+        # entity_id -> (visible_at, value row) for points written by probes
+        self._written: Dict[int, List[Tuple[float, Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def has_org(self, org_id: int) -> bool:
+        return 1 <= org_id <= self.config.orgs
+
+    def orgs(self) -> List[Dict[str, Any]]:
+        """All organizations, shaped like database.list_orgs()."""
+        return [
+            {"id": org_id, "org_key": f"org-{org_id}"} for org_id in range(1, self.config.orgs + 1)
+        ]
+
+    def _first_id(self, org_id: int) -> int:
+        return (org_id - 1) * self.config.entities_per_org + 1
+
+    def entity(self, org_id: int, index: int) -> Dict[str, Any]:
+        return {
+            "id": self._first_id(org_id) + index,
+            "org_id": org_id,
+            "org_key": f"org-{org_id}",
+            "key": f"org-{org_id}-entity-{index:07d}",
+            "name": f"Entity {index}",
+        }
+
+    def entity_type(self, index: int) -> str:
+        return EQUIPMENT_TYPES[index % len(EQUIPMENT_TYPES)]
+
+    def entities(
+        self, org_id: int, limit: int, offset: int = 0, entity_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        if not self.has_org(org_id):
+            return []
+
+        result = []
+        index = offset
+        while len(result) < limit and index < self.config.entities_per_org:
+            if entity_type is None or self.entity_type(index) == entity_type:
+                result.append(self.entity(org_id, index))
+            index += 1
+        return result
+
+    def tags(self, org_id: int, limit: int, offset: int = 0) -> List[Dict[str, Any]]:
+        if not self.has_org(org_id):
+            return []
+
+        per_entity = self.config.tags_per_entity
+        total = self.config.entities_per_org * per_entity
+        result = []
+        for n in range(offset, min(offset + limit, total)):
+            index, t = divmod(n, per_entity)
+            tag_key = TAG_KEYS[t] if t < len(TAG_KEYS) else f"tag{t}"
+            tag_value = self.entity_type(index) if tag_key == "type" else f"{tag_key}-{index % 100}"
+            result.append(
+                {
+                    "id": (self._first_id(org_id) - 1) * per_entity + n + 1,
+                    "entity_id": self._first_id(org_id) + index,
+                    "tag_key": tag_key,
+                    "tag_value": tag_value,
+                }
+            )
+        return result
+
+    def write_value(self, entity_id: int, timestamp: datetime, value: float, unit: str):
+        """Store a point; it becomes the current value once the ingest lag has passed."""
+        config = self.config
+        lag = config.ingest_lag_ms + random.uniform(0, config.ingest_jitter_ms)
+        row = {
+            "entity_id": entity_id,
+            "timestamp": timestamp.isoformat(),
+            "value": value,
+            "unit": unit,
+        }
+        with self._lock:
+            self._written.setdefault(entity_id, []).append((time.monotonic() + lag / 1000, row))
+
+    def _latest_written(self, entity_id: int) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            visible = [
+                row for visible_at, row in self._written.get(entity_id, ()) if visible_at <= now
+            ]
+        return max(visible, key=lambda row: row["timestamp"]) if visible else None
+
+    def current_values(self, org_id: int, entity_ids: List[int]) -> List[Dict[str, Any]]:
+        if not self.has_org(org_id):
+            return []
+
+        first_id = self._first_id(org_id)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        values = []
+        for entity_id in entity_ids:
+            index = entity_id - first_id
+            if not 0 <= index < self.config.entities_per_org:
+                continue
+            written = self._latest_written(entity_id)
+            if written is not None:
+                values.append(written)
+            else:
+                values.append(
+                    {
+                        "entity_id": entity_id,
+                        "timestamp": now.isoformat(),
+                        "value": round(50.0 + 25.0 * math.sin(index + now.timestamp() / 900), 3),
+                        "unit": UNITS[index % len(UNITS)],
+                    }
+                )
+        return values
+
+    def user(self, index: int) -> Dict[str, Any]:
+        email = self.config.username if index == 0 else f"fake-user-{index:05d}@datakwip.local"
+        return {
+            "id": f"00000000-0000-0000-0000-{index:012d}",
+            "username": email,
+            "email": email,
+            "enabled": True,
+            "emailVerified": True,
+        }
+
+
+class TokenStore:
+    """Opaque access/refresh tokens shared by the fake services."""
+
+    def __init__(self, lifetime: int):
+        self.lifetime = lifetime
+        self._access: Dict[str, Tuple[str, float]] = {}
+        self._refresh: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def issue(self, subject: str) -> Dict[str, Any]:
+        access_token = secrets.token_urlsafe(24)
+        refresh_token = secrets.token_urlsafe(24)
+        with self._lock:
+            self._access[access_token] = (subject, time.time() + self.lifetime)
+            self._refresh[refresh_token] = subject
+        return {
+            "access_token": access_token,
+            "expires_in": self.lifetime,
+            "refresh_token": refresh_token,
+            "refresh_expires_in": self.lifetime * 6,
+            "token_type": "Bearer",
+            "scope": "openid profile email",
+        }
+
+    def refresh(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            subject = self._refresh.pop(refresh_token, None)
+        return self.issue(subject) if subject else None
+
+    def validate(self, authorization: Optional[str]) -> Optional[str]:
+        if not authorization or not authorization.startswith("Bearer "):
+            return None
+        with self._lock:
+            entry = self._access.get(authorization[7:])
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Base handler: keep-alive, JSON helpers, injected latency."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body are written separately
+    stack: "FakeStack"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        config = self.stack.config
+        delay = config.latency_ms + random.uniform(0, config.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.stack._count(self.service)
+
+    def _injected_failure(self) -> bool:
+        """Answer with a queued failure (FakeStack.inject_failures), if any."""
+        failure = self.stack._take_failure(self.service)
+        if failure is None:
+            return False
+        status, retry_after = failure
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        self._send_json(status, {"detail": "Injected failure"}, headers)
+        return True
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _query(self) -> Dict[str, str]:
+        return {k: v[-1] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+    def _authorized(self) -> bool:
+        if self.stack.tokens.validate(self.headers.get("Authorization")) is None:
+            self._send_json(401, {"detail": "Not authenticated"})
+            return False
+        return True
+
+
+class _APIHandler(_Handler):
+    service = "api"
+
+    def do_GET(self):
+        self._delay()
+        if self._injected_failure():
+            return
+        path = urlparse(self.path).path
+        query = self._query()
+        dataset = self.stack.dataset
+
+        if path == "/health/databases":
+            databases = [
+                {
+                    "name": "timescaledb",
+                    "status": "healthy",
+                    "latency_ms": round(random.uniform(2, 12), 1),
+                },
+                {
+                    "name": "statedb",
+                    "status": "healthy",
+                    "latency_ms": round(random.uniform(1, 8), 1),
+                },
+            ]
+            health = {"overall_status": "healthy", "databases": databases}
+            # Per-database entries are also exposed by name
+            health.update({db["name"]: db for db in databases})
+            self._send_json(200, health)
+        elif path in ("/entity", "/entitytag"):
+            if not self._authorized():
+                return
+            org_id = int(query.get("org_id", 1))
+            limit = int(query.get("limit", 10))
+            offset = int(query.get("offset", 0))
+            if path == "/entity":
+                self._send_json(200, dataset.entities(org_id, limit, offset))
+            else:
+                self._send_json(200, dataset.tags(org_id, limit, offset))
+        elif path == "/entityvalue":
+            if not self._authorized():
+                return
+            org_id = int(query.get("org_id", 1))
+            entity_ids = parse_qs(urlparse(self.path).query).get("entity_id", [])
+            self._send_json(200, dataset.current_values(org_id, [int(i) for i in entity_ids]))
+        else:
+            self._send_json(404, {"detail": "Not Found"})
+
+
+MCP_TOOLS = [
+    {
+        "name": "query_entities",
+        "description": "Query entities from DataKwip",
+        "inputSchema": {"type": "object", "properties": {"org_id": {"type": "integer"}}},
+    },
+    {
+        "name": "get_current_values",
+        "description": "Get current time-series values for entities",
+        "inputSchema": {"type": "object", "properties": {"entity_ids": {"type": "array"}}},
+    },
+]
+
+
+class _MCPHandler(_Handler):
+    service = "mcp"
+
+    def do_POST(self):
+        self._delay()
+        body = self._read_body()  # Consumed first so keep-alive survives early answers
+        if self._injected_failure():
+            return
+        if urlparse(self.path).path != "/mcp":
+            self._send_json(404, {"detail": "Not Found"})
+            return
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            self._send_json(200, _rpc_error(None, -32700, "Parse error"))
+            return
+
+        request_id = request.get("id")
+        method = request.get("method")
+        params = request.get("params") or {}
+
+        if method == "tools/list":
+            self._send_json(
+                200, {"jsonrpc": "2.0", "id": request_id, "result": {"tools": MCP_TOOLS}}
+            )
+            return
+        if method != "tools/call":
+            self._send_json(200, _rpc_error(request_id, -32601, "Method not found"))
+            return
+
+        name = params.get("name")
+        arguments = params.get("arguments") or {}
+        dataset = self.stack.dataset
+        org_id = int(arguments.get("org_id", 1))
+
+        if name == "query_entities":
+            filters = arguments.get("filters") or {}
+            data = dataset.entities(
+                org_id,
+                int(arguments.get("limit", 10)),
+                int(arguments.get("offset", 0)),
+                entity_type=filters.get("type"),
+            )
+        elif name == "get_current_values":
+            data = dataset.current_values(org_id, [int(i) for i in arguments.get("entity_ids", [])])
+        else:
+            self._send_json(200, _rpc_error(request_id, -32602, f"Unknown tool: {name}"))
+            return
+
+        result = {"content": [{"type": "text", "text": json.dumps(data)}]}
+        self._send_json(200, {"jsonrpc": "2.0", "id": request_id, "result": result})
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+_TOKEN_PATH = re.compile(r"^/realms/(?P<realm>[^/]+)/protocol/openid-connect/token$")
+_ADMIN_PATH = re.compile(r"^/admin/realms/(?P<realm>[^/]+)(?P<rest>/.*)?$")
+
+
+class _AuthHandler(_Handler):
+    service = "auth"
+
+    def do_POST(self):
+        self._delay()
+        match = _TOKEN_PATH.match(urlparse(self.path).path)
+        if not match:
+            self._send_json(404, {"error": "not_found"})
+            return
+
+        config = self.stack.config
+        form = {k: v[-1] for k, v in parse_qs(self._read_body().decode("utf-8")).items()}
+        grant_type = form.get("grant_type")
+        realm = match.group("realm")
+
+        if grant_type == "refresh_token":
+            token = self.stack.tokens.refresh(form.get("refresh_token", ""))
+            if token is None:
+                self._send_json(
+                    400, {"error": "invalid_grant", "error_description": "Invalid refresh token"}
+                )
+                return
+            self._send_json(200, token)
+            return
+
+        if realm == "master":
+            valid = (
+                form.get("client_id") == "admin-cli"
+                and form.get("username") == config.admin_username
+                and form.get("password") == config.admin_password
+            )
+            subject = "admin"
+        else:
+            client_ok = (
+                form.get("client_id") == config.client_id
+                and form.get("client_secret") == config.client_secret
+            )
+            if grant_type == "client_credentials":
+                valid, subject = client_ok, f"service-account-{config.client_id}"
+            else:
+                valid = (
+                    client_ok
+                    and form.get("username") == config.username
+                    and form.get("password") == config.password
+                )
+                subject = config.username
+
+        if grant_type not in ("password", "client_credentials") or not valid:
+            self._send_json(
+                401, {"error": "invalid_grant", "error_description": "Invalid user credentials"}
+            )
+            return
+
+        self._send_json(200, self.stack.tokens.issue(subject))
+
+    def do_GET(self):
+        self._delay()
+        match = _ADMIN_PATH.match(urlparse(self.path).path)
+        if not match or not self._authorized():
+            if not match:
+                self._send_json(404, {"error": "not_found"})
+            return
+
+        config = self.stack.config
+        dataset = self.stack.dataset
+        rest = match.group("rest") or ""
+        query = self._query()
+
+        if rest == "":
+            self._send_json(
+                200, {"realm": config.realm, "enabled": True, "displayName": "DataKwip (fake)"}
+            )
+        elif rest == "/clients":
+            clients = [
+                {"id": "c-account", "clientId": "account", "enabled": True, "publicClient": True},
+                {
+                    "id": "c-admin-cli",
+                    "clientId": "admin-cli",
+                    "enabled": True,
+                    "publicClient": True,
+                },
+                {
+                    "id": "c-functional",
+                    "clientId": config.client_id,
+                    "enabled": True,
+                    "publicClient": False,
+                },
+            ]
+            if "clientId" in query:
+                clients = [c for c in clients if c["clientId"] == query["clientId"]]
+            self._send_json(200, clients)
+        elif rest in ("/users", "/users/count"):
+            users = (dataset.user(i) for i in range(config.users))
+            term = query.get("username") or query.get("email") or query.get("search")
+            if term:
+                exact = query.get("exact") == "true"
+                term = term.strip("*").lower()
+                users = (
+                    u for u in users if (u["username"] == term if exact else term in u["username"])
+                )
+            users = list(users)
+            if rest == "/users/count":
+                self._send_json(200, len(users))
+                return
+            first = int(query.get("first", 0))
+            maximum = int(query.get("max", 100))
+            self._send_json(200, users[first : first + maximum])
+        elif rest.startswith("/users/") and rest.endswith("/role-mappings"):
+            self._send_json(200, {"realmMappings": [{"name": f"default-roles-{config.realm}"}]})
+        else:
+            self._send_json(404, {"error": "not_found"})
+
+
+class FakeStack:
+    """API, MCP and Keycloak stand-ins, each on its own local port."""
+
+    def __init__(self, config: Optional[FakeStackConfig] = None):
+        self.config = config or FakeStackConfig()
+        self.dataset = FakeDataset(self.config)
+        self.tokens = TokenStore(self.config.token_lifetime)
+        self.request_counts: Dict[str, int] = {"api": 0, "mcp": 0, "auth": 0}
+        self._failures: Dict[str, List[Tuple[int, Optional[float]]]] = {"api": [], "mcp": []}
+        self._servers: Dict[str, ThreadingHTTPServer] = {}
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _count(self, service: str):
+        with self._lock:
+            self.request_counts[service] += 1
+
+    def inject_failures(
+        self, service: str, count: int, status: int = 503, retry_after: Optional[float] = None
+    ):
+        """Answer the next `count` requests to a service with an error status.
+
+        Args:
+            service: "api" or "mcp"
+            count: Number of requests to fail
+            status: HTTP status to answer with
+            retry_after: Retry-After header value in seconds (omitted if None)
+        """
+        with self._lock:
+            self._failures[service].extend([(status, retry_after)] * count)
+
+    def _take_failure(self, service: str) -> Optional[Tuple[int, Optional[float]]]:
+        with self._lock:
+            queue = self._failures.get(service)
+            return queue.pop(0) if queue else None
+
+    def start(self) -> "FakeStack":
+        """Start all servers on free ports."""
+        for service, handler in (
+            ("api", _APIHandler),
+            ("mcp", _MCPHandler),
+            ("auth", _AuthHandler),
+        ):
+            handler_class = type(handler.__name__, (handler,), {"stack": self})
+            server = ThreadingHTTPServer((self.config.host, 0), handler_class)
+            server.daemon_threads = True
+            thread = threading.Thread(
+                target=server.serve_forever, name=f"fake-{service}", daemon=True
+            )
+            thread.start()
+            self._servers[service] = server
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Stop all servers."""
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers.clear()
+        self._threads.clear()
+
+    def _url(self, service: str) -> str:
+        host, port = self._servers[service].server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return self._url("api")
+
+    @property
+    def mcp_url(self) -> str:
+        return self._url("mcp")
+
+    @property
+    def auth_url(self) -> str:
+        return self._url("auth")
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.auth_url}/realms/{self.config.realm}/protocol/openid-connect/token"
+
+    def settings(self) -> Dict[str, Any]:
+        """TestConfig values pointing the suite at this stack."""
+        return {
+            "railway_api_url": self.api_url,
+            "railway_mcp_url": self.mcp_url,
+            "railway_ui_url": "http://127.0.0.1:9",  # UI is not served
+            "railway_auth_url": self.auth_url,
+            "oauth2_token_url": self.token_url,
+            "oauth2_issuer_url": f"{self.auth_url}/realms/{self.config.realm}",
+            "keycloak_base_url": self.auth_url,
+            "keycloak_realm": self.config.realm,
+            "keycloak_admin": self.config.admin_username,
+            "keycloak_admin_password": self.config.admin_password,
+            "functional_tests_client_id": self.config.client_id,
+            "functional_tests_client_secret": self.config.client_secret,
+            "functional_test_user_email": self.config.username,
+            "functional_test_user_password": self.config.password,
+        }
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def _serve(config: FakeStackConfig, conn):
+    """Child process entry point: run the stack until told to stop."""
+    # Ctrl+C reaches the whole process group; shutdown is driven by the parent
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stack = FakeStack(config).start()
+    conn.send(stack.settings())
+    conn.recv()
+    conn.send(stack.request_counts)
+    stack.stop()
+
+
+class FakeStackProcess:
+    """Fake stack in a child process, so its CPU and memory stay out of client measurements."""
+
+    def __init__(self, config: Optional[FakeStackConfig] = None):
+        self.config = config or FakeStackConfig()
+        self.request_counts: Dict[str, int] = {}
+        self._conn = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._settings: Dict[str, Any] = {}
+
+    def start(self) -> "FakeStackProcess":
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_serve, args=(self.config, child_conn), daemon=True
+        )
+        self._process.start()
+        self._conn = parent_conn
+        self._settings = parent_conn.recv()
+        return self
+
+    def stop(self):
+        if self._process is None:
+            return
+        self._conn.send("stop")
+        self.request_counts = self._conn.recv()
+        self._process.join(timeout=5)
+        self._process = None
+
+    def settings(self) -> Dict[str, Any]:
+        """TestConfig values pointing the suite at this stack."""
+        return dict(self._settings)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local fake DataKwip stack")
+    parser.add_argument("--orgs", type=int, default=3, help="Number of organizations")
+    parser.add_argument("--entities", type=int, default=1000, help="Entities per organization")
+    parser.add_argument("--tags-per-entity", type=int, default=5, help="Tags per entity")
+    parser.add_argument("--users", type=int, default=25, help="Keycloak users")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Injected latency per request"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0.0, help="Extra random latency (0..jitter)"
+    )
+    args = parser.parse_args()
+
+    stack = FakeStack(
+        FakeStackConfig(
+            orgs=args.orgs,
+            entities_per_org=args.entities,
+            tags_per_entity=args.tags_per_entity,
+            users=args.users,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+        )
+    ).start()
+
+    print("Fake DataKwip stack running. Environment for the suite:\n")
+    for key, value in stack.settings().items():
+        print(f"{key.upper()}={value}")
+    print("\nPress Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stack.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""Data freshness probe: time from a TimescaleDB write until API/MCP serve it.
+
+Each probe writes one marker point (a negative value unique to the run, on
+an existing entity) straight into the time-series table, then polls every
+source (MCP ``get_current_values``, API ``/entityvalue``) concurrently until
+the marker comes back as the entity's current value.
+
+Polls follow AdaptiveBackoff: without history they start right after the
+write and back off geometrically; once lags have been observed, the first
+poll waits for most of the expected lag and later polls start close
+together, so resolution is finest where the marker is likely to appear and
+a slow pipeline is not hammered.
+
+The lag of a sample is the midpoint of the first poll that saw the marker,
+measured from the commit; the true lag lies within ``resolution`` seconds
+before it (back to the previous poll). Lags are recorded in a
+LatencyRecorder as ``freshness_<source>``.
+"""
+
+import itertools
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+
+from .latency import LatencyRecorder, LatencySummary
+from .seeder import VALUE_TABLE
+
+# Unit of marker rows, so leftovers are easy to find and delete
+MARKER_UNIT = "freshness-marker"
+
+_INSERT_MARKER_SQL = f"""
+INSERT INTO {VALUE_TABLE} (entity_id, ts, value, unit)
+VALUES (%(entity_id)s, %(timestamp)s, %(value)s, %(unit)s)
+"""
+
+
+class MarkerPoint(BaseModel):
+    """One time-series point written by the probe."""
+
+    entity_id: int
+    org_id: int
+    timestamp: datetime
+    value: float
+    unit: str = MARKER_UNIT
+
+    def seen_in(self, rows: List[Dict[str, Any]]) -> bool:
+        """Whether current value rows contain this marker."""
+        return any(
+            row.get("entity_id") == self.entity_id
+            and row.get("value") is not None
+            and abs(float(row["value"]) - self.value) < 1e-6
+            for row in rows
+        )
+
+
+class FreshnessSample(BaseModel):
+    """Write-to-visible lag of one marker at one source."""
+
+    source: str
+    lag: Optional[float] = None  # Seconds; None when the marker never appeared
+    resolution: float = 0.0  # Seconds since the previous poll (uncertainty of lag)
+    polls: int = 0
+    errors: int = 0
+
+    @property
+    def visible(self) -> bool:
+        return self.lag is not None
+
+
+class AdaptiveBackoff:
+    """Poll schedule of one source, adapted to the lags seen so far.
+
+    Args:
+        min_delay: Smallest gap between polls (seconds)
+        max_delay: Largest gap between polls (seconds)
+        factor: Growth of the gap after each miss
+        lead: First poll at this fraction of the expected lag
+        smoothing: Weight of the newest lag in the expected lag (EWMA)
+    """
+
+    def __init__(
+        self,
+        min_delay: float = 0.05,
+        max_delay: float = 2.0,
+        factor: float = 1.5,
+        lead: float = 0.8,
+        smoothing: float = 0.3,
+    ):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.factor = factor
+        self.lead = lead
+        self.smoothing = smoothing
+        self.expected: Optional[float] = None
+
+    def observe(self, lag: float):
+        """Fold an observed lag into the expected lag."""
+        if self.expected is None:
+            self.expected = lag
+        else:
+            self.expected = self.smoothing * lag + (1 - self.smoothing) * self.expected
+
+    def schedule(self) -> Iterator[float]:
+        """Poll times in seconds after the write (endless)."""
+        if self.expected is None:
+            offset, step = 0.0, self.min_delay
+        else:
+            offset = self.lead * self.expected
+            step = min(max(self.expected / 10, self.min_delay), self.max_delay)
+        while True:
+            yield offset
+            offset += step
+            step = min(step * self.factor, self.max_delay)
+
+
+def write_marker(conn, marker: MarkerPoint):
+    """Insert a marker point (caller owns the transaction)."""
+    with conn.cursor() as cur:
+        cur.execute(_INSERT_MARKER_SQL, marker.model_dump())
+
+
+def delete_markers(conn, entity_id: Optional[int] = None) -> int:
+    """Delete marker points (of one entity, or all); returns rows deleted."""
+    sql = f"DELETE FROM {VALUE_TABLE} WHERE unit = %s"
+    params: List[Any] = [MARKER_UNIT]
+    if entity_id is not None:
+        sql += " AND entity_id = %s"
+        params.append(entity_id)
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        return cur.rowcount
+
+
+class DatabaseMarkerWriter:
+    """Writes each marker in its own committed transaction on a dedicated connection.
+
+    Args:
+        database_url: Connection URL (default: DATABASE_URL from environment)
+        cleanup: Delete the written markers on close()
+
+    Example:
+        >>> with DatabaseMarkerWriter() as writer:
+        ...     probe = FreshnessProbe(writer, sources, entity_id=1)
+    """
+
+    def __init__(self, database_url: Optional[str] = None, cleanup: bool = True):
+        from . import database
+
+        self.conn = database.connect(database_url)
+        self.cleanup = cleanup
+        self.entity_ids = set()
+
+    def __call__(self, marker: MarkerPoint):
+        with self.conn:
+            write_marker(self.conn, marker)
+        self.entity_ids.add(marker.entity_id)
+
+    def close(self):
+        try:
+            if self.cleanup:
+                with self.conn:
+                    for entity_id in self.entity_ids:
+                        delete_markers(self.conn, entity_id)
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class FreshnessProbe:
+    """Write marker points and measure how long each source takes to serve them.
+
+    Args:
+        write: Stores a marker point durably before returning
+        sources: Source name -> function returning current value rows for a
+            marker (called with the marker; e.g. get_current_values of its entity)
+        entity_id: Entity the markers are written to
+        org_id: Organization of the entity
+        timeout: Seconds to wait for each source before giving up on a marker
+        recorder: Receives the lags (default: a new LatencyRecorder)
+        backoff: Factory for the per-source poll schedule
+
+    Example:
+        >>> probe = FreshnessProbe(
+        ...     writer,
+        ...     {"mcp": lambda m: mcp.get_current_values([m.entity_id], org_id=m.org_id)},
+        ...     entity_id=1,
+        ... )
+        >>> probe.run(samples=10, interval=5)
+        >>> print(probe.report())
+    """
+
+    def __init__(
+        self,
+        write: Callable[[MarkerPoint], None],
+        sources: Dict[str, Callable[[MarkerPoint], List[Dict[str, Any]]]],
+        entity_id: int,
+        org_id: int = 1,
+        timeout: float = 60.0,
+        recorder: Optional[LatencyRecorder] = None,
+        backoff: Callable[[], AdaptiveBackoff] = AdaptiveBackoff,
+    ):
+        self.write = write
+        self.sources = dict(sources)
+        self.entity_id = entity_id
+        self.org_id = org_id
+        self.timeout = timeout
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.backoffs = {name: backoff() for name in self.sources}
+        self.samples: List[FreshnessSample] = []
+        self._run_id = random.randrange(1, 1_000_000)
+        self._sequence = itertools.count(1)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(len(self.sources), 1), thread_name_prefix="freshness"
+        )
+
+    def drop_unavailable(self) -> Dict[str, str]:
+        """Read each source once and drop those that fail (e.g. an endpoint the deployment lacks).
+
+        Returns:
+            Dropped source name -> error
+        """
+        marker = self.next_marker()
+        dropped = {}
+        for name, source in list(self.sources.items()):
+            try:
+                source(marker)
+            except Exception as e:
+                dropped[name] = str(e)
+                del self.sources[name]
+        return dropped
+
+    def next_marker(self) -> MarkerPoint:
+        """New marker point, timestamped now."""
+        # Negative and unique per run and sample, so it cannot be a real reading
+        value = -float(self._run_id * 10_000 + next(self._sequence))
+        return MarkerPoint(
+            entity_id=self.entity_id,
+            org_id=self.org_id,
+            timestamp=datetime.now(timezone.utc),
+            value=value,
+        )
+
+    def _poll(self, name: str, marker: MarkerPoint, written_at: float) -> FreshnessSample:
+        source = self.sources[name]
+        backoff = self.backoffs[name]
+        sample = FreshnessSample(source=name)
+        previous = 0.0
+
+        for offset in backoff.schedule():
+            if offset > self.timeout:
+                break
+            time.sleep(max(0.0, written_at + offset - time.perf_counter()))
+
+            sent = time.perf_counter()
+            sample.polls += 1
+            try:
+                rows = source(marker)
+            except Exception:
+                sample.errors += 1
+                continue
+            seen_at = (sent + time.perf_counter()) / 2 - written_at
+
+            if marker.seen_in(rows):
+                sample.lag = seen_at
+                sample.resolution = seen_at - previous
+                # Midpoint of the bracket, so a hit on the first poll pulls the schedule earlier
+                backoff.observe(seen_at - sample.resolution / 2)
+                break
+            previous = seen_at
+
+        return sample
+
+    def probe(self) -> Dict[str, FreshnessSample]:
+        """Write one marker and poll all sources concurrently until they serve it.
+
+        Returns:
+            Source name -> sample
+        """
+        marker = self.next_marker()
+        self.write(marker)
+        written_at = time.perf_counter()
+
+        futures = {
+            name: self._executor.submit(self._poll, name, marker, written_at)
+            for name in self.sources
+        }
+        results = {name: future.result() for name, future in futures.items()}
+
+        for sample in results.values():
+            self.samples.append(sample)
+            if sample.visible:
+                self.recorder.record(f"freshness_{sample.source}", sample.lag)
+        return results
+
+    def run(
+        self,
+        samples: int,
+        interval: float = 0.0,
+        on_sample: Optional[Callable[[int, Dict[str, FreshnessSample]], None]] = None,
+    ) -> List[FreshnessSample]:
+        """Probe `samples` times, starting a probe every `interval` seconds (or back to back).
+
+        Args:
+            samples: Number of markers to write
+            interval: Seconds between probe starts
+            on_sample: Called with (sample number, results) after each probe
+
+        Returns:
+            All samples collected so far
+        """
+        for number in range(1, samples + 1):
+            started = time.perf_counter()
+            results = self.probe()
+            if on_sample is not None:
+                on_sample(number, results)
+            if number < samples:
+                time.sleep(max(0.0, interval - (time.perf_counter() - started)))
+        return self.samples
+
+    def summary(self, source: str) -> LatencySummary:
+        """Lag percentiles (milliseconds) of the markers a source served."""
+        return self.recorder.summary(f"freshness_{source}")
+
+    def timeouts(self, source: str) -> int:
+        """Markers a source did not serve within the timeout."""
+        return sum(1 for s in self.samples if s.source == source and not s.visible)
+
+    def report(self) -> str:
+        """Printable lag distribution per source."""
+        lines = [
+            f"{'Source':<8} {'seen':>5} {'missed':>6} {'p50':>9} {'p95':>9} {'p99':>9} "
+            f"{'max':>9} {'±res':>8} {'polls':>6}",
+            "-" * 80,
+        ]
+        for name in self.sources:
+            samples = [s for s in self.samples if s.source == name]
+            visible = [s for s in samples if s.visible]
+            s = self.summary(name)
+            resolution = statistics.median(v.resolution for v in visible) * 1000 if visible else 0.0
+            polls = statistics.mean(v.polls for v in samples) if samples else 0.0
+            lines.append(
+                f"{name:<8} {len(visible):>5} {self.timeouts(name):>6} "
+                f"{s.p50:>7.0f}ms {s.p95:>7.0f}ms {s.p99:>7.0f}ms {s.max:>7.0f}ms "
+                f"{resolution:>6.0f}ms {polls:>6.1f}"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,457 @@
+"""Verify API and MCP data against the database (ground truth).
+
+Entities and tags of an organization are reduced to a Digest on both sides:
+a row count plus an order-independent hash (sum of 60-bit row hashes modulo
+2**64). The database computes it in SQL, so only a few bytes come back. The
+client computes it while rows stream page by page from the API or MCP, so no
+rows are kept. Row hashes are md5 over the same canonical text in SQL and
+Python.
+
+Rows are hash-partitioned into BUCKETS buckets by md5 of the entity ID, so
+an entity's tags share its bucket. Buckets are arranged in GROUPS groups.
+When totals disagree, verification narrows down in three steps:
+
+1. per-group digests;
+2. per-bucket digests, only inside mismatched groups;
+3. the rows of mismatched buckets, compared with the same buckets
+   re-streamed from the source.
+
+Matching data costs one small query per kind. A few bad rows add three more
+queries and one extra pass over the source.
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .seeder import ENTITY_TABLE, TAG_TABLE
+
+ENTITIES = "entities"
+TAGS = "tags"
+
+BUCKETS = 4096  # md5 prefix of 3 hex digits
+GROUPS = 64
+BUCKETS_PER_GROUP = BUCKETS // GROUPS
+HASH_MODULUS = 2**64
+
+# Canonical fields (first = row key) and the partition field per kind
+FIELDS = {
+    ENTITIES: ("id", "key", "name"),
+    TAGS: ("id", "entity_id", "tag_key", "tag_value"),
+}
+PARTITION_FIELD = {ENTITIES: "id", TAGS: "entity_id"}
+
+# (FROM clause, org column) per kind; rows are aliased r
+_SOURCES_SQL = {
+    ENTITIES: (f"FROM {ENTITY_TABLE} AS r", "r.org_id"),
+    TAGS: (f"FROM {TAG_TABLE} AS r JOIN {ENTITY_TABLE} AS e ON e.id = r.entity_id", "e.org_id"),
+}
+
+# (org_id, limit, offset) -> rows
+Fetch = Callable[[int, int, int], List[Dict[str, Any]]]
+
+
+def row_text(kind: str, row: Dict[str, Any]) -> str:
+    """Canonical text of a row (same as _text_sql)."""
+    return "|".join("" if row.get(field) is None else str(row[field]) for field in FIELDS[kind])
+
+
+def row_hash(text: str) -> int:
+    """60-bit hash of a row's canonical text (same as _hash_sql)."""
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:15], 16)
+
+
+def bucket_of(partition_value: Any) -> int:
+    """Hash partition (0..BUCKETS-1) of an entity ID (same as _bucket_sql)."""
+    return int(hashlib.md5(str(partition_value).encode("utf-8")).hexdigest()[:3], 16)
+
+
+def _text_sql(kind: str) -> str:
+    fields = ", ".join(f"coalesce(r.{field}::text, '')" for field in FIELDS[kind])
+    return f"concat_ws('|', {fields})"
+
+
+def _hash_sql(kind: str) -> str:
+    return f"('x' || substr(md5({_text_sql(kind)}), 1, 15))::bit(60)::bigint"
+
+
+def _bucket_sql(kind: str) -> str:
+    return f"('x' || substr(md5(r.{PARTITION_FIELD[kind]}::text), 1, 3))::bit(12)::integer"
+
+
+class Digest(BaseModel):
+    """Row count and order-independent hash of a set of rows."""
+
+    rows: int = 0
+    hash: int = 0
+
+
+EMPTY = Digest()
+
+
+class Discrepancy(BaseModel):
+    """One row that differs between the database and a source."""
+
+    key: Any
+    problem: str  # missing, unexpected, changed or duplicate
+    expected: Optional[str] = None  # Canonical text in the database
+    actual: Optional[str] = None  # Canonical text from the source
+
+
+class Verification(BaseModel):
+    """Outcome of comparing one kind of rows of one org with one source."""
+
+    org_id: int
+    kind: str
+    source: str
+    expected: Digest
+    actual: Digest
+    groups_checked: int = 0
+    buckets_checked: int = 0
+    discrepancies: List[Discrepancy] = []
+    truncated: bool = False  # More buckets mismatched than were drilled into
+    duration: float = 0.0
+
+    @property
+    def matches(self) -> bool:
+        return self.expected == self.actual
+
+
+class DatabaseDigest:
+    """Digests of one org's rows computed inside Postgres.
+
+    Args:
+        pool: psycopg2 connection pool (see fixtures.database.connection_pool)
+        kind: ENTITIES or TAGS
+        org_id: Organization ID
+    """
+
+    def __init__(self, pool, kind: str, org_id: int):
+        self.pool = pool
+        self.kind = kind
+        self.org_id = org_id
+
+    def _query(
+        self, select: str, where: str = "", group_by: str = "", params: Tuple = ()
+    ) -> List[Dict]:
+        from .database import pooled
+
+        from_sql, org_column = _SOURCES_SQL[self.kind]
+        sql = f"SELECT {select} {from_sql} WHERE {org_column} = %s {where} {group_by}"
+        with pooled(self.pool) as conn, conn.cursor() as cur:
+            cur.execute(sql, (self.org_id,) + params)
+            return cur.fetchall()
+
+    def _aggregate(self) -> str:
+        # sum(bigint) is numeric in Postgres, so the sum cannot overflow before the modulo
+        hash_sum = f"coalesce(sum({_hash_sql(self.kind)}), 0)"
+        return f"count(*) AS rows, mod({hash_sum}, {HASH_MODULUS}) AS hash"
+
+    def _digests(self, part: str, where: str = "", params: Tuple = ()) -> Dict[int, Digest]:
+        rows = self._query(f"{part} AS part, {self._aggregate()}", where, "GROUP BY 1", params)
+        return {row["part"]: Digest(rows=row["rows"], hash=int(row["hash"])) for row in rows}
+
+    def total(self) -> Digest:
+        row = self._query(self._aggregate())[0]
+        return Digest(rows=row["rows"], hash=int(row["hash"]))
+
+    def groups(self) -> Dict[int, Digest]:
+        return self._digests(f"{_bucket_sql(self.kind)} / {BUCKETS_PER_GROUP}")
+
+    def buckets(self, groups: Iterable[int]) -> Dict[int, Digest]:
+        groups = list(groups)
+        if not groups:
+            return {}
+        bucket = _bucket_sql(self.kind)
+        return self._digests(
+            bucket, f"AND {bucket} / {BUCKETS_PER_GROUP} = ANY(%s::integer[])", (groups,)
+        )
+
+    def rows(self, buckets: Iterable[int]) -> Dict[Any, List[str]]:
+        buckets = list(buckets)
+        if not buckets:
+            return {}
+        key = FIELDS[self.kind][0]
+        rows = self._query(
+            f"r.{key} AS key, {_text_sql(self.kind)} AS text",
+            f"AND {_bucket_sql(self.kind)} = ANY(%s::integer[])",
+            params=(buckets,),
+        )
+        result: Dict[Any, List[str]] = {}
+        for row in rows:
+            result.setdefault(row["key"], []).append(row["text"])
+        return result
+
+
+class StreamDigest:
+    """Digests of rows streamed page by page from a source (API, MCP, fake dataset).
+
+    The first call streams every row once and keeps only per-bucket counts
+    and hashes; rows() streams again, keeping the rows of the given buckets.
+
+    Args:
+        kind: ENTITIES or TAGS
+        fetch: (org_id, limit, offset) -> rows
+        org_id: Organization ID
+        page_size: Rows per request
+    """
+
+    def __init__(self, kind: str, fetch: Fetch, org_id: int, page_size: int = 1000):
+        self.kind = kind
+        self.fetch = fetch
+        self.org_id = org_id
+        self.page_size = page_size
+        self._counts: Optional[List[int]] = None
+        self._hashes: List[int] = []
+        self._lock = threading.Lock()
+
+    def _stream(self) -> Iterator[Dict[str, Any]]:
+        offset = 0
+        while True:
+            page = self.fetch(self.org_id, self.page_size, offset)
+            yield from page
+            if len(page) < self.page_size:
+                return
+            offset += len(page)
+
+    def _compute(self):
+        with self._lock:
+            if self._counts is not None:
+                return
+            counts = [0] * BUCKETS
+            hashes = [0] * BUCKETS
+            partition = PARTITION_FIELD[self.kind]
+            for row in self._stream():
+                bucket = bucket_of(row.get(partition))
+                counts[bucket] += 1
+                hashes[bucket] += row_hash(row_text(self.kind, row))
+            self._counts, self._hashes = counts, hashes
+
+    def _digest(self, buckets: Iterable[int]) -> Digest:
+        self._compute()
+        buckets = list(buckets)
+        return Digest(
+            rows=sum(self._counts[b] for b in buckets),
+            hash=sum(self._hashes[b] for b in buckets) % HASH_MODULUS,
+        )
+
+    def total(self) -> Digest:
+        return self._digest(range(BUCKETS))
+
+    def groups(self) -> Dict[int, Digest]:
+        digests = {
+            group: self._digest(range(group * BUCKETS_PER_GROUP, (group + 1) * BUCKETS_PER_GROUP))
+            for group in range(GROUPS)
+        }
+        return {group: digest for group, digest in digests.items() if digest.rows}
+
+    def buckets(self, groups: Iterable[int]) -> Dict[int, Digest]:
+        digests = {}
+        for group in groups:
+            for bucket in range(group * BUCKETS_PER_GROUP, (group + 1) * BUCKETS_PER_GROUP):
+                digest = self._digest([bucket])
+                if digest.rows:
+                    digests[bucket] = digest
+        return digests
+
+    def rows(self, buckets: Iterable[int]) -> Dict[Any, List[str]]:
+        wanted = set(buckets)
+        fields = FIELDS[self.kind]
+        partition = PARTITION_FIELD[self.kind]
+        result: Dict[Any, List[str]] = {}
+        for row in self._stream():
+            if bucket_of(row.get(partition)) in wanted:
+                result.setdefault(row.get(fields[0]), []).append(row_text(self.kind, row))
+        return result
+
+
+def _mismatched(expected: Dict[int, Digest], actual: Dict[int, Digest]) -> List[int]:
+    return sorted(
+        k for k in expected.keys() | actual.keys() if expected.get(k, EMPTY) != actual.get(k, EMPTY)
+    )
+
+
+def _diff(expected: Dict[Any, List[str]], actual: Dict[Any, List[str]]) -> List[Discrepancy]:
+    discrepancies = []
+    for key in sorted(expected.keys() | actual.keys(), key=str):
+        want, got = expected.get(key), actual.get(key)
+        if got is None:
+            discrepancies.append(Discrepancy(key=key, problem="missing", expected=want[0]))
+        elif want is None:
+            discrepancies.append(Discrepancy(key=key, problem="unexpected", actual=got[0]))
+        elif len(got) > len(want):
+            discrepancies.append(
+                Discrepancy(key=key, problem="duplicate", expected=want[0], actual=got[0])
+            )
+        elif sorted(got) != sorted(want):
+            discrepancies.append(
+                Discrepancy(key=key, problem="changed", expected=want[0], actual=got[0])
+            )
+    return discrepancies
+
+
+def verify(
+    expected, actual, org_id: int, kind: str, source: str, max_buckets: int = 64
+) -> Verification:
+    """Compare a source's rows with the ground truth, drilling down only where digests differ.
+
+    Args:
+        expected: Ground-truth digests (DatabaseDigest, or StreamDigest offline)
+        actual: Source digests (StreamDigest)
+        org_id: Organization ID (for the result)
+        kind: ENTITIES or TAGS (for the result)
+        source: Source name (for the result)
+        max_buckets: Mismatched buckets whose rows are fetched and compared
+
+    Returns:
+        Verification with digests and, on mismatch, the differing rows
+    """
+    start = time.perf_counter()
+    result = Verification(
+        org_id=org_id, kind=kind, source=source, expected=expected.total(), actual=actual.total()
+    )
+
+    if not result.matches:
+        groups = _mismatched(expected.groups(), actual.groups())
+        result.groups_checked = GROUPS
+        buckets = _mismatched(expected.buckets(groups), actual.buckets(groups))
+        result.buckets_checked = len(groups) * BUCKETS_PER_GROUP
+        result.truncated = len(buckets) > max_buckets
+        buckets = buckets[:max_buckets]
+        if buckets:
+            result.discrepancies = _diff(expected.rows(buckets), actual.rows(buckets))
+
+    result.duration = time.perf_counter() - start
+    return result
+
+
+def database_truth(pool) -> Callable[[str, int], DatabaseDigest]:
+    """Ground truth read from Postgres through a connection pool."""
+    return lambda kind, org_id: DatabaseDigest(pool, kind, org_id)
+
+
+def stream_truth(
+    fetchers: Dict[str, Fetch], page_size: int = 1000
+) -> Callable[[str, int], StreamDigest]:
+    """Ground truth streamed from fetch functions (e.g. the fake stack's dataset)."""
+    return lambda kind, org_id: StreamDigest(kind, fetchers[kind], org_id, page_size)
+
+
+def api_fetchers(api_client) -> Dict[str, Fetch]:
+    """Entity and tag pages from the API."""
+    return {
+        ENTITIES: lambda org_id, limit, offset: api_client.list_entities(
+            org_id=org_id, limit=limit, offset=offset
+        ),
+        TAGS: lambda org_id, limit, offset: api_client.list_entity_tags(
+            org_id=org_id, limit=limit, offset=offset
+        ),
+    }
+
+
+def mcp_fetchers(mcp_client) -> Dict[str, Fetch]:
+    """Entity pages from MCP (MCP has no tag listing)."""
+    return {
+        ENTITIES: lambda org_id, limit, offset: mcp_client.query_entities(
+            org_id=org_id, limit=limit, offset=offset
+        ),
+    }
+
+
+class GroundTruthVerifier:
+    """Check every source against the ground truth for a set of orgs, concurrently.
+
+    Each (org, kind, source) check runs on its own worker thread; with a
+    database truth, each check borrows a pooled connection per query, so
+    the pool needs at least `workers` connections.
+
+    Args:
+        truth: (kind, org_id) -> ground-truth digests (database_truth or stream_truth)
+        sources: Source name -> kind -> fetch function (api_fetchers, mcp_fetchers)
+        page_size: Rows per source request
+        workers: Concurrent checks
+        max_buckets: Mismatched buckets drilled into per check
+
+    Example:
+        >>> pool = database.connection_pool(maxconn=4)
+        >>> verifier = GroundTruthVerifier(
+        ...     database_truth(pool),
+        ...     {"api": api_fetchers(api), "mcp": mcp_fetchers(mcp)},
+        ...     workers=4,
+        ... )
+        >>> results = verifier.verify_orgs([1, 2])
+    """
+
+    def __init__(
+        self,
+        truth: Callable[[str, int], Any],
+        sources: Dict[str, Dict[str, Fetch]],
+        page_size: int = 1000,
+        workers: int = 4,
+        max_buckets: int = 64,
+    ):
+        self.truth = truth
+        self.sources = sources
+        self.page_size = page_size
+        self.workers = workers
+        self.max_buckets = max_buckets
+
+    def verify_orgs(self, org_ids: Iterable[int]) -> List[Verification]:
+        """Verify every kind each source serves, for each org.
+
+        Returns:
+            One Verification per (org, kind, source), in that order
+        """
+        checks = []
+        for org_id in org_ids:
+            for kind in (ENTITIES, TAGS):
+                # One truth per org and kind, shared by the sources serving it
+                truth = self.truth(kind, org_id)
+                for source, fetchers in self.sources.items():
+                    if kind in fetchers:
+                        actual = StreamDigest(kind, fetchers[kind], org_id, self.page_size)
+                        checks.append((truth, actual, org_id, kind, source))
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="ground-truth"
+        ) as executor:
+            futures = [
+                executor.submit(verify, truth, actual, org_id, kind, source, self.max_buckets)
+                for truth, actual, org_id, kind, source in checks
+            ]
+            return [future.result() for future in futures]
+
+    def verify_org(self, org_id: int) -> List[Verification]:
+        return self.verify_orgs([org_id])
+
+
+def format_report(results: List[Verification], max_rows: int = 10) -> str:
+    """Printable per-org, per-source comparison with the first discrepancies of each mismatch."""
+    lines = [
+        f"{'Org':>5} {'Kind':<9} {'Source':<6} {'DB rows':>9} {'Rows':>9} "
+        f"{'Status':<9} {'Diffs':>6} {'Time':>8}",
+        "-" * 70,
+    ]
+    for r in results:
+        status = "✓ match" if r.matches else "✗ differ"
+        lines.append(
+            f"{r.org_id:>5} {r.kind:<9} {r.source:<6} {r.expected.rows:>9} {r.actual.rows:>9} "
+            f"{status:<9} {len(r.discrepancies):>6} {r.duration:>7.2f}s"
+        )
+    for r in results:
+        if r.matches:
+            continue
+        lines.append(
+            f"\nOrg {r.org_id} {r.kind} via {r.source}"
+            f" ({r.buckets_checked} of {BUCKETS} buckets checked"
+            f"{', truncated' if r.truncated else ''}):"
+        )
+        for d in r.discrepancies[:max_rows]:
+            lines.append(f"  {d.problem:<10} {d.key}: db={d.expected!r} source={d.actual!r}")
+        if len(r.discrepancies) > max_rows:
+            lines.append(f"  ... {len(r.discrepancies) - max_rows} more")
+    return "\n".join(lines)
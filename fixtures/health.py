@@ -0,0 +1,432 @@
+"""Database health sampling from the API's ``/health/databases`` endpoint.
+
+HealthSampler polls the endpoint at a fixed rate and keeps, per database
+(timescaledb, statedb, ...), a rolling time series of the reported status
+and ``latency_ms``. The pseudo-database ``overall`` holds ``overall_status``
+with the round-trip time of the health request itself; a failed request is
+recorded there as ``unreachable``.
+
+Events are detected online, as each sample arrives:
+
+- StatusTransition: a database's status changed
+- DegradedPeriod: a run of samples with a status other than ``healthy``
+  (open until the database reports healthy again)
+- LatencySpike: a latency far above the recent baseline, by robust z-score
+  (median and MAD of the last ``spike_window`` samples, as in the benchmark
+  history), with an absolute floor so jitter on a flat baseline is ignored
+
+``result()`` returns everything as one pydantic model (HealthReport), e.g.
+to dump as JSON.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from .history import MAD_SCALE
+from .latency import LatencySummary
+
+HEALTHY = "healthy"
+UNREACHABLE = "unreachable"  # The health request itself failed
+MISSING = "missing"  # A database seen before is absent from the response
+
+# Pseudo-database for overall_status and the health request's round trip
+OVERALL = "overall"
+
+
+class HealthPoint(BaseModel):
+    """One database's status and latency in one sample."""
+
+    database: str
+    at: float  # Unix time
+    status: str
+    latency_ms: Optional[float] = None
+
+
+class StatusTransition(BaseModel):
+    database: str
+    at: float
+    previous: str
+    status: str
+
+
+class DegradedPeriod(BaseModel):
+    """Consecutive samples in which a database was not healthy."""
+
+    database: str
+    start: float
+    end: Optional[float] = None  # First healthy sample afterwards; None while ongoing
+    last_seen: float
+    samples: int = 1
+    statuses: List[str] = []
+
+    @property
+    def ongoing(self) -> bool:
+        return self.end is None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the first unhealthy sample to recovery (or to the latest sample)."""
+        return (self.end if self.end is not None else self.last_seen) - self.start
+
+
+class LatencySpike(BaseModel):
+    database: str
+    at: float
+    latency_ms: float
+    baseline_ms: float  # Median of the preceding window
+    z_score: float
+
+
+class DatabaseHealthSummary(BaseModel):
+    """Rolling-window statistics of one database."""
+
+    database: str
+    samples: int = 0
+    status: Optional[str] = None  # Latest
+    healthy_ratio: float = 1.0
+    latency: LatencySummary = LatencySummary()
+    transitions: int = 0
+    degraded_seconds: float = 0.0
+    spikes: int = 0
+
+
+class HealthReport(BaseModel):
+    """Structured result of a sampling run."""
+
+    started: Optional[float] = None
+    polls: int = 0
+    missed_polls: int = 0
+    window: float
+    summaries: List[DatabaseHealthSummary] = []
+    transitions: List[StatusTransition] = []
+    degraded_periods: List[DegradedPeriod] = []
+    spikes: List[LatencySpike] = []
+
+
+def parse_health(health: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Database name -> {"status", "latency_ms"} from a /health/databases response.
+
+    Accepts the ``databases`` list as well as per-database entries keyed by name.
+    """
+    databases = {}
+    for entry in health.get("databases") or []:
+        if isinstance(entry, dict) and entry.get("name"):
+            databases[entry["name"]] = entry
+    for name, entry in health.items():
+        if name not in databases and isinstance(entry, dict) and "status" in entry:
+            databases[name] = entry
+    return databases
+
+
+class _DatabaseSeries:
+    """Rolling points, spike baseline and open degraded period of one database."""
+
+    def __init__(self, window: float, max_samples: int, spike_window: int):
+        self.window = window
+        self.points: Deque[HealthPoint] = deque(maxlen=max_samples)
+        self.baseline: Deque[float] = deque(maxlen=spike_window)
+        self.period: Optional[DegradedPeriod] = None
+
+    def prune(self, now: float):
+        while self.points and self.points[0].at < now - self.window:
+            self.points.popleft()
+
+
+class HealthSampler:
+    """Polls /health/databases at a fixed rate and detects transitions, degraded periods and spikes.
+
+    Args:
+        fetch: Returns the health response (e.g. api_client.get_database_health)
+        interval: Seconds between polls (fixed rate; polls are never stacked)
+        window: Seconds of points kept for the rolling statistics
+        max_samples: Upper bound on kept points per database
+        spike_window: Preceding samples forming a database's latency baseline
+        spike_min_samples: Baseline samples needed before spikes are flagged
+        z_threshold: Minimum robust z-score of a spike
+        min_spike_ms: Minimum latency increase over the baseline median
+        on_event: Called with every transition, new degraded period and spike
+
+    Example:
+        >>> sampler = HealthSampler(api_client.get_database_health, interval=5)
+        >>> threading.Thread(target=sampler.run, daemon=True).start()
+        >>> print(sampler.report())
+        >>> sampler.result().degraded_periods
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, Any]],
+        interval: float = 5.0,
+        window: float = 3600.0,
+        max_samples: int = 10_000,
+        spike_window: int = 60,
+        spike_min_samples: int = 10,
+        z_threshold: float = 4.0,
+        min_spike_ms: float = 5.0,
+        on_event: Optional[Callable[[BaseModel], None]] = None,
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self.window = window
+        self.max_samples = max_samples
+        self.spike_window = spike_window
+        self.spike_min_samples = spike_min_samples
+        self.z_threshold = z_threshold
+        self.min_spike_ms = min_spike_ms
+        self.on_event = on_event
+
+        self.started_at: Optional[float] = None
+        self.polls = 0
+        self.missed_polls = 0
+        self.transitions: List[StatusTransition] = []
+        self.degraded_periods: List[DegradedPeriod] = []
+        self.spikes: List[LatencySpike] = []
+        self._series: Dict[str, _DatabaseSeries] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Ask run() to return before the next poll."""
+        self._stop.set()
+
+    def sample(self) -> List[HealthPoint]:
+        """Poll once and feed the points into the series and detectors.
+
+        Returns:
+            One point per database (plus ``overall``)
+        """
+        at = time.time()
+        start = time.perf_counter()
+        try:
+            health = self.fetch()
+        except Exception:
+            health = None
+        round_trip_ms = (time.perf_counter() - start) * 1000
+
+        if health is None:
+            points = [HealthPoint(database=OVERALL, at=at, status=UNREACHABLE)]
+        else:
+            points = [
+                HealthPoint(
+                    database=OVERALL,
+                    at=at,
+                    status=health.get("overall_status") or "unknown",
+                    latency_ms=round_trip_ms,
+                )
+            ]
+            reported = parse_health(health)
+            for name, entry in reported.items():
+                latency = entry.get("latency_ms")
+                points.append(
+                    HealthPoint(
+                        database=name,
+                        at=at,
+                        status=entry.get("status") or "unknown",
+                        latency_ms=float(latency) if latency is not None else None,
+                    )
+                )
+            with self._lock:
+                known = [name for name in self._series if name != OVERALL and name not in reported]
+            points += [HealthPoint(database=name, at=at, status=MISSING) for name in known]
+
+        events: List[BaseModel] = []
+        with self._lock:
+            self.polls += 1
+            for point in points:
+                events += self._add(point)
+        if self.on_event is not None:
+            for event in events:
+                self.on_event(event)
+        return points
+
+    def _add(self, point: HealthPoint) -> List[BaseModel]:
+        """Append a point and run the online detectors (caller holds the lock)."""
+        series = self._series.get(point.database)
+        if series is None:
+            series = self._series[point.database] = _DatabaseSeries(
+                self.window, self.max_samples, self.spike_window
+            )
+        events: List[BaseModel] = []
+
+        previous = series.points[-1].status if series.points else None
+        if previous is not None and previous != point.status:
+            transition = StatusTransition(
+                database=point.database, at=point.at, previous=previous, status=point.status
+            )
+            self.transitions.append(transition)
+            events.append(transition)
+
+        if point.status != HEALTHY:
+            if series.period is None:
+                series.period = DegradedPeriod(
+                    database=point.database,
+                    start=point.at,
+                    last_seen=point.at,
+                    statuses=[point.status],
+                )
+                self.degraded_periods.append(series.period)
+                events.append(series.period)
+            else:
+                series.period.samples += 1
+                series.period.last_seen = point.at
+                if point.status not in series.period.statuses:
+                    series.period.statuses.append(point.status)
+        elif series.period is not None:
+            series.period.end = point.at
+            series.period = None
+
+        if point.latency_ms is not None:
+            spike = self._spike(point, series.baseline)
+            if spike is not None:
+                self.spikes.append(spike)
+                events.append(spike)
+            series.baseline.append(point.latency_ms)
+
+        series.points.append(point)
+        series.prune(point.at)
+        return events
+
+    def _spike(self, point: HealthPoint, baseline: Deque[float]) -> Optional[LatencySpike]:
+        if len(baseline) < self.spike_min_samples:
+            return None
+        median = statistics.median(baseline)
+        mad = statistics.median(abs(value - median) for value in baseline) * MAD_SCALE
+        if mad > 0:
+            z_score = (point.latency_ms - median) / mad
+        else:
+            z_score = float("inf") if point.latency_ms > median else 0.0
+        if z_score < self.z_threshold or point.latency_ms - median < self.min_spike_ms:
+            return None
+        return LatencySpike(
+            database=point.database,
+            at=point.at,
+            latency_ms=point.latency_ms,
+            baseline_ms=median,
+            z_score=min(z_score, 1e6),  # inf does not survive JSON
+        )
+
+    def run(self, duration: Optional[float] = None, samples: Optional[int] = None):
+        """Poll until stop() is called, `duration` seconds have passed or `samples` polls were made.
+
+        Polls are planned at a fixed rate from the schedule; when a poll
+        overruns the interval, the polls it covered are counted as missed
+        instead of being sent late in a burst.
+        """
+        self.started_at = self.started_at or time.time()
+        deadline = time.monotonic() + duration if duration is not None else None
+        scheduled = time.monotonic()
+        made = 0
+
+        while not self._stop.is_set():
+            if samples is not None and made >= samples:
+                break
+            if deadline is not None and scheduled >= deadline:
+                break
+            wait = scheduled - time.monotonic()
+            if wait > 0 and self._stop.wait(wait):
+                break
+
+            self.sample()
+            made += 1
+
+            scheduled += self.interval
+            behind = time.monotonic() - scheduled
+            if behind > 0:
+                missed = int(behind // self.interval) + 1
+                self.missed_polls += missed
+                scheduled += missed * self.interval
+
+    def databases(self) -> List[str]:
+        with self._lock:
+            return list(self._series)
+
+    def series(self, database: str) -> List[HealthPoint]:
+        """Points of one database in the window, oldest first."""
+        with self._lock:
+            series = self._series.get(database)
+            return list(series.points) if series is not None else []
+
+    def summary(self, database: str, now: Optional[float] = None) -> DatabaseHealthSummary:
+        """Rolling-window statistics of one database."""
+        now = now or time.time()
+        with self._lock:
+            series = self._series.get(database)
+            if series is None:
+                return DatabaseHealthSummary(database=database)
+            series.prune(now)
+            points = list(series.points)
+            periods = [p for p in self.degraded_periods if p.database == database]
+            transitions = [t for t in self.transitions if t.database == database]
+            spikes = [s for s in self.spikes if s.database == database]
+        since = now - self.window
+
+        latencies = [p.latency_ms / 1000 for p in points if p.latency_ms is not None]
+        degraded_seconds = sum(
+            max(0.0, (p.end if p.end is not None else p.last_seen) - max(p.start, since))
+            for p in periods
+        )
+        return DatabaseHealthSummary(
+            database=database,
+            samples=len(points),
+            status=points[-1].status if points else None,
+            healthy_ratio=(
+                sum(1 for p in points if p.status == HEALTHY) / len(points) if points else 1.0
+            ),
+            latency=LatencySummary.from_samples(latencies),
+            transitions=sum(1 for t in transitions if t.at >= since),
+            degraded_seconds=degraded_seconds,
+            spikes=sum(1 for s in spikes if s.at >= since),
+        )
+
+    def result(self) -> HealthReport:
+        """Everything recorded so far, as one structured result."""
+        now = time.time()
+        summaries = [self.summary(name, now) for name in self.databases()]
+        with self._lock:
+            return HealthReport(
+                started=self.started_at,
+                polls=self.polls,
+                missed_polls=self.missed_polls,
+                window=self.window,
+                summaries=summaries,
+                transitions=list(self.transitions),
+                degraded_periods=[p.model_copy() for p in self.degraded_periods],
+                spikes=list(self.spikes),
+            )
+
+    def report(self) -> str:
+        """Printable per-database table, then every degraded period and spike recorded."""
+        result = self.result()
+        lines = [
+            f"{'Database':<14} {'samples':>7} {'healthy':>8} {'p50':>8} {'p95':>8} {'max':>8} "
+            f"{'changes':>7} {'degraded':>9} {'spikes':>6}  status",
+        ]
+        for s in result.summaries:
+            mark = "✓" if s.status == HEALTHY else "✗"
+            lines.append(
+                f"{s.database:<14} {s.samples:>7} {s.healthy_ratio:>8.1%} {s.latency.p50:>6.1f}ms "
+                f"{s.latency.p95:>6.1f}ms {s.latency.max:>6.1f}ms {s.transitions:>7} "
+                f"{s.degraded_seconds:>8.1f}s {s.spikes:>6}  {mark} {s.status}"
+            )
+        for p in result.degraded_periods:
+            state = "ongoing" if p.ongoing else "recovered"
+            lines.append(
+                f"  ✗ {p.database} {'/'.join(p.statuses)} at {_clock(p.start)} "
+                f"for {p.duration:.1f}s ({p.samples} samples, {state})"
+            )
+        for spike in result.spikes:
+            lines.append(
+                f"  ✗ {spike.database} latency spike at {_clock(spike.at)}: "
+                f"{spike.latency_ms:.1f}ms (baseline {spike.baseline_ms:.1f}ms, "
+                f"z={spike.z_score:.1f})"
+            )
+        return "\n".join(lines)
+
+
+def _clock(at: float) -> str:
+    return time.strftime("%H:%M:%S", time.localtime(at))
@@ -0,0 +1,372 @@
+"""Benchmark history store and latency regression detection.
+
+Every recorded run keeps the full latency histogram of each operation (from
+LatencyRecorder) in a local SQLite file, together with the git SHA,
+environment and dataset size it was measured against. Regression detection
+compares a run's p95 against the recent baseline of comparable runs (same
+environment and dataset size) using a robust z-score: the median and median
+absolute deviation of the baseline p95s, so one noisy run in the window does
+not move the baseline.
+"""
+
+import json
+import socket
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+from fixtures.latency import LatencyHistogram, LatencyRecorder, LatencySummary
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at TEXT NOT NULL,
+    git_sha TEXT,
+    git_dirty INTEGER NOT NULL DEFAULT 0,
+    environment TEXT NOT NULL,
+    dataset_size INTEGER,
+    host TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS operation_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    operation TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean_ms REAL NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (run_id, operation)
+);
+CREATE INDEX IF NOT EXISTS operation_stats_operation_idx ON operation_stats (operation, run_id);
+"""
+
+# Scale factor that makes MAD comparable to a standard deviation (normal data)
+MAD_SCALE = 1.4826
+
+
+class BenchmarkRun(BaseModel):
+    """One recorded test run."""
+
+    id: int
+    recorded_at: str
+    git_sha: Optional[str] = None
+    git_dirty: bool = False
+    environment: str
+    dataset_size: Optional[int] = None
+    host: Optional[str] = None
+    metadata: Dict[str, Any] = {}
+
+
+class Regression(BaseModel):
+    """p95 of an operation significantly above its recent baseline."""
+
+    operation: str
+    run_id: int
+    current_p95: float
+    baseline_p95: float
+    baseline_runs: int
+    z_score: float
+
+    @property
+    def change(self) -> float:
+        """Relative increase over the baseline median."""
+        return self.current_p95 / self.baseline_p95 - 1 if self.baseline_p95 else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.operation}: p95 {self.current_p95:.0f}ms vs baseline {self.baseline_p95:.0f}ms "
+            f"(+{self.change:.0%}, z={self.z_score:.1f}, {self.baseline_runs} runs)"
+        )
+
+
+def git_revision(cwd: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Current commit SHA and whether the working tree has changes (None outside git)."""
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {"git_sha": None, "git_dirty": False}
+    return {"git_sha": sha, "git_dirty": bool(status.strip())}
+
+
+class BenchmarkHistory:
+    """SQLite store of per-run latency distributions.
+
+    Example:
+        >>> with BenchmarkHistory("benchmarks.sqlite") as history:
+        ...     run_id = history.record_run(recorder, environment="railway", dataset_size=1000)
+        ...     for regression in history.detect_regressions(run_id, ["list_entities"]):
+        ...         print(regression)
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        with self._conn:
+            self._conn.executescript(SCHEMA_SQL)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Recording
+
+    def record_run(
+        self,
+        recorder: LatencyRecorder,
+        environment: str,
+        dataset_size: Optional[int] = None,
+        git_sha: Optional[str] = None,
+        git_dirty: Optional[bool] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """Store one run's histograms.
+
+        Args:
+            recorder: Histograms to store (one row per operation)
+            environment: Target the run measured (e.g. API hostname, "fake-stack")
+            dataset_size: Entities in the test organization, if known
+            git_sha: Commit under test (default: current checkout)
+            git_dirty: Uncommitted changes (default: detected with git_sha)
+            metadata: Extra JSON-serializable details
+
+        Returns:
+            Run ID
+        """
+        if git_sha is None:
+            revision = git_revision(Path(__file__).parent)
+            git_sha = revision["git_sha"]
+            if git_dirty is None:
+                git_dirty = revision["git_dirty"]
+
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs "
+                "(recorded_at, git_sha, git_dirty, environment, dataset_size, host, metadata) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(),
+                    git_sha,
+                    int(bool(git_dirty)),
+                    environment,
+                    dataset_size,
+                    socket.gethostname(),
+                    json.dumps(metadata or {}),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO operation_stats "
+                "(run_id, operation, count, mean_ms, p50_ms, p95_ms, p99_ms, max_ms, histogram) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        name,
+                        s.count,
+                        s.mean,
+                        s.p50,
+                        s.p95,
+                        s.p99,
+                        s.max,
+                        json.dumps(hist.to_dict(), separators=(",", ":")),
+                    )
+                    for name, hist in sorted(recorder.histograms.items())
+                    for s in [hist.summary()]
+                    if hist.total_count
+                ],
+            )
+        return run_id
+
+    # Queries
+
+    def runs(self, limit: int = 20, environment: Optional[str] = None) -> List[BenchmarkRun]:
+        """Most recent runs first."""
+        sql = "SELECT * FROM runs"
+        params: List[Any] = []
+        if environment is not None:
+            sql += " WHERE environment = ?"
+            params.append(environment)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return [self._run(row) for row in self._conn.execute(sql, params)]
+
+    def get_run(self, run_id: int) -> Optional[BenchmarkRun]:
+        row = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._run(row) if row else None
+
+    def latest_run_id(self) -> Optional[int]:
+        row = self._conn.execute("SELECT MAX(id) FROM runs").fetchone()
+        return row[0]
+
+    def operation_summaries(self, run_id: int) -> Dict[str, LatencySummary]:
+        """Stored percentiles per operation for a run."""
+        rows = self._conn.execute(
+            "SELECT * FROM operation_stats WHERE run_id = ? ORDER BY operation", (run_id,)
+        )
+        return {
+            row["operation"]: LatencySummary(
+                count=row["count"],
+                mean=row["mean_ms"],
+                p50=row["p50_ms"],
+                p95=row["p95_ms"],
+                p99=row["p99_ms"],
+                max=row["max_ms"],
+            )
+            for row in rows
+        }
+
+    def histogram(self, run_id: int, operation: str) -> Optional[LatencyHistogram]:
+        """Full stored distribution of one operation in one run."""
+        row = self._conn.execute(
+            "SELECT histogram FROM operation_stats WHERE run_id = ? AND operation = ?",
+            (run_id, operation),
+        ).fetchone()
+        return LatencyHistogram.from_dict(json.loads(row["histogram"])) if row else None
+
+    def baseline_p95(self, run_id: int, operation: str, window: int = 10) -> List[float]:
+        """p95 of an operation in the `window` comparable runs before run_id (oldest first).
+
+        Comparable runs share the environment and dataset size of run_id.
+        """
+        rows = self._conn.execute(
+            """
+            SELECT s.p95_ms
+            FROM operation_stats s
+            JOIN runs r ON r.id = s.run_id
+            JOIN runs target ON target.id = ?
+            WHERE s.operation = ?
+              AND r.id < target.id
+              AND r.environment = target.environment
+              AND r.dataset_size IS target.dataset_size
+            ORDER BY r.id DESC
+            LIMIT ?
+            """,
+            (run_id, operation, window),
+        ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def trend(self, operation: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Recent p50/p95/p99 of an operation with run details (oldest first)."""
+        rows = self._conn.execute(
+            """
+            SELECT r.id, r.recorded_at, r.git_sha, r.environment, r.dataset_size,
+                   s.count, s.p50_ms, s.p95_ms, s.p99_ms
+            FROM operation_stats s JOIN runs r ON r.id = s.run_id
+            WHERE s.operation = ?
+            ORDER BY r.id DESC
+            LIMIT ?
+            """,
+            (operation, limit),
+        ).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    # Regression detection
+
+    def detect_regressions(
+        self,
+        run_id: int,
+        operations: List[str],
+        window: int = 10,
+        min_runs: int = 5,
+        threshold: float = 0.2,
+        z_threshold: float = 3.0,
+        min_delta_ms: float = 5.0,
+    ) -> List[Regression]:
+        """Operations whose p95 in run_id is significantly worse than the baseline.
+
+        A regression needs a relative increase above `threshold` over the
+        baseline median, a robust z-score above `z_threshold` and an absolute
+        increase of at least `min_delta_ms`, so sub-millisecond jitter on a
+        very stable baseline is not flagged.
+
+        Args:
+            run_id: Run to check
+            operations: Operation names to check (missing ones are skipped)
+            window: Number of preceding comparable runs forming the baseline
+            min_runs: Minimum baseline runs before anything is flagged
+            threshold: Minimum relative p95 increase (0.2 = 20%)
+            z_threshold: Minimum robust z-score
+            min_delta_ms: Minimum absolute p95 increase in milliseconds
+
+        Returns:
+            Detected regressions (empty when none)
+        """
+        current = self.operation_summaries(run_id)
+        regressions = []
+
+        for operation in operations:
+            if operation not in current:
+                continue
+            baseline = self.baseline_p95(run_id, operation, window)
+            if len(baseline) < min_runs:
+                continue
+
+            p95 = current[operation].p95
+            median = statistics.median(baseline)
+            mad = statistics.median(abs(value - median) for value in baseline) * MAD_SCALE
+            if mad > 0:
+                z_score = (p95 - median) / mad
+            else:
+                z_score = float("inf") if p95 > median else 0.0
+
+            if (
+                p95 > median * (1 + threshold)
+                and p95 - median >= min_delta_ms
+                and z_score > z_threshold
+            ):
+                regressions.append(
+                    Regression(
+                        operation=operation,
+                        run_id=run_id,
+                        current_p95=p95,
+                        baseline_p95=median,
+                        baseline_runs=len(baseline),
+                        z_score=z_score,
+                    )
+                )
+
+        return regressions
+
+    @staticmethod
+    def _run(row: sqlite3.Row) -> BenchmarkRun:
+        return BenchmarkRun(
+            id=row["id"],
+            recorded_at=row["recorded_at"],
+            git_sha=row["git_sha"],
+            git_dirty=bool(row["git_dirty"]),
+            environment=row["environment"],
+            dataset_size=row["dataset_size"],
+            host=row["host"],
+            metadata=json.loads(row["metadata"] or "{}"),
+        )
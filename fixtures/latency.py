@@ -0,0 +1,315 @@
+"""Latency recording with HDR histograms and percentile budgets.
+
+LatencyHistogram uses the HdrHistogram bucket layout: values are stored in
+microseconds with a fixed number of significant digits, so every recorded
+value is exact to within 0.1% (3 digits) over the whole range while memory
+stays bounded. Counts are kept sparse, which makes histograms cheap to
+serialize and to merge across pytest-xdist workers or separate runs.
+
+LatencyRecorder collects one histogram per operation. Tests call
+``measure()`` with a warm-up and N samples and check the result against a
+LatencyBudget declared per endpoint in TestConfig.
+"""
+
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from pydantic import BaseModel
+
+
+class LatencySummary(BaseModel):
+    """Latency percentiles in milliseconds."""
+
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def from_samples(cls, samples: List[float]) -> "LatencySummary":
+        """Exact summary of samples given in seconds."""
+        if not samples:
+            return cls()
+        ordered = sorted(samples)
+        return cls(
+            count=len(ordered),
+            mean=sum(ordered) / len(ordered) * 1000,
+            p50=_percentile(ordered, 50) * 1000,
+            p95=_percentile(ordered, 95) * 1000,
+            p99=_percentile(ordered, 99) * 1000,
+            max=ordered[-1] * 1000,
+        )
+
+
+class LatencyBudget(BaseModel):
+    """Percentile limits in milliseconds for one endpoint (None = unchecked)."""
+
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+
+    def violations(self, histogram: "LatencyHistogram") -> List[str]:
+        """Human-readable list of exceeded percentiles (empty when within budget)."""
+        problems = []
+        for name in ("p50", "p95", "p99"):
+            limit = getattr(self, name)
+            if limit is None:
+                continue
+            actual = histogram.percentile(float(name[1:])) / 1000
+            if actual > limit:
+                problems.append(f"{name} {actual:.0f}ms > {limit:.0f}ms")
+        return problems
+
+
+class LatencyHistogram:
+    """HdrHistogram-style latency histogram with microsecond resolution.
+
+    Args:
+        significant_digits: Value precision (1-5); 3 means within 0.1%
+        highest_us: Largest trackable value; larger values are clamped
+
+    Example:
+        >>> hist = LatencyHistogram()
+        >>> hist.record(0.0123)  # seconds
+        >>> hist.percentile(99)  # microseconds
+        12300
+    """
+
+    def __init__(self, significant_digits: int = 3, highest_us: int = 3_600_000_000):
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+
+        self.significant_digits = significant_digits
+        self.highest_us = highest_us
+
+        # Smallest power of two that keeps 2 * 10^digits distinct values per bucket
+        largest_single_unit = 2 * 10**significant_digits
+        self._sub_bucket_half_magnitude = math.ceil(math.log2(largest_single_unit)) - 1
+        self._sub_bucket_half_count = 1 << self._sub_bucket_half_magnitude
+        self._sub_bucket_mask = (self._sub_bucket_half_count << 1) - 1
+
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    # Bucket layout
+
+    def _index(self, value_us: int) -> int:
+        bucket = (value_us | self._sub_bucket_mask).bit_length() - (
+            self._sub_bucket_half_magnitude + 1
+        )
+        sub_bucket = value_us >> bucket
+        return (
+            ((bucket + 1) << self._sub_bucket_half_magnitude)
+            + sub_bucket
+            - self._sub_bucket_half_count
+        )
+
+    def _highest_equivalent(self, index: int) -> int:
+        bucket = (index >> self._sub_bucket_half_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return (sub_bucket << bucket) + (1 << bucket) - 1
+
+    # Recording
+
+    def record(self, seconds: float, count: int = 1):
+        """Record a latency given in seconds."""
+        self.record_us(round(seconds * 1_000_000), count)
+
+    def record_us(self, value_us: int, count: int = 1):
+        """Record a latency given in microseconds."""
+        value_us = min(max(value_us, 0), self.highest_us)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.total_us += value_us * count
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def add(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Merge another histogram's counts into this one."""
+        if other.significant_digits != self.significant_digits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_us += other.total_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    # Queries
+
+    def percentile(self, q: float) -> int:
+        """Value (microseconds) at or below which q percent of samples fall.
+
+        Reported as the highest value equivalent to the bucket, so budgets are
+        checked conservatively.
+        """
+        if not self.total_count:
+            return 0
+        target = max(math.ceil(q / 100 * self.total_count), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us)
+        return self.max_us
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_us / self.total_count if self.total_count else 0.0
+
+    def summary(self) -> LatencySummary:
+        """Percentile summary in milliseconds."""
+        return LatencySummary(
+            count=self.total_count,
+            mean=self.mean_us / 1000,
+            p50=self.percentile(50) / 1000,
+            p95=self.percentile(95) / 1000,
+            p99=self.percentile(99) / 1000,
+            max=self.max_us / 1000,
+        )
+
+    # Serialization
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "significant_digits": self.significant_digits,
+            "highest_us": self.highest_us,
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+            "total_count": self.total_count,
+            "total_us": self.total_us,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        hist = cls(significant_digits=data["significant_digits"], highest_us=data["highest_us"])
+        hist.counts = {int(index): count for index, count in data["counts"].items()}
+        hist.total_count = data["total_count"]
+        hist.total_us = data["total_us"]
+        hist.min_us = data["min_us"]
+        hist.max_us = data["max_us"]
+        return hist
+
+
+class LatencyRecorder:
+    """Per-operation latency histograms for a test session.
+
+    Example:
+        >>> recorder = LatencyRecorder()
+        >>> entities = recorder.measure(
+        ...     "list_entities", lambda: client.list_entities(1), samples=20
+        ... )
+        >>> recorder.summary("list_entities").p95
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        self.significant_digits = significant_digits
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Histogram for an operation (created on first use)."""
+        if name not in self.histograms:
+            self.histograms[name] = LatencyHistogram(self.significant_digits)
+        return self.histograms[name]
+
+    def record(self, name: str, seconds: float):
+        self.histogram(name).record(seconds)
+
+    def measure(
+        self, name: str, func: Callable[[], Any], samples: int = 20, warmup: int = 2
+    ) -> Any:
+        """Call func warmup + samples times, recording only the timed samples.
+
+        Warm-up calls absorb token fetches, connection setup and cold caches.
+
+        Returns:
+            Result of the last call, for response assertions
+        """
+        result = None
+        for _ in range(warmup):
+            result = func()
+
+        histogram = self.histogram(name)
+        for _ in range(samples):
+            start = time.perf_counter()
+            result = func()
+            histogram.record(time.perf_counter() - start)
+        return result
+
+    def summary(self, name: str) -> LatencySummary:
+        return self.histogram(name).summary()
+
+    def violations(self, name: str, budget: Optional[LatencyBudget]) -> List[str]:
+        """Budget violations for an operation (none when no budget is declared)."""
+        if budget is None:
+            return []
+        return budget.violations(self.histogram(name))
+
+    def merge(self, other: "LatencyRecorder") -> "LatencyRecorder":
+        """Add another recorder's histograms (e.g. from another xdist worker)."""
+        for name, histogram in other.histograms.items():
+            self.histogram(name).add(histogram)
+        return self
+
+    def report(self) -> str:
+        """Printable per-operation percentile table."""
+        lines = [
+            f"{'Operation':<28} {'n':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}",
+            "-" * 86,
+        ]
+        for name in sorted(self.histograms):
+            s = self.summary(name)
+            lines.append(
+                f"{name:<28} {s.count:>6} {s.mean:>7.1f}ms {s.p50:>7.1f}ms {s.p95:>7.1f}ms "
+                f"{s.p99:>7.1f}ms {s.max:>7.1f}ms"
+            )
+        return "\n".join(lines)
+
+    # Persistence (one file per worker, merged afterwards)
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {name: hist.to_dict() for name, hist in self.histograms.items()}
+        path.write_text(json.dumps(data, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "LatencyRecorder":
+        data = json.loads(Path(path).read_text())
+        recorder = cls()
+        for name, hist in data.items():
+            recorder.histograms[name] = LatencyHistogram.from_dict(hist)
+        if recorder.histograms:
+            recorder.significant_digits = next(
+                iter(recorder.histograms.values())
+            ).significant_digits
+        return recorder
+
+    @classmethod
+    def load_dir(cls, directory: Union[str, Path]) -> "LatencyRecorder":
+        """Merge every *.json recorder file in a directory."""
+        merged = cls()
+        for path in sorted(Path(directory).glob("*.json")):
+            merged.merge(cls.load(path))
+        return merged
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
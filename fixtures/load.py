@@ -0,0 +1,276 @@
+"""Open-loop load generator for the DataKwip clients.
+
+Requests are sent on a fixed arrival schedule (constant rate, with optional
+linear ramp-up and ramp-down) regardless of how fast earlier requests
+complete. Latency is measured from each request's *scheduled* send time, so
+time spent queueing behind slow requests is counted instead of hidden
+(coordinated omission). Client calls are blocking, so async dispatch hands
+them to a bounded pool of worker threads.
+"""
+
+import asyncio
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from fixtures.latency import LatencySummary
+
+
+class LoadOperation(BaseModel):
+    """A named client call with a relative weight in the request mix."""
+
+    name: str
+    func: Callable[[], Any]
+    weight: int = 1
+
+
+class LoadPhase(BaseModel):
+    """Linear arrival-rate segment of a load profile."""
+
+    name: str
+    duration: float
+    start_rate: float
+    end_rate: float
+
+    def arrivals(self) -> Iterator[float]:
+        """Arrival offsets (seconds from phase start) for this phase.
+
+        The k-th arrival is where the integrated rate reaches k, so ramps are
+        followed exactly rather than stepped.
+        """
+        slope = (self.end_rate - self.start_rate) / self.duration if self.duration else 0.0
+        for k in itertools.count():
+            if slope == 0:
+                if self.start_rate <= 0:
+                    return
+                offset = k / self.start_rate
+            else:
+                # Solve start_rate * t + slope * t^2 / 2 = k
+                a, b = slope / 2, self.start_rate
+                discriminant = b * b + 4 * a * k
+                if discriminant < 0:
+                    return
+                offset = (-b + math.sqrt(discriminant)) / (2 * a)
+            if offset >= self.duration:
+                return
+            yield offset
+
+
+class LoadProfile(BaseModel):
+    """Ramp-up, steady-state and ramp-down at a target request rate."""
+
+    target_rate: float
+    steady: float
+    ramp_up: float = 0.0
+    ramp_down: float = 0.0
+    workers: int = 32
+
+    def phases(self) -> List[LoadPhase]:
+        rate = self.target_rate
+        phases = []
+        if self.ramp_up > 0:
+            phases.append(
+                LoadPhase(name="ramp-up", duration=self.ramp_up, start_rate=0.0, end_rate=rate)
+            )
+        phases.append(
+            LoadPhase(name="steady", duration=self.steady, start_rate=rate, end_rate=rate)
+        )
+        if self.ramp_down > 0:
+            phases.append(
+                LoadPhase(name="ramp-down", duration=self.ramp_down, start_rate=rate, end_rate=0.0)
+            )
+        return phases
+
+    def schedule(self) -> Iterator[Tuple[float, str]]:
+        """(offset from run start, phase name) of every request."""
+        phase_start = 0.0
+        for phase in self.phases():
+            for offset in phase.arrivals():
+                yield phase_start + offset, phase.name
+            phase_start += phase.duration
+
+
+class PhaseResult(BaseModel):
+    """Outcome of one phase (or one operation within a phase)."""
+
+    name: str
+    duration: float
+    target_rate: float
+    sent: int = 0
+    completed: int = 0
+    completed_in_window: int = 0
+    errors: int = 0
+    latency: LatencySummary = LatencySummary()
+    service_time: LatencySummary = LatencySummary()
+
+    @property
+    def achieved_rate(self) -> float:
+        """Successful completions per second within the phase window.
+
+        Requests that complete after the window (queued backlog) do not count,
+        so a saturated system shows achieved < target.
+        """
+        return self.completed_in_window / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.sent if self.sent else 0.0
+
+
+class LoadResult(BaseModel):
+    """Per-phase and per-operation results of a load run."""
+
+    profile: LoadProfile
+    phases: List[PhaseResult]
+    operations: List[PhaseResult]
+    duration: float
+    max_dispatch_lag: float
+    error_samples: List[str] = []
+
+    def phase(self, name: str) -> Optional[PhaseResult]:
+        return next((p for p in self.phases if p.name == name), None)
+
+    def summary(self) -> str:
+        """Printable summary table."""
+        lines = [
+            f"{'Phase/Operation':<28} {'Target':>8} {'Achieved':>9} {'Sent':>6} {'Err':>5} "
+            f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}",
+            "-" * 96,
+        ]
+        for row in self.phases + self.operations:
+            lines.append(
+                f"{row.name:<28} {row.target_rate:>7.1f}/s {row.achieved_rate:>7.1f}/s "
+                f"{row.sent:>6} {row.errors:>5} {row.latency.p50:>6.0f}ms "
+                f"{row.latency.p95:>6.0f}ms {row.latency.p99:>6.0f}ms {row.latency.max:>6.0f}ms"
+            )
+        lines.append("-" * 96)
+        lines.append(
+            f"Total {self.duration:.2f}s, max dispatch lag {self.max_dispatch_lag * 1000:.1f}ms "
+            "(latency measured from scheduled send time)"
+        )
+        return "\n".join(lines)
+
+
+def _weighted_cycle(operations: List[LoadOperation]) -> Iterator[LoadOperation]:
+    """Deterministic interleaving of operations by weight (smooth round-robin)."""
+    total = sum(op.weight for op in operations)
+    current = [0] * len(operations)
+    while True:
+        for i, op in enumerate(operations):
+            current[i] += op.weight
+        best = max(range(len(operations)), key=lambda i: current[i])
+        current[best] -= total
+        yield operations[best]
+
+
+async def run_open_loop(operations: List[LoadOperation], profile: LoadProfile) -> LoadResult:
+    """Drive operations on the profile's arrival schedule.
+
+    Args:
+        operations: Client calls to issue, interleaved by weight
+        profile: Arrival-rate profile and worker count
+
+    Returns:
+        LoadResult with achieved vs target throughput and latency per phase
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=profile.workers, thread_name_prefix="load")
+    # (phase, operation, latency, service time, ok, completion offset)
+    records: List[Tuple[str, str, float, float, bool, float]] = []
+    error_samples: List[str] = []
+    tasks = []
+    max_lag = 0.0
+
+    def call(op: LoadOperation) -> Tuple[float, bool]:
+        started = time.perf_counter()
+        try:
+            op.func()
+            ok = True
+        except Exception as e:
+            ok = False
+            if len(error_samples) < 10:
+                error_samples.append(f"{op.name}: {type(e).__name__}: {e}")
+        return started, ok
+
+    async def fire(op: LoadOperation, phase: str, scheduled: float):
+        started, ok = await loop.run_in_executor(executor, call, op)
+        finished = time.perf_counter()
+        records.append(
+            (phase, op.name, finished - scheduled, finished - started, ok, finished - run_start)
+        )
+
+    mix = _weighted_cycle(operations)
+    run_start = time.perf_counter()
+    try:
+        for offset, phase in profile.schedule():
+            scheduled = run_start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            max_lag = max(max_lag, time.perf_counter() - scheduled)
+            tasks.append(asyncio.ensure_future(fire(next(mix), phase, scheduled)))
+
+        await asyncio.gather(*tasks)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    duration = time.perf_counter() - run_start
+
+    phase_results = []
+    operation_results = []
+    windows = {}
+    phase_start = 0.0
+    for phase in profile.phases():
+        windows[phase.name] = (phase_start, phase_start + phase.duration)
+        phase_start += phase.duration
+        phase_records = [r for r in records if r[0] == phase.name]
+        phase_results.append(_summarize(phase.name, phase, phase_records, windows[phase.name]))
+
+    steady = next(p for p in profile.phases() if p.name == "steady")
+    total_weight = sum(op.weight for op in operations)
+    for op in operations:
+        op_records = [r for r in records if r[0] == "steady" and r[1] == op.name]
+        share = LoadPhase(
+            name=op.name,
+            duration=steady.duration,
+            start_rate=steady.start_rate * op.weight / total_weight,
+            end_rate=steady.end_rate * op.weight / total_weight,
+        )
+        operation_results.append(
+            _summarize(f"  steady: {op.name}", share, op_records, windows["steady"])
+        )
+
+    return LoadResult(
+        profile=profile,
+        phases=phase_results,
+        operations=operation_results,
+        duration=duration,
+        max_dispatch_lag=max_lag,
+        error_samples=error_samples,
+    )
+
+
+def _summarize(
+    name: str, phase: LoadPhase, records: List[Tuple], window: Tuple[float, float]
+) -> PhaseResult:
+    ok = [r for r in records if r[4]]
+    return PhaseResult(
+        name=name,
+        duration=phase.duration,
+        target_rate=(phase.start_rate + phase.end_rate) / 2,
+        sent=len(records),
+        completed=len(ok),
+        completed_in_window=sum(1 for r in ok if window[0] <= r[5] < window[1]),
+        errors=len(records) - len(ok),
+        latency=LatencySummary.from_samples([r[2] for r in ok]),
+        service_time=LatencySummary.from_samples([r[3] for r in ok]),
+    )
+
+
+def run_load(operations: List[LoadOperation], profile: LoadProfile) -> LoadResult:
+    """Blocking wrapper around run_open_loop for sync tests and scripts."""
+    return asyncio.run(run_open_loop(operations, profile))
@@ -0,0 +1,240 @@
+"""Check scheduler and rolling statistics for the synthetic monitor.
+
+Each Check runs on its own interval, with random jitter so checks sharing
+an interval do not hit the services in lockstep. Runs are scheduled at a
+fixed rate (the next run is planned from the previous schedule, not from
+when the previous run finished); a run that is still going when the next
+one is due is skipped rather than stacked up.
+
+Results are kept per check in a time window (RollingStats), from which
+availability and latency percentiles are computed on demand.
+
+Checks marked ``inline`` run on the scheduler thread (Playwright's sync API
+is bound to the thread that started the browser); others run on a small
+thread pool.
+"""
+
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .latency import LatencySummary
+
+
+class Check(BaseModel):
+    """A probe run every `interval` seconds (± jitter as a fraction of the interval)."""
+
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    jitter: float = 0.1
+    inline: bool = False
+
+
+class CheckResult(BaseModel):
+    """Outcome of one check run."""
+
+    check: str
+    started: float  # Unix time
+    duration: float  # Seconds
+    ok: bool
+    error: Optional[str] = None
+
+
+class CheckSummary(BaseModel):
+    """Rolling-window statistics of one check."""
+
+    check: str
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    consecutive_failures: int = 0
+    latency: LatencySummary = LatencySummary()
+    last_run: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def availability(self) -> float:
+        """Fraction of successful runs in the window (1.0 before the first run)."""
+        return (self.runs - self.failures) / self.runs if self.runs else 1.0
+
+
+class RollingStats:
+    """Results of one check within the last `window` seconds.
+
+    Args:
+        window: Seconds of history kept
+        max_samples: Upper bound on kept results (oldest dropped first)
+    """
+
+    def __init__(self, window: float = 3600.0, max_samples: int = 10_000):
+        self.window = window
+        self._results: Deque[CheckResult] = deque(maxlen=max_samples)
+        self.consecutive_failures = 0
+        self.skipped = 0
+        self.last_error: Optional[str] = None
+
+    def add(self, result: CheckResult):
+        self._results.append(result)
+        if result.ok:
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            self.last_error = result.error
+
+    def _prune(self, now: float):
+        while self._results and self._results[0].started < now - self.window:
+            self._results.popleft()
+
+    def summary(self, check: str, now: Optional[float] = None) -> CheckSummary:
+        self._prune(now or time.time())
+        results = list(self._results)
+        return CheckSummary(
+            check=check,
+            runs=len(results),
+            failures=sum(1 for r in results if not r.ok),
+            skipped=self.skipped,
+            consecutive_failures=self.consecutive_failures,
+            latency=LatencySummary.from_samples([r.duration for r in results if r.ok]),
+            last_run=results[-1].started if results else None,
+            last_error=self.last_error,
+        )
+
+
+class Monitor:
+    """Runs checks on their intervals until stopped.
+
+    Args:
+        checks: Checks to schedule
+        window: Seconds of results kept for the rolling statistics
+        max_workers: Threads for non-inline checks
+        on_result: Called with every CheckResult (e.g. to export metrics)
+
+    Example:
+        >>> monitor = Monitor([Check(name="api_health", func=api.get_database_health, interval=30)])
+        >>> threading.Thread(target=monitor.run, daemon=True).start()
+        >>> print(monitor.report())
+        >>> monitor.stop()
+    """
+
+    def __init__(
+        self,
+        checks: List[Check],
+        window: float = 3600.0,
+        max_workers: int = 4,
+        on_result: Optional[Callable[[CheckResult], None]] = None,
+    ):
+        names = [check.name for check in checks]
+        if len(set(names)) != len(names):
+            raise ValueError("Check names must be unique")
+
+        self.checks = {check.name: check for check in checks}
+        self.max_workers = max_workers
+        self.on_result = on_result
+        self.started_at: Optional[float] = None
+        self._stats = {name: RollingStats(window) for name in names}
+        self._running: Dict[str, Future] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self):
+        """Ask run() to return after the current check."""
+        self._stop.set()
+
+    def _execute(self, check: Check) -> CheckResult:
+        started = time.time()
+        start = time.perf_counter()
+        try:
+            check.func()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        result = CheckResult(
+            check=check.name,
+            started=started,
+            duration=time.perf_counter() - start,
+            ok=ok,
+            error=error,
+        )
+
+        with self._lock:
+            self._stats[check.name].add(result)
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+    def _next_run(self, check: Check, scheduled: float, now: float) -> float:
+        """Fixed-rate schedule with jitter; never in the past."""
+        interval = check.interval * (1 + random.uniform(-check.jitter, check.jitter))
+        return max(scheduled + interval, now)
+
+    def run(self, duration: Optional[float] = None):
+        """Schedule checks until stop() is called or `duration` seconds have passed."""
+        self.started_at = time.time()
+        deadline = time.monotonic() + duration if duration is not None else None
+
+        # First runs are spread over the first jitter window of each check
+        now = time.monotonic()
+        queue: List[Tuple[float, str]] = [
+            (now + random.uniform(0, check.interval * check.jitter), name)
+            for name, check in self.checks.items()
+        ]
+        heapq.heapify(queue)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="check"
+        ) as executor:
+            while not self._stop.is_set():
+                scheduled, name = queue[0]
+                wait = scheduled - time.monotonic()
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                if wait > 0 and self._stop.wait(wait):
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if scheduled > time.monotonic():
+                    continue
+
+                heapq.heappop(queue)
+                check = self.checks[name]
+                previous = self._running.get(name)
+                if previous is not None and not previous.done():
+                    with self._lock:
+                        self._stats[name].skipped += 1
+                elif check.inline:
+                    self._execute(check)
+                else:
+                    self._running[name] = executor.submit(self._execute, check)
+
+                heapq.heappush(queue, (self._next_run(check, scheduled, time.monotonic()), name))
+
+            self._stop.set()
+
+    def summaries(self) -> Dict[str, CheckSummary]:
+        """Rolling statistics of every check."""
+        now = time.time()
+        with self._lock:
+            return {name: stats.summary(name, now) for name, stats in self._stats.items()}
+
+    def report(self) -> str:
+        """Printable status table of all checks."""
+        lines = [f"{'Check':<22} {'runs':>5} {'avail':>7} {'p50':>8} {'p95':>8} {'max':>8}  status"]
+        for name, s in self.summaries().items():
+            if s.runs == 0:
+                status = "pending"
+            elif s.consecutive_failures:
+                status = f"✗ failing x{s.consecutive_failures}: {s.last_error}"
+            else:
+                status = "✓ ok"
+            lines.append(
+                f"{name:<22} {s.runs:>5} {s.availability:>7.1%} {s.latency.p50:>6.0f}ms "
+                f"{s.latency.p95:>6.0f}ms {s.latency.max:>6.0f}ms  {status}"
+            )
+        return "\n".join(lines)
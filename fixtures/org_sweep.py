@@ -0,0 +1,267 @@
+"""Concurrent sweep of the API and MCP checks across every organization.
+
+The suite pins its tests to TEST_ORG_ID, but tenants differ in size by
+orders of magnitude. OrgSweep runs the same read checks against each org
+(from ``core.org``): entity and tag listing through the API, entity queries
+and current values through MCP. At most ``workers`` orgs are in flight at a
+time, and each org runs its checks one after another, so the load on the
+deployment stays bounded however many tenants there are.
+
+Each (org, check) gets its own latency histogram. The report lists orgs
+slowest first and checks every org against the per-endpoint latency budgets,
+so large tenants that miss them show up.
+
+The sweeping user may not be a member of every org. An org that answers
+401/403 is reported as skipped (OrgResult.unauthorized) rather than failed,
+and none of its latencies are kept, so authorization errors never mix into
+the tenant percentiles.
+"""
+
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from .latency import LatencyBudget, LatencyRecorder, LatencySummary
+
+# One check: org_id -> response (rows)
+Check = Callable[[int], Any]
+
+# Statuses meaning the sweeping user may not read the org
+UNAUTHORIZED_STATUSES = {401, 403}
+
+
+class OrgCheckResult(BaseModel):
+    """Latency of one check against one org."""
+
+    check: str
+    latency: LatencySummary = LatencySummary()
+    errors: int = 0
+    rows: int = 0  # Rows in the last response
+    violations: List[str] = []
+
+
+class OrgResult(BaseModel):
+    """All checks of one org."""
+
+    org_id: int
+    org_key: Optional[str] = None
+    checks: List[OrgCheckResult] = []
+    duration: float = 0.0
+    error_samples: List[str] = []
+    unauthorized: Optional[str] = None  # Denial that skipped the org (e.g. "list_entities: 403")
+
+    @property
+    def skipped(self) -> bool:
+        return self.unauthorized is not None
+
+    @property
+    def p95(self) -> float:
+        """Worst p95 of the org's checks (milliseconds)."""
+        return max((c.latency.p95 for c in self.checks), default=0.0)
+
+    @property
+    def errors(self) -> int:
+        return sum(c.errors for c in self.checks)
+
+    @property
+    def violations(self) -> List[str]:
+        return [f"{c.check} {v}" for c in self.checks for v in c.violations]
+
+    @property
+    def ok(self) -> bool:
+        """No errors or budget violations (skipped orgs have no checks, so they pass)."""
+        return not self.errors and not self.violations
+
+    def check(self, name: str) -> Optional[OrgCheckResult]:
+        return next((c for c in self.checks if c.check == name), None)
+
+
+def api_checks(api_client, limit: int = 10) -> Dict[str, Check]:
+    """Entity and tag listing through the API (named like their latency budgets)."""
+    return {
+        "list_entities": lambda org_id: api_client.list_entities(org_id=org_id, limit=limit),
+        "list_entity_tags": lambda org_id: api_client.list_entity_tags(org_id=org_id, limit=limit),
+    }
+
+
+def mcp_checks(mcp_client, limit: int = 10, entities: int = 3) -> Dict[str, Check]:
+    """Entity queries and current values through MCP (named like their latency budgets).
+
+    get_current_values asks for the org's first `entities` entities; they are
+    looked up on the first (warm-up) call. Orgs without entities skip the call.
+    """
+    entity_ids: Dict[int, List[int]] = {}
+
+    def current_values(org_id: int) -> List[Dict[str, Any]]:
+        if org_id not in entity_ids:
+            rows = mcp_client.query_entities(org_id=org_id, limit=entities)
+            entity_ids[org_id] = [row["id"] for row in rows]
+        if not entity_ids[org_id]:
+            return []
+        return mcp_client.get_current_values(entity_ids=entity_ids[org_id], org_id=org_id)
+
+    return {
+        "query_entities": lambda org_id: mcp_client.query_entities(org_id=org_id, limit=limit),
+        "get_current_values": current_values,
+    }
+
+
+class OrgSweep:
+    """Run checks against many orgs concurrently, with bounded parallelism.
+
+    Args:
+        checks: Check name -> function of org_id (api_checks, mcp_checks)
+        samples: Timed calls per (org, check)
+        warmup: Unrecorded calls per (org, check) before the timed ones
+        workers: Orgs checked at the same time
+        budgets: Check name -> latency budget, applied to every org
+        recorder: Also receives all orgs' latencies as ``sweep_<check>``
+
+    Example:
+        >>> sweep = OrgSweep({**api_checks(api), **mcp_checks(mcp)}, samples=5, workers=4)
+        >>> results = sweep.run(database.list_orgs(conn))
+        >>> print(format_report(results))
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Check],
+        samples: int = 5,
+        warmup: int = 1,
+        workers: int = 4,
+        budgets: Optional[Dict[str, LatencyBudget]] = None,
+        recorder: Optional[LatencyRecorder] = None,
+    ):
+        self.checks = dict(checks)
+        self.samples = samples
+        self.warmup = warmup
+        self.workers = workers
+        self.budgets = budgets or {}
+        self.recorder = recorder
+        # org_id -> histograms of its checks
+        self.recorders: Dict[int, LatencyRecorder] = {}
+
+    def sweep_org(self, org_id: int, org_key: Optional[str] = None) -> OrgResult:
+        """Run every check against one org (sequentially).
+
+        The first 401/403 stops the org: its result keeps only the denial
+        (``unauthorized``), no checks and no latencies.
+        """
+        recorder = LatencyRecorder()
+        result = OrgResult(org_id=org_id, org_key=org_key)
+        started = time.perf_counter()
+
+        for name, check in self.checks.items():
+            check_result = OrgCheckResult(check=name)
+            for n in range(self.warmup + self.samples):
+                start = time.perf_counter()
+                try:
+                    rows = check(org_id)
+                except httpx.HTTPStatusError as e:
+                    if e.response.status_code in UNAUTHORIZED_STATUSES:
+                        result.unauthorized = f"{name}: {e.response.status_code}"
+                        result.checks, result.error_samples = [], []
+                        result.duration = time.perf_counter() - started
+                        return result
+                    check_result.errors += 1
+                    if len(result.error_samples) < 3:
+                        result.error_samples.append(f"{name}: {type(e).__name__}: {e}")
+                    continue
+                except Exception as e:
+                    check_result.errors += 1
+                    if len(result.error_samples) < 3:
+                        result.error_samples.append(f"{name}: {type(e).__name__}: {e}")
+                    continue
+                if n >= self.warmup:
+                    recorder.record(name, time.perf_counter() - start)
+                check_result.rows = len(rows) if isinstance(rows, list) else 0
+
+            check_result.latency = recorder.summary(name)
+            check_result.violations = recorder.violations(name, self.budgets.get(name))
+            result.checks.append(check_result)
+
+        result.duration = time.perf_counter() - started
+        self.recorders[org_id] = recorder
+        return result
+
+    def run(
+        self,
+        orgs: Iterable[Dict[str, Any]],
+        on_result: Optional[Callable[[OrgResult], None]] = None,
+    ) -> List[OrgResult]:
+        """Sweep orgs, at most `workers` at a time.
+
+        Args:
+            orgs: Rows with "id" (and optionally "org_key"), e.g. database.list_orgs()
+            on_result: Called with each org's result as it completes
+
+        Returns:
+            One OrgResult per org, in the order given
+        """
+        orgs = list(orgs)
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="org-sweep"
+        ) as executor:
+            futures = {
+                executor.submit(self.sweep_org, org["id"], org.get("org_key")): index
+                for index, org in enumerate(orgs)
+            }
+            results: List[Optional[OrgResult]] = [None] * len(orgs)
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result is not None:
+                    on_result(results[futures[future]])
+
+        if self.recorder is not None:
+            for org_recorder in self.recorders.values():
+                for name, histogram in org_recorder.histograms.items():
+                    self.recorder.histogram(f"sweep_{name}").add(histogram)
+        return results
+
+
+def format_report(results: List[OrgResult]) -> str:
+    """Printable per-org, per-check latency table, slowest org (worst p95) first."""
+    lines = [
+        f"{'Org':>5} {'Key':<16} {'Check':<20} {'n':>4} {'err':>4} {'rows':>5} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  status",
+        "-" * 100,
+    ]
+    for r in sorted(results, key=lambda r: r.p95, reverse=True):
+        if r.skipped:
+            lines.append(
+                f"{r.org_id:>5} {(r.org_key or '-')[:16]:<16} "
+                f"- skipped, unauthorized ({r.unauthorized})"
+            )
+            continue
+        for c in r.checks:
+            if c.errors:
+                status = f"✗ {c.errors} errors"
+            elif c.violations:
+                status = f"✗ {', '.join(c.violations)}"
+            else:
+                status = "✓ ok"
+            lines.append(
+                f"{r.org_id:>5} {(r.org_key or '-')[:16]:<16} {c.check:<20} {c.latency.count:>4} "
+                f"{c.errors:>4} {c.rows:>5} {c.latency.p50:>6.0f}ms {c.latency.p95:>6.0f}ms "
+                f"{c.latency.p99:>6.0f}ms {c.latency.max:>6.0f}ms  {status}"
+            )
+
+    p95s = [r.p95 for r in results if any(c.latency.count for c in r.checks)]
+    if len(p95s) > 1:
+        slowest = max(results, key=lambda r: r.p95)
+        lines.append("-" * 100)
+        lines.append(
+            f"Worst p95 {slowest.p95:.0f}ms (org {slowest.org_id}) vs median org "
+            f"{statistics.median(p95s):.0f}ms across {len(p95s)} orgs"
+        )
+    skipped = [r for r in results if r.skipped]
+    if skipped:
+        lines.append(
+            f"Skipped {len(skipped)} org(s) the user is not authorized for: "
+            f"{', '.join(str(r.org_id) for r in skipped)}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,202 @@
+"""Helpers for running the suite in parallel with pytest-xdist.
+
+- Tests are grouped by their primary marker (ui, auth, api, mcp, ...), so a
+  worker that runs a group builds that group's session fixtures once.
+- Groups are split into shards when they would take longer than an even
+  share of the run, using per-test durations recorded in the pytest cache
+  by earlier runs (plan_shards).
+- SharedSessionCache lets workers share expensive session setup (OAuth2
+  tokens, the Keycloak admin token, browser storage state) through a JSON
+  file guarded by a file lock, so it is created once per run instead of
+  once per worker.
+
+The scheduler itself lives in fixtures/sharding.py (imports pytest-xdist).
+"""
+
+import json
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pytest
+
+# Marker -> xdist group, in priority order for tests with several markers
+MARKER_GROUPS = ["ui", "auth", "integration", "api", "mcp"]
+DEFAULT_GROUP = "other"
+
+# pytest cache key for per-test durations (seconds, smoothed across runs)
+DURATIONS_CACHE_KEY = "datakwip/durations"
+
+# Weight of the newest run when smoothing recorded durations
+DURATION_SMOOTHING = 0.5
+
+
+def marker_group(keywords) -> str:
+    """xdist group for a test from its markers."""
+    for marker in MARKER_GROUPS:
+        if marker in keywords:
+            return marker
+    return DEFAULT_GROUP
+
+
+def base_nodeid(nodeid: str) -> str:
+    """Node ID without the '@group' suffix xdist adds in loadgroup mode."""
+    if nodeid.rfind("@") > nodeid.rfind("]"):
+        return nodeid.rsplit("@", 1)[0]
+    return nodeid
+
+
+def merge_durations(
+    previous: Dict[str, float], current: Dict[str, float], smoothing: float = DURATION_SMOOTHING
+) -> Dict[str, float]:
+    """Exponentially smoothed per-test durations (new tests are taken as measured)."""
+    merged = dict(previous)
+    for nodeid, duration in current.items():
+        if nodeid in merged:
+            merged[nodeid] = smoothing * duration + (1 - smoothing) * merged[nodeid]
+        else:
+            merged[nodeid] = duration
+    return merged
+
+
+def plan_shards(
+    nodeids: List[str], workers: int, durations: Dict[str, float]
+) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """Assign tests to shards, keeping marker groups together where possible.
+
+    A group stays whole unless its estimated duration exceeds an even share
+    of the total (total / workers); then it is split into the fewest shards
+    that fit, filled longest-test-first. Tests without history are estimated
+    at the median known duration.
+
+    Args:
+        nodeids: Collected node IDs (with '@group' suffixes in loadgroup mode)
+        workers: Number of xdist workers
+        durations: Historical seconds per base node ID
+
+    Returns:
+        (node ID -> shard name, shard name -> estimated seconds)
+    """
+    default = statistics.median(durations.values()) if durations else 1.0
+    estimate = {nodeid: durations.get(base_nodeid(nodeid), default) for nodeid in nodeids}
+
+    groups: Dict[str, List[str]] = {}
+    for nodeid in nodeids:
+        suffix = nodeid[len(base_nodeid(nodeid)) + 1 :]
+        groups.setdefault(suffix or DEFAULT_GROUP, []).append(nodeid)
+
+    target = sum(estimate.values()) / max(workers, 1)
+    assignment: Dict[str, str] = {}
+    shard_durations: Dict[str, float] = {}
+
+    for group, members in groups.items():
+        group_total = sum(estimate[n] for n in members)
+        count = min(max(math.ceil(group_total / target), 1) if target > 0 else 1, len(members))
+        names = [group] if count == 1 else [f"{group}#{i}" for i in range(count)]
+        loads = dict.fromkeys(names, 0.0)
+
+        for nodeid in sorted(members, key=lambda n: -estimate[n]):
+            shard = min(loads, key=loads.get)
+            assignment[nodeid] = shard
+            loads[shard] += estimate[nodeid]
+        shard_durations.update(loads)
+
+    return assignment, shard_durations
+
+
+class DurationRecorder:
+    """pytest plugin: store smoothed per-test durations in the pytest cache.
+
+    Registered on the controller (or in a serial run), where every test
+    report arrives; MarkerShardScheduling reads the stored durations.
+    """
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.durations: Dict[str, float] = {}
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        # Setup + call + teardown, so expensive fixtures count towards their tests
+        nodeid = base_nodeid(report.nodeid)
+        if report.when == "setup":
+            self.durations[nodeid] = report.duration
+        else:
+            self.durations[nodeid] = self.durations.get(nodeid, 0.0) + report.duration
+
+    def pytest_sessionfinish(self):
+        # config.cache only exists with the cacheprovider plugin (not with -p no:cacheprovider)
+        cache = getattr(self.config, "cache", None)
+        if not self.durations or cache is None:
+            return
+        previous = cache.get(DURATIONS_CACHE_KEY, {})
+        cache.set(DURATIONS_CACHE_KEY, merge_durations(previous, self.durations))
+
+
+class SharedSessionCache:
+    """JSON key/value store shared by all workers of one test run.
+
+    Entries are created by whichever worker asks first, while holding a file
+    lock, so other workers wait and then reuse the value.
+
+    Args:
+        directory: Directory shared by the workers (e.g. the run's basetemp root)
+        metrics: Optional ClientMetrics counting hits and misses per key kind
+            (the key up to the first ":")
+
+    Example:
+        >>> cache = SharedSessionCache(tmp_root)
+        >>> token = cache.get_or_create("api_token", lambda: (fetch_token(), 270))
+    """
+
+    def __init__(self, directory: Union[str, Path], metrics=None):
+        from filelock import FileLock
+
+        self.metrics = metrics
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "datakwip-session-cache.json"
+        self._lock = FileLock(str(self.path) + ".lock")
+
+    def _read(self) -> Dict[str, Any]:
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text() or "{}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Unexpired value for key (None if missing or expired)."""
+        with self._lock:
+            entry = self._read().get(key)
+        if entry and (entry["expires_at"] is None or entry["expires_at"] > time.time()):
+            return entry["value"]
+        return None
+
+    def get_or_create(self, key: str, factory: Callable[[], Tuple[Any, Optional[float]]]) -> Any:
+        """Return the cached value, or create it once for all workers.
+
+        Args:
+            key: Entry name
+            factory: Returns (JSON-serializable value, time-to-live in seconds or None)
+
+        Returns:
+            Cached or newly created value
+        """
+        with self._lock:
+            data = self._read()
+            entry = data.get(key)
+            hit = bool(entry) and (entry["expires_at"] is None or entry["expires_at"] > time.time())
+            if self.metrics is not None:
+                self.metrics.observe_cache(f"shared_{key.split(':')[0]}", hit)
+            if hit:
+                return entry["value"]
+
+            value, ttl = factory()
+            data[key] = {
+                "value": value,
+                "expires_at": time.time() + ttl if ttl is not None else None,
+            }
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(data))
+            tmp_path.replace(self.path)
+            return value
@@ -0,0 +1,51 @@
+"""pytest-xdist scheduler that shards by marker group and historical duration.
+
+Enabled with ``--shard-by-marker`` together with ``-n``. Tests carry an
+xdist_group per primary marker (added in conftest.py), which xdist's
+loadgroup mode appends to node IDs; this scheduler turns those groups into
+duration-balanced shards (fixtures.parallel.plan_shards) and always hands the
+longest remaining shard to the next free worker.
+"""
+
+from typing import Dict, Optional
+
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadGroupScheduling
+from xdist.workermanage import WorkerController
+
+from fixtures.parallel import plan_shards
+
+
+class MarkerShardScheduling(LoadGroupScheduling):
+    """LoadGroupScheduling with duration-balanced shards, longest first."""
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        log: Optional[Producer] = None,
+        durations: Optional[Dict[str, float]] = None,
+    ):
+        super().__init__(config, log)
+        self.durations = durations or {}
+        self.shard_of: Optional[Dict[str, str]] = None
+        self.shard_durations: Dict[str, float] = {}
+
+    def _split_scope(self, nodeid: str) -> str:
+        if self.shard_of is None:
+            self.shard_of, self.shard_durations = plan_shards(
+                self.collection, len(self.nodes), self.durations
+            )
+            for shard, seconds in sorted(self.shard_durations.items(), key=lambda item: -item[1]):
+                self.log(f"shard {shard}: ~{seconds:.1f}s")
+        return self.shard_of[nodeid]
+
+    def _assign_work_unit(self, node: WorkerController):
+        # Longest-processing-time first: the free worker takes the biggest shard left
+        if len(self.workqueue) > 1:
+            ordered = sorted(
+                self.workqueue.items(), key=lambda item: -self.shard_durations.get(item[0], 0.0)
+            )
+            self.workqueue.clear()
+            self.workqueue.update(ordered)
+        super()._assign_work_unit(node)
@@ -0,0 +1,165 @@
+"""Dependency-aware stage scheduler for the integration suite.
+
+Stages declare which other stages they depend on. Independent stages run
+concurrently on a thread pool, so a suite takes roughly as long as its
+longest dependency chain rather than the sum of all stages. When a stage
+fails, every stage downstream of it is cancelled instead of run.
+
+Stages marked ``inline`` run on the calling thread (Playwright's sync API is
+bound to the thread that started it, and the ui_client fixture closes the
+browser on the main thread); other stages keep running in the background
+meanwhile.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+PASSED = "passed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class Stage(BaseModel):
+    """A named unit of work with its upstream dependencies."""
+
+    name: str
+    func: Callable[[], Any]
+    depends_on: List[str] = []
+    inline: bool = False
+
+
+class StageResult(BaseModel):
+    """Outcome of one stage; started/duration are seconds from the run start."""
+
+    name: str
+    status: str
+    started: float = 0.0
+    duration: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return self.status == PASSED
+
+
+def run_stages(stages: List[Stage], max_workers: Optional[int] = None) -> List[StageResult]:
+    """Run stages as soon as their dependencies have passed.
+
+    Args:
+        stages: Stages in summary order; dependencies must name earlier or later stages
+        max_workers: Thread pool size (default: one thread per non-inline stage)
+
+    Returns:
+        One StageResult per stage, in the order given
+
+    Raises:
+        ValueError: On unknown dependencies or dependency cycles
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = set(stage.depends_on) - set(by_name)
+        if unknown:
+            raise ValueError(
+                f"Stage {stage.name} depends on unknown stages: {', '.join(sorted(unknown))}"
+            )
+    _check_acyclic(by_name)
+
+    results: Dict[str, StageResult] = {}
+    running: Dict[Future, Stage] = {}
+    run_start = time.perf_counter()
+
+    def execute(stage: Stage) -> StageResult:
+        started = time.perf_counter()
+        try:
+            value = stage.func()
+            status, error = PASSED, None
+        except Exception as e:
+            value, status, error = None, FAILED, f"{type(e).__name__}: {e}"
+        return StageResult(
+            name=stage.name,
+            status=status,
+            started=started - run_start,
+            duration=time.perf_counter() - started,
+            result=value,
+            error=error,
+        )
+
+    def pending() -> List[Stage]:
+        scheduled = {stage.name for stage in running.values()}
+        return [s for s in stages if s.name not in results and s.name not in scheduled]
+
+    workers = max_workers or max(sum(1 for s in stages if not s.inline), 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage") as executor:
+        while len(results) < len(stages):
+            inline_ready = []
+            for stage in pending():
+                upstream = [results.get(dep) for dep in stage.depends_on]
+                if any(r is not None and not r.passed for r in upstream):
+                    failed = [r.name for r in upstream if r is not None and not r.passed]
+                    results[stage.name] = StageResult(
+                        name=stage.name,
+                        status=CANCELLED,
+                        started=time.perf_counter() - run_start,
+                        error=f"Cancelled: upstream stage {', '.join(failed)} did not pass",
+                    )
+                elif all(r is not None for r in upstream):
+                    if stage.inline:
+                        inline_ready.append(stage)
+                    else:
+                        running[executor.submit(execute, stage)] = stage
+
+            if inline_ready:
+                # Run one inline stage now, then re-check (it may unblock others)
+                stage = inline_ready[0]
+                results[stage.name] = execute(stage)
+            elif running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    results[stage.name] = future.result()
+
+            # Collect anything that finished while an inline stage ran
+            for future in [f for f in running if f.done()]:
+                stage = running.pop(future)
+                results[stage.name] = future.result()
+
+    return [results[stage.name] for stage in stages]
+
+
+def format_summary(results: List[StageResult], total: float) -> str:
+    """Ordered summary table with the start offset and duration of each stage."""
+    labels = {PASSED: "✓ PASS", FAILED: "✗ FAIL", CANCELLED: "- SKIP"}
+    lines = []
+    for result in results:
+        lines.append(
+            f"{labels[result.status]:<8} {result.name:<20} {result.duration:>6.2f}s"
+            f"   (started +{result.started:.2f}s)"
+        )
+        if result.error:
+            lines.append(f"         {result.error}")
+    lines.append("-" * 80)
+    serial = sum(result.duration for result in results)
+    lines.append(f"Total execution time: {total:.2f}s (stages sum to {serial:.2f}s)")
+    return "\n".join(lines)
+
+
+def _check_acyclic(by_name: Dict[str, Stage]):
+    """Raise ValueError if the dependency graph has a cycle."""
+    state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(name: str, path: List[str]):
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Stage dependency cycle: {' -> '.join(path + [name])}")
+        state[name] = 1
+        for dep in by_name[name].depends_on:
+            visit(dep, path + [name])
+        state[name] = 2
+
+    for name in by_name:
+        visit(name, [])
@@ -0,0 +1,306 @@
+"""Throughput benchmark of the Keycloak token endpoint, per grant type.
+
+Every client login goes through the realm's token endpoint. The grants cost
+Keycloak different amounts of work: ``password`` checks the user's password
+hash and starts a user session, ``client_credentials`` checks only the client
+secret, and ``refresh_token`` validates a token of an existing session.
+
+TokenEndpointBenchmark drives one grant at a time in a closed loop: N worker
+threads each send their next token request as soon as the previous one
+returns, for a fixed duration, at increasing N. Each (grant, concurrency)
+level reports successful tokens per second, latency percentiles and the
+error rate by kind (HTTP status and OAuth2 error, timeout, connection error),
+so the concurrency where throughput stops growing and errors start shows
+where the realm saturates.
+
+Refresh workers each hold their own refresh token, obtained with an untimed
+password grant before the level starts, and replace it with the one every
+response returns, so rotating refresh tokens keep working. Password and
+client_credentials requests create Keycloak sessions that stay until they
+idle out, so run large benchmarks against a non-production realm.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+import httpx
+from pydantic import BaseModel
+
+from clients import PoolConfig, TransportFactory
+
+from .latency import LatencyHistogram, LatencySummary
+
+PASSWORD = "password"
+CLIENT_CREDENTIALS = "client_credentials"
+REFRESH_TOKEN = "refresh_token"
+GRANTS = [PASSWORD, CLIENT_CREDENTIALS, REFRESH_TOKEN]
+
+
+class LevelResult(BaseModel):
+    """One grant at one concurrency level."""
+
+    grant: str
+    concurrency: int
+    requests: int = 0
+    errors: int = 0
+    duration: float = 0.0
+    latency: LatencySummary = LatencySummary()  # Successful requests only
+    error_kinds: Dict[str, int] = {}
+    error_samples: List[str] = []
+
+    @property
+    def throughput(self) -> float:
+        """Tokens issued per second."""
+        return (self.requests - self.errors) / self.duration if self.duration else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.requests if self.requests else 0.0
+
+
+def error_kind(error: Exception) -> str:
+    """Short classification of a failed token request (e.g. '401 invalid_grant', 'timeout')."""
+    if isinstance(error, httpx.HTTPStatusError):
+        try:
+            oauth_error = error.response.json().get("error", "")
+        except ValueError:
+            oauth_error = ""
+        return f"{error.response.status_code} {oauth_error}".rstrip()
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    return type(error).__name__
+
+
+class TokenEndpointBenchmark:
+    """Closed-loop load on a token endpoint, one grant type at a time.
+
+    Args:
+        token_url: Realm token endpoint
+        client_id: OAuth2 client ID
+        client_secret: OAuth2 client secret
+        username: User for the password grant (and for seeding refresh tokens)
+        password: Password of that user
+        scope: Requested scope
+        timeout: Request timeout in seconds
+        transport_factory: Connection pool (default: keep-alive pool of 256 connections,
+            so connection setup stays out of the measurement up to that concurrency)
+
+    Example:
+        >>> with TokenEndpointBenchmark(token_url, "functional-tests", secret, user, pw) as bench:
+        ...     results = bench.run(GRANTS, levels=[1, 4, 16], duration=10)
+        >>> print(format_report(results))
+    """
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: str,
+        client_secret: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        scope: str = "openid",
+        timeout: float = 30.0,
+        transport_factory: Optional[TransportFactory] = None,
+    ):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.username = username
+        self.password = password
+        self.scope = scope
+        self.transport_factory = transport_factory or TransportFactory(
+            PoolConfig(max_connections=256, max_keepalive_connections=256)
+        )
+        self._client = httpx.Client(timeout=timeout, transport=self.transport_factory.transport())
+
+    def form(self, grant: str, refresh_token: Optional[str] = None) -> Dict[str, str]:
+        """Token request body for a grant."""
+        data = {
+            "grant_type": grant,
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+        }
+        if grant == PASSWORD:
+            data.update(username=self.username, password=self.password, scope=self.scope)
+        elif grant == CLIENT_CREDENTIALS:
+            data["scope"] = self.scope
+        elif grant == REFRESH_TOKEN:
+            data["refresh_token"] = refresh_token
+        else:
+            raise ValueError(f"Unknown grant type: {grant}")
+        return data
+
+    def request(self, grant: str, refresh_token: Optional[str] = None) -> Dict[str, str]:
+        """Send one token request.
+
+        Returns:
+            Token response (access_token, refresh_token, expires_in, ...)
+
+        Raises:
+            httpx.HTTPStatusError: On an error status (e.g. 401 invalid_grant)
+        """
+        response = self._client.post(self.token_url, data=self.form(grant, refresh_token))
+        response.raise_for_status()
+        return response.json()
+
+    def _refresh_token(self) -> str:
+        return self.request(PASSWORD)["refresh_token"]
+
+    def unavailable(self, grants: Iterable[str]) -> Dict[str, str]:
+        """Send each grant once (untimed); grants the realm rejects, with their error.
+
+        E.g. client_credentials fails unless the client has a service account.
+        """
+        failed = {}
+        for grant in grants:
+            try:
+                self.request(grant, self._refresh_token() if grant == REFRESH_TOKEN else None)
+            except Exception as e:
+                failed[grant] = f"{error_kind(e)}: {e}"
+        return failed
+
+    def run_level(self, grant: str, concurrency: int, duration: float) -> LevelResult:
+        """Drive one grant with `concurrency` workers for `duration` seconds."""
+        # Seeded before the clock starts, one session per worker
+        refresh_tokens = [
+            self._refresh_token() if grant == REFRESH_TOKEN else None for _ in range(concurrency)
+        ]
+
+        histogram = LatencyHistogram()
+        kinds: Counter = Counter()
+        samples: List[str] = []
+        totals = {"requests": 0, "errors": 0}
+        lock = threading.Lock()
+        start = threading.Barrier(concurrency + 1)
+
+        def worker(refresh_token: Optional[str]):
+            latencies, errors, requests = [], Counter(), 0
+            start.wait()
+            deadline = started + duration
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                requests += 1
+                try:
+                    token = self.request(grant, refresh_token)
+                except Exception as e:
+                    errors[error_kind(e)] += 1
+                    if len(samples) < 5:
+                        samples.append(f"{error_kind(e)}: {e}")
+                    if grant == REFRESH_TOKEN:
+                        try:
+                            refresh_token = self._refresh_token()
+                        except Exception:
+                            pass
+                    continue
+                latencies.append(time.perf_counter() - sent)
+                refresh_token = token.get("refresh_token", refresh_token)
+
+            with lock:
+                for latency in latencies:
+                    histogram.record(latency)
+                kinds.update(errors)
+                totals["requests"] += requests
+                totals["errors"] += sum(errors.values())
+
+        threads = [
+            threading.Thread(target=worker, args=(token,), name=f"token-bench-{n}", daemon=True)
+            for n, token in enumerate(refresh_tokens)
+        ]
+        for thread in threads:
+            thread.start()
+        started = time.perf_counter()
+        start.wait()
+        for thread in threads:
+            thread.join()
+
+        return LevelResult(
+            grant=grant,
+            concurrency=concurrency,
+            requests=totals["requests"],
+            errors=totals["errors"],
+            duration=time.perf_counter() - started,
+            latency=histogram.summary(),
+            error_kinds=dict(kinds),
+            error_samples=samples,
+        )
+
+    def run(
+        self,
+        grants: Iterable[str],
+        levels: Iterable[int],
+        duration: float,
+        stop_error_rate: Optional[float] = None,
+        on_result: Optional[Callable[[LevelResult], None]] = None,
+    ) -> List[LevelResult]:
+        """Run every grant at every concurrency level (levels in increasing order).
+
+        Args:
+            grants: Grant types to benchmark
+            levels: Concurrency levels
+            duration: Seconds per level
+            stop_error_rate: Skip a grant's higher levels once a level exceeds this error rate
+            on_result: Called with each level's result as it completes
+
+        Returns:
+            One LevelResult per grant and level run
+        """
+        results = []
+        for grant in grants:
+            for concurrency in sorted(levels):
+                result = self.run_level(grant, concurrency, duration)
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                if stop_error_rate is not None and result.error_rate > stop_error_rate:
+                    break
+        return results
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def peak(
+    results: List[LevelResult], grant: str, max_error_rate: float = 0.01
+) -> Optional[LevelResult]:
+    """Level with the highest throughput for a grant, among levels within the error rate."""
+    levels = [r for r in results if r.grant == grant and r.error_rate <= max_error_rate]
+    return max(levels, key=lambda r: r.throughput, default=None)
+
+
+def format_report(results: List[LevelResult], max_error_rate: float = 0.01) -> str:
+    """Printable per-level table, plus each grant's peak throughput, best grant first."""
+    lines = [
+        f"{'Grant':<19} {'conc':>5} {'requests':>9} {'tokens/s':>9} {'err':>7} "
+        f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  errors",
+        "-" * 100,
+    ]
+    for r in results:
+        kinds = ", ".join(f"{kind} ×{count}" for kind, count in sorted(r.error_kinds.items()))
+        lines.append(
+            f"{r.grant:<19} {r.concurrency:>5} {r.requests:>9} "
+            f"{r.throughput:>9.1f} {r.error_rate:>7.1%} "
+            f"{r.latency.p50:>6.0f}ms {r.latency.p95:>6.0f}ms {r.latency.p99:>6.0f}ms "
+            f"{r.latency.max:>6.0f}ms  {kinds}".rstrip()
+        )
+
+    grants = list(dict.fromkeys(r.grant for r in results))
+    peaks = [(grant, peak(results, grant, max_error_rate)) for grant in grants]
+    lines.append("-" * 100)
+    lines.append(f"Peak throughput (error rate ≤ {max_error_rate:.0%}):")
+    for grant, best in sorted(peaks, key=lambda p: p[1].throughput if p[1] else -1.0, reverse=True):
+        if best is None:
+            lines.append(f"  {grant:<19} no level within the error rate")
+        else:
+            lines.append(
+                f"  {grant:<19} {best.throughput:>8.1f} tokens/s at concurrency {best.concurrency} "
+                f"(p95 {best.latency.p95:.0f}ms)"
+            )
+    return "\n".join(lines)
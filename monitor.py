@@ -0,0 +1,298 @@
+"""
+Synthetic monitor daemon for the DataKwip platform
+
+Keeps warm API, MCP and Keycloak admin clients (and optionally a logged-in
+browser) for the lifetime of the process and runs each check on its own
+interval with jitter, so a probe costs a request instead of a pytest start,
+a Playwright import, a Keycloak login and a browser launch. Rolling latency
+percentiles and availability per check are printed every --report-interval
+seconds and on exit (Ctrl+C or SIGTERM). With --metrics-port the check and
+client metrics are served for Prometheus at http://127.0.0.1:PORT/metrics;
+--metrics-textfile writes them for node_exporter's textfile collector.
+
+Uses the same environment variables as the test suite (.env). With
+--fake-stack the local stand-in servers are started instead (no browser).
+
+Usage:
+    python monitor.py
+    python monitor.py --ui --interval-ui 300 --report-interval 120
+    python monitor.py --metrics-port 9464
+    python monitor.py --fake-stack --interval 2 --duration 30
+"""
+
+import argparse
+import contextlib
+import os
+import signal
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from clients import (
+    ClientMetrics,
+    DataKwipAPIClient,
+    DataKwipMCPClient,
+    KeycloakAdminClient,
+    MetricsServer,
+    Tracer,
+    TransportFactory,
+)
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+from fixtures.monitor import Check, Monitor
+
+# Load environment
+load_dotenv()
+
+SETTINGS = [
+    "railway_api_url",
+    "railway_mcp_url",
+    "railway_ui_url",
+    "oauth2_token_url",
+    "keycloak_base_url",
+    "keycloak_realm",
+    "keycloak_admin",
+    "keycloak_admin_password",
+    "functional_tests_client_id",
+    "functional_tests_client_secret",
+    "functional_test_user_email",
+    "functional_test_user_password",
+]
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    missing = [name.upper() for name in SETTINGS if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in SETTINGS}
+
+
+class _Reporter:
+    """Prints the status table (and writes the metrics textfile) periodically until closed."""
+
+    def __init__(
+        self, monitor: Monitor, interval: float, metrics: ClientMetrics, textfile: Optional[str]
+    ):
+        self.monitor = monitor
+        self.interval = interval
+        self.metrics = metrics
+        self.textfile = textfile
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="monitor-report", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            print(f"\n{self.monitor.report()}", flush=True)
+            self.write_textfile()
+
+    def write_textfile(self):
+        if self.textfile:
+            self.metrics.registry.write_textfile(self.textfile)
+
+    def close(self):
+        self._stop.set()
+        self.write_textfile()
+
+
+def build_checks(args, api_client, mcp_client, auth_client, ui_client) -> List[Check]:
+    """Checks with their intervals; each raises on failure."""
+
+    def api_health():
+        health = api_client.get_database_health()
+        if health.get("overall_status") not in ("healthy", "degraded"):
+            raise RuntimeError(f"overall_status={health.get('overall_status')}")
+
+    def api_entities():
+        api_client.list_entities(org_id=args.org_id, limit=10)
+
+    def mcp_query_entities():
+        mcp_client.query_entities(org_id=args.org_id, limit=10)
+
+    def mcp_list_tools():
+        if not mcp_client.list_tools():
+            raise RuntimeError("No tools listed")
+
+    def keycloak_realm():
+        if not auth_client.verify_connection():
+            raise RuntimeError(f"Realm {auth_client.realm_name} not found")
+
+    api_interval = args.interval_api or args.interval
+    mcp_interval = args.interval_mcp or args.interval
+    auth_interval = args.interval_auth or args.interval
+    checks = [
+        Check(name="api_health", func=api_health, interval=api_interval, jitter=args.jitter),
+        Check(name="api_entities", func=api_entities, interval=api_interval, jitter=args.jitter),
+        Check(
+            name="mcp_query_entities",
+            func=mcp_query_entities,
+            interval=mcp_interval,
+            jitter=args.jitter,
+        ),
+        Check(
+            name="mcp_list_tools", func=mcp_list_tools, interval=mcp_interval, jitter=args.jitter
+        ),
+        Check(
+            name="keycloak_realm", func=keycloak_realm, interval=auth_interval, jitter=args.jitter
+        ),
+    ]
+    if ui_client is not None:
+        # Logs in once, afterwards only checks that the session still loads the app
+        checks.append(
+            Check(
+                name="ui_session",
+                func=ui_client.login,
+                interval=args.interval_ui,
+                jitter=args.jitter,
+                inline=True,
+            )
+        )
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic monitor daemon")
+    parser.add_argument(
+        "--interval", type=float, default=30.0, help="Default check interval (seconds)"
+    )
+    parser.add_argument("--interval-api", type=float, help="API check interval")
+    parser.add_argument("--interval-mcp", type=float, help="MCP check interval")
+    parser.add_argument("--interval-auth", type=float, help="Keycloak check interval")
+    parser.add_argument(
+        "--interval-ui", type=float, default=300.0, help="Browser session check interval"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.1, help="Interval jitter (fraction of interval)"
+    )
+    parser.add_argument(
+        "--window", type=float, default=3600.0, help="Rolling statistics window (seconds)"
+    )
+    parser.add_argument(
+        "--report-interval", type=float, default=60.0, help="Seconds between status reports"
+    )
+    parser.add_argument(
+        "--duration", type=float, help="Stop after this many seconds (default: run until stopped)"
+    )
+    parser.add_argument(
+        "--ui", action="store_true", help="Keep a logged-in browser and check the UI session"
+    )
+    parser.add_argument("--org-id", type=int, default=int(os.getenv("TEST_ORG_ID", "1")))
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve Prometheus metrics on this localhost port"
+    )
+    parser.add_argument(
+        "--metrics-textfile", help="Write Prometheus metrics to this file (textfile collector)"
+    )
+    args = parser.parse_args()
+
+    if args.fake_stack and args.ui:
+        print("ERROR: the fake stack does not serve the UI")
+        sys.exit(1)
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                settings = stack.enter_context(FakeStackProcess(FakeStackConfig())).settings()
+            else:
+                settings = env_settings()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        # Warm clients, kept for the whole run
+        metrics = ClientMetrics()
+        transport_factory = TransportFactory()
+        metrics.track_transport(transport_factory)
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=settings["railway_api_url"],
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                tracer=Tracer(service_name="datakwip-api-client", metrics=metrics),
+                transport_factory=transport_factory,
+            )
+        )
+        mcp_client = stack.enter_context(
+            DataKwipMCPClient(
+                base_url=settings["railway_mcp_url"],
+                tracer=Tracer(service_name="datakwip-mcp-client", metrics=metrics),
+                transport_factory=transport_factory,
+            )
+        )
+        metrics.track_resilience("api", api_client.resilience)
+        metrics.track_resilience("mcp", mcp_client.resilience)
+        auth_client = stack.enter_context(
+            KeycloakAdminClient(
+                server_url=settings["keycloak_base_url"],
+                realm_name=settings["keycloak_realm"],
+                admin_username=settings["keycloak_admin"],
+                admin_password=settings["keycloak_admin_password"],
+                verify=False,  # Allow self-signed certs in dev
+            )
+        )
+
+        ui_client = None
+        if args.ui:
+            from clients import DataKwipUIClient
+
+            ui_client = stack.enter_context(
+                DataKwipUIClient(
+                    base_url=settings["railway_ui_url"],
+                    username=settings["functional_test_user_email"],
+                    password=settings["functional_test_user_password"],
+                    metrics=metrics,
+                )
+            )
+
+        monitor = Monitor(
+            build_checks(args, api_client, mcp_client, auth_client, ui_client),
+            window=args.window,
+            on_result=metrics.observe_check,
+        )
+
+        def request_stop(signum, frame):
+            monitor.stop()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        until = "until stopped" if args.duration is None else f"{args.duration:g}s"
+        print("=" * 70)
+        print(
+            f"Synthetic monitor: {len(monitor.checks)} checks, "
+            f"report every {args.report_interval:g}s ({until})"
+        )
+        for check in monitor.checks.values():
+            print(f"  {check.name:<22} every {check.interval:g}s ±{check.jitter:.0%}")
+        if args.metrics_port is not None:
+            server = stack.enter_context(MetricsServer(metrics.registry, port=args.metrics_port))
+            print(f"Metrics: {server.url}")
+        if args.metrics_textfile:
+            print(f"Metrics textfile: {args.metrics_textfile}")
+        print("=" * 70)
+
+        # Reports come from a background thread; checks (incl. the browser) run on this one
+        reporter = stack.enter_context(
+            contextlib.closing(
+                _Reporter(monitor, args.report_interval, metrics, args.metrics_textfile)
+            )
+        )
+        reporter.start()
+        monitor.run(duration=args.duration)
+
+    print("\nFinal status:")
+    print(monitor.report())
+
+
+if __name__ == "__main__":
+    main()
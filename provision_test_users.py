@@ -0,0 +1,194 @@
+"""
+Bulk-provision load-test users in Keycloak and the DataKwip database
+
+This script:
+1. Creates N Keycloak users concurrently (existing users are reused)
+2. Upserts them into core.user and links them to the org in core.org_user
+   and core.org_admin with one multi-row statement in one transaction
+
+Running it again is a no-op; --teardown removes the users from both sides.
+
+Usage:
+    python provision_test_users.py --count 200
+    python provision_test_users.py --count 200 --org-id 2 --concurrency 32
+    python provision_test_users.py --teardown
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from clients import AsyncKeycloakAdminClient
+from fixtures import database
+
+# Load environment
+load_dotenv()
+
+DEFAULT_PREFIX = "load-test-user"
+EMAIL_DOMAIN = "datakwip.local"
+
+
+def user_emails(prefix: str, count: int) -> List[str]:
+    """Deterministic emails, so repeated runs address the same users."""
+    return [f"{prefix}-{i:05d}@{EMAIL_DOMAIN}" for i in range(count)]
+
+
+def create_admin_client() -> AsyncKeycloakAdminClient:
+    """Create async Keycloak admin client from environment."""
+    return AsyncKeycloakAdminClient(
+        server_url=os.environ["KEYCLOAK_BASE_URL"],
+        realm_name=os.environ["KEYCLOAK_REALM"],
+        admin_username=os.environ["KEYCLOAK_ADMIN"],
+        admin_password=os.environ["KEYCLOAK_ADMIN_PASSWORD"],
+        verify=False,  # Allow self-signed certs in dev
+    )
+
+
+async def create_keycloak_users(
+    emails: List[str], password: str, concurrency: int
+) -> Dict[str, str]:
+    """Create Keycloak users concurrently.
+
+    Returns:
+        Mapping of email to Keycloak user UUID
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with create_admin_client() as admin:
+
+        async def create(email: str) -> str:
+            async with semaphore:
+                return await admin.create_user(username=email, email=email, password=password)
+
+        user_ids = await asyncio.gather(*(create(email) for email in emails))
+
+    return dict(zip(emails, user_ids))
+
+
+async def delete_keycloak_users(prefix: str, concurrency: int) -> int:
+    """Delete all Keycloak users whose username starts with the prefix.
+
+    Returns:
+        Number of users deleted
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    deleted = 0
+
+    async with create_admin_client() as admin:
+
+        async def delete(user_id: str) -> bool:
+            async with semaphore:
+                return await admin.delete_user(user_id)
+
+        # Search results shift as users are deleted, so skip only non-matching hits
+        skipped = 0
+        while True:
+            page = await admin.search_users(f"{prefix}-", first=skipped, max_users=500)
+            if not page:
+                break
+
+            matching = [u["id"] for u in page if u.get("username", "").startswith(f"{prefix}-")]
+            skipped += len(page) - len(matching)
+            results = await asyncio.gather(*(delete(user_id) for user_id in matching))
+            deleted += sum(results)
+
+            if not matching and len(page) < 500:
+                break
+
+    return deleted
+
+
+def provision(count: int, org_id: int, prefix: str, password: str, concurrency: int):
+    """Provision users in Keycloak and link them to the org in the database."""
+    emails = user_emails(prefix, count)
+
+    conn = database.connect()
+    try:
+        org = database.get_org(conn, org_id)
+        if not org:
+            print(f"ERROR: Organization with id={org_id} does not exist!")
+            print("\nAvailable organizations:")
+            for o in database.list_orgs(conn):
+                print(f"  org_id={o['id']}, key={o['org_key']}")
+            sys.exit(1)
+
+        print(f"✓ Organization found: id={org['id']}, key={org['org_key']}")
+
+        start_time = time.time()
+        keycloak_ids = asyncio.run(create_keycloak_users(emails, password, concurrency))
+        print(f"✓ {len(keycloak_ids)} Keycloak users ready ({time.time() - start_time:.2f}s)")
+
+        start_time = time.time()
+        with conn:
+            user_ids = database.link_users_to_org(
+                conn, keycloak_ids.items(), org_id=org_id, org_admin=True
+            )
+        print(
+            f"✓ {len(user_ids)} users linked to organization {org_id} "
+            f"with org_admin ({time.time() - start_time:.2f}s)"
+        )
+    finally:
+        conn.close()
+
+
+def teardown(prefix: str, concurrency: int):
+    """Remove provisioned users from Keycloak and the database."""
+    start_time = time.time()
+    deleted = asyncio.run(delete_keycloak_users(prefix, concurrency))
+    print(f"✓ {deleted} Keycloak users deleted ({time.time() - start_time:.2f}s)")
+
+    conn = database.connect()
+    try:
+        with conn:
+            emails = database.find_user_emails(conn, f"{prefix}-%@{EMAIL_DOMAIN}")
+            removed = database.unlink_users(conn, emails)
+        print(f"✓ {removed} database users removed with their org links")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-provision load-test users")
+    parser.add_argument("--count", type=int, default=100, help="Number of users")
+    parser.add_argument("--org-id", type=int, default=1, help="Organization to link users to")
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Username/email prefix")
+    parser.add_argument(
+        "--password",
+        default=os.getenv("LOAD_TEST_USER_PASSWORD") or os.getenv("FUNCTIONAL_TEST_USER_PASSWORD"),
+        help="Password for all users (default: LOAD_TEST_USER_PASSWORD)",
+    )
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent Keycloak requests")
+    parser.add_argument("--teardown", action="store_true", help="Remove provisioned users")
+    args = parser.parse_args()
+
+    print("\n" + "=" * 70)
+    print(
+        f"{'Tearing down' if args.teardown else 'Provisioning'} load-test users ({args.prefix}-*)"
+    )
+    print("=" * 70 + "\n")
+
+    try:
+        if args.teardown:
+            teardown(args.prefix, args.concurrency)
+        else:
+            if not args.password:
+                print("ERROR: --password or LOAD_TEST_USER_PASSWORD is required")
+                sys.exit(1)
+            provision(args.count, args.org_id, args.prefix, args.password, args.concurrency)
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+
+        traceback.print_exc()
+        sys.exit(1)
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()
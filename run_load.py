@@ -0,0 +1,211 @@
+"""
+Open-loop load test against the DataKwip API and MCP server
+
+Sends requests at a fixed arrival rate (with optional ramp-up and ramp-down)
+whether or not earlier requests have completed, and reports achieved vs
+target throughput and latency percentiles per phase. Latency is measured from
+each request's scheduled send time, so server slowdowns show up as queueing
+delay instead of silently lowering the request rate.
+
+Uses the same environment variables as the test suite (.env). With
+--fake-stack the local stand-in servers are started instead.
+
+Usage:
+    python run_load.py --rate 20 --steady 60
+    python run_load.py --rate 50 --ramp-up 10 --steady 120 --ramp-down 10 \
+        --operations entities query_entities
+    python run_load.py --fake-stack --rate 200 --steady 10
+    python run_load.py --rate 50 --steady 60 --max-host-rate 20 --max-in-flight 8
+    python run_load.py --rate 100 --steady 60 --http2 --max-connections 16
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from clients import (
+    DataKwipAPIClient,
+    DataKwipMCPClient,
+    PoolConfig,
+    RequestGovernor,
+    TransportFactory,
+)
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+from fixtures.load import LoadOperation, LoadProfile, run_load
+
+# Load environment
+load_dotenv()
+
+OPERATIONS = ["health", "entities", "entity_tags", "list_tools", "query_entities", "current_values"]
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "railway_api_url",
+        "railway_mcp_url",
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def build_operations(names, api_client, mcp_client, org_id: int):
+    """Map operation names to client calls."""
+    calls = {
+        "health": api_client.get_database_health,
+        "entities": lambda: api_client.list_entities(org_id=org_id, limit=10),
+        "entity_tags": lambda: api_client.list_entity_tags(org_id=org_id, limit=10),
+        "list_tools": mcp_client.list_tools,
+        "query_entities": lambda: mcp_client.query_entities(org_id=org_id, limit=10),
+        "current_values": lambda: mcp_client.get_current_values(
+            entity_ids=[1, 2, 3], org_id=org_id
+        ),
+    }
+    return [LoadOperation(name=name, func=calls[name]) for name in names]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test")
+    parser.add_argument("--rate", type=float, default=10.0, help="Target requests/second")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Ramp-up seconds")
+    parser.add_argument("--steady", type=float, default=30.0, help="Steady-state seconds")
+    parser.add_argument("--ramp-down", type=float, default=5.0, help="Ramp-down seconds")
+    parser.add_argument("--workers", type=int, default=32, help="Maximum in-flight requests")
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=OPERATIONS,
+        default=["entities", "query_entities"],
+        help="Operations to mix (equal weight)",
+    )
+    parser.add_argument("--org-id", type=int, default=int(os.getenv("TEST_ORG_ID", "1")))
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    parser.add_argument(
+        "--max-host-rate",
+        type=float,
+        help="Client-side cap in requests/second per host (adaptive on 429/503)",
+    )
+    parser.add_argument("--max-in-flight", type=int, help="Client-side cap on concurrent requests")
+    parser.add_argument(
+        "--http2", action="store_true", help="Negotiate HTTP/2 (needs the http2 extra)"
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        help="Connection pool size (default: --workers, all kept alive)",
+    )
+    parser.add_argument(
+        "--keepalive-expiry", type=float, default=30.0, help="Idle connection lifetime (s)"
+    )
+    args = parser.parse_args()
+
+    # One pool for both clients, sized so concurrent workers keep their connections
+    pool_size = args.max_connections or args.workers
+    transport_factory = TransportFactory(
+        PoolConfig(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=args.keepalive_expiry,
+            http2=args.http2,
+        )
+    )
+
+    governor = None
+    if args.max_host_rate or args.max_in_flight:
+        governor = RequestGovernor(
+            rate=args.max_host_rate, burst=5, max_in_flight=args.max_in_flight
+        )
+
+    profile = LoadProfile(
+        target_rate=args.rate,
+        steady=args.steady,
+        ramp_up=args.ramp_up,
+        ramp_down=args.ramp_down,
+        workers=args.workers,
+    )
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                settings = stack.enter_context(FakeStackProcess(FakeStackConfig())).settings()
+            else:
+                settings = env_settings()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=settings["railway_api_url"],
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                governor=governor,
+                transport_factory=transport_factory,
+            )
+        )
+        mcp_client = stack.enter_context(
+            DataKwipMCPClient(
+                base_url=settings["railway_mcp_url"],
+                governor=governor,
+                transport_factory=transport_factory,
+            )
+        )
+        operations = build_operations(args.operations, api_client, mcp_client, args.org_id)
+
+        print("=" * 70)
+        print(
+            f"Open-loop load: {args.rate}/s target, "
+            f"{args.ramp_up}s ramp-up, {args.steady}s steady, {args.ramp_down}s ramp-down"
+        )
+        print(f"Operations: {', '.join(args.operations)}")
+        print("=" * 70)
+
+        try:
+            # Warm-up: token fetch and connection setup stay out of the measurements
+            for op in operations:
+                op.func()
+        except Exception as e:
+            print(f"ERROR: warm-up failed: {e}")
+            sys.exit(1)
+
+        result = run_load(operations, profile)
+
+    print(result.summary())
+    print(f"\nConnection reuse:\n{transport_factory.report()}")
+    if governor is not None:
+        print(f"\nClient-side governor (throttled vs server time):\n{governor.report()}")
+
+    steady = result.phase("steady")
+    if result.error_samples:
+        print("\nErrors:")
+        for sample in result.error_samples:
+            print(f"  ✗ {sample}")
+
+    if steady.errors or steady.achieved_rate < steady.target_rate * 0.9:
+        print(
+            f"\n✗ Target not sustained: {steady.achieved_rate:.1f}/s of "
+            f"{steady.target_rate:.1f}/s, {steady.errors} errors"
+        )
+        sys.exit(1)
+
+    print(f"\n✓ Sustained {steady.achieved_rate:.1f}/s with p95 {steady.latency.p95:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
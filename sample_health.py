@@ -0,0 +1,165 @@
+"""
+Sample database health and latency from /health/databases
+
+Polls the API's /health/databases endpoint at a fixed rate and keeps a
+rolling time series of status and latency_ms per database (timescaledb,
+statedb, ...). Status transitions, degraded periods (any status other than
+healthy) and latency spikes (robust z-score against the recent baseline) are
+printed as they are detected; a per-database summary is printed every
+--report-interval seconds and on exit (Ctrl+C or SIGTERM). --json writes the
+structured result (summaries, transitions, periods, spikes) at the end.
+
+Uses the same environment variables as the test suite (.env), although the
+endpoint needs no token. With --fake-stack the local stand-in API is used
+instead.
+
+Usage:
+    python sample_health.py --interval 5
+    python sample_health.py --interval 1 --duration 600 --json health.json
+    python sample_health.py --fake-stack --interval 0.2 --duration 10
+"""
+
+import argparse
+import contextlib
+import os
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import Dict
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from clients import DataKwipAPIClient
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+from fixtures.health import DegradedPeriod, HealthSampler, LatencySpike, StatusTransition
+
+# Load environment
+load_dotenv()
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "railway_api_url",
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def print_event(event: BaseModel):
+    if isinstance(event, StatusTransition):
+        print(f"  {event.database}: {event.previous} → {event.status}", flush=True)
+    elif isinstance(event, DegradedPeriod):
+        print(f"  ✗ {event.database}: {event.statuses[0]} (degraded period started)", flush=True)
+    elif isinstance(event, LatencySpike):
+        print(
+            f"  ✗ {event.database}: latency spike {event.latency_ms:.1f}ms "
+            f"(baseline {event.baseline_ms:.1f}ms, z={event.z_score:.1f})",
+            flush=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample /health/databases latency and status")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls")
+    parser.add_argument(
+        "--duration", type=float, help="Stop after this many seconds (default: run until stopped)"
+    )
+    parser.add_argument(
+        "--window", type=float, default=3600.0, help="Rolling statistics window (seconds)"
+    )
+    parser.add_argument(
+        "--report-interval", type=float, default=60.0, help="Seconds between summaries"
+    )
+    parser.add_argument(
+        "--spike-window", type=int, default=60, help="Samples forming the latency baseline"
+    )
+    parser.add_argument(
+        "--z-threshold", type=float, default=4.0, help="Robust z-score of a latency spike"
+    )
+    parser.add_argument(
+        "--min-spike-ms", type=float, default=5.0, help="Minimum spike above the baseline median"
+    )
+    parser.add_argument("--json", help="Write the structured result to this file")
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                settings = stack.enter_context(FakeStackProcess(FakeStackConfig())).settings()
+            else:
+                settings = env_settings()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        api_url = settings["railway_api_url"]
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=api_url,
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+            )
+        )
+        sampler = HealthSampler(
+            api_client.get_database_health,
+            interval=args.interval,
+            window=args.window,
+            spike_window=args.spike_window,
+            z_threshold=args.z_threshold,
+            min_spike_ms=args.min_spike_ms,
+            on_event=print_event,
+        )
+
+        def request_stop(signum, frame):
+            sampler.stop()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        print("=" * 70)
+        print(
+            f"Health sampling: {api_url}/health/databases every {args.interval:g}s "
+            f"({'until stopped' if args.duration is None else f'{args.duration:g}s'})"
+        )
+        print("=" * 70)
+
+        reporting = threading.Event()
+
+        def report_periodically():
+            while not reporting.wait(args.report_interval):
+                print(f"\n{sampler.report()}\n", flush=True)
+
+        threading.Thread(target=report_periodically, name="health-report", daemon=True).start()
+        stack.callback(reporting.set)
+        sampler.run(duration=args.duration)
+
+    result = sampler.result()
+    print(f"\nFinal status ({result.polls} polls, {result.missed_polls} missed):")
+    print(sampler.report())
+    if args.json:
+        Path(args.json).write_text(result.model_dump_json(indent=2))
+        print(f"✓ Result written to {args.json}")
+
+    if any(p.ongoing for p in result.degraded_periods):
+        print("✗ Degraded at exit")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Seed a synthetic large organization for scale testing
+
+This script:
+1. Creates (or reuses) an organization with the given org_key
+2. Streams N entities, their tags and time-series points into the database
+   with COPY FROM STDIN (constant memory at any scale)
+
+Meant for a local Postgres/TimescaleDB, so API and MCP latency can be measured
+at 1k, 100k and 1M entities. Point the local API/MCP services at the same
+database and set TEST_ORG_ID to the printed org_id.
+
+Usage:
+    python seed_large_org.py --org-key scale-1k --entities 1k --points-per-entity 96
+    python seed_large_org.py --org-key scale-1m --entities 1m --create-schema
+    python seed_large_org.py --org-key scale-1m --drop
+"""
+
+import argparse
+import sys
+
+from dotenv import load_dotenv
+
+from fixtures import database, seeder
+
+# Load environment
+load_dotenv()
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_count(value: str) -> int:
+    """Parse counts such as 1000, 100k or 1m."""
+    value = value.strip().lower()
+    if value and value[-1] in SUFFIXES:
+        return int(float(value[:-1]) * SUFFIXES[value[-1]])
+    return int(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic large organization")
+    parser.add_argument("--org-key", required=True, help="Organization key (e.g., scale-100k)")
+    parser.add_argument(
+        "--entities", type=parse_count, default=1_000, help="Entities (1k, 100k, 1m)"
+    )
+    parser.add_argument("--tags-per-entity", type=int, default=5, help="Tags per entity")
+    parser.add_argument(
+        "--points-per-entity", type=int, default=0, help="Time-series points per entity"
+    )
+    parser.add_argument("--interval", type=int, default=900, help="Seconds between points")
+    parser.add_argument("--create-schema", action="store_true", help="Create tables if missing")
+    parser.add_argument("--drop", action="store_true", help="Delete the organization instead")
+    args = parser.parse_args()
+
+    try:
+        conn = database.connect()
+    except Exception as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    try:
+        if args.drop:
+            counts = seeder.drop_org(conn, args.org_key)
+            if not counts:
+                print(f"Organization {args.org_key} not found")
+            for table, count in counts.items():
+                print(f"✓ {table}: {count} rows deleted")
+            return
+
+        if args.create_schema:
+            with conn:
+                seeder.create_schema(conn)
+            print("✓ Schema ready")
+
+        spec = seeder.SeedSpec(
+            org_key=args.org_key,
+            entities=args.entities,
+            tags_per_entity=args.tags_per_entity,
+            points_per_entity=args.points_per_entity,
+            point_interval_seconds=args.interval,
+        )
+
+        print(
+            f"Seeding {spec.org_key}: {spec.entities} entities, "
+            f"{spec.entities * spec.tags_per_entity} tags, "
+            f"{spec.entities * spec.points_per_entity} points..."
+        )
+        result = seeder.seed_org(conn, spec)
+
+        print(f"✓ Organization seeded: org_id={result.org_id}, key={spec.org_key}")
+        last_entity_id = result.first_entity_id + result.entities - 1
+        print(f"  Entity IDs: {result.first_entity_id}..{last_entity_id}")
+        print(f"  Rows: {result.entities} entities, {result.tags} tags, {result.points} points")
+        print(f"  Time: {result.duration:.2f}s ({result.rows_per_second:,.0f} rows/s)")
+        print(f"\nRun the suite against it with TEST_ORG_ID={result.org_id}")
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
+        import traceback
+
+        traceback.print_exc()
+        sys.exit(1)
+
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Sweep the API and MCP checks across every organization
+
+Lists all organizations from core.org (DATABASE_URL) and runs the API
+(entity and tag listing) and MCP (query_entities, get_current_values)
+checks against each one, with at most --workers organizations in flight.
+Prints latency percentiles per organization and check, slowest organization
+first, so large tenants that are slow stand out. Organizations the user is
+not authorized for (401/403) are reported as skipped, not failed.
+
+With --fake-stack the local stand-in servers and their organizations are
+used instead.
+
+Usage:
+    python sweep_orgs.py
+    python sweep_orgs.py --workers 8 --samples 10 --max-p95 500
+    python sweep_orgs.py --org-ids 1 7 12 --checks list_entities query_entities
+    python sweep_orgs.py --fake-stack --fake-stack-orgs 20
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from clients import DataKwipAPIClient, DataKwipMCPClient, PoolConfig, TransportFactory
+from fixtures import database
+from fixtures.fake_stack import FakeStackConfig, FakeStackProcess
+from fixtures.latency import LatencyBudget
+from fixtures.org_sweep import OrgResult, OrgSweep, api_checks, format_report, mcp_checks
+
+# Load environment
+load_dotenv()
+
+CHECKS = ["list_entities", "list_entity_tags", "query_entities", "get_current_values"]
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "railway_api_url",
+        "railway_mcp_url",
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+        "database_url",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def print_progress(result: OrgResult):
+    if result.skipped:
+        print(
+            f"  - org {result.org_id:<5} {result.org_key or '-':<20} "
+            f"skipped, unauthorized ({result.unauthorized})"
+        )
+        return
+    status = "✓" if not result.errors else "✗"
+    print(
+        f"  {status} org {result.org_id:<5} {result.org_key or '-':<20} "
+        f"p95 {result.p95:>7.0f}ms  {result.errors} errors  {result.duration:.1f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep API/MCP checks across every organization")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Organizations checked at the same time"
+    )
+    parser.add_argument(
+        "--samples", type=int, default=5, help="Timed calls per organization and check"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unrecorded calls per organization and check"
+    )
+    parser.add_argument("--limit", type=int, default=10, help="Rows per list/query call")
+    parser.add_argument("--checks", nargs="+", choices=CHECKS, default=CHECKS, help="Checks to run")
+    parser.add_argument("--org-ids", type=int, nargs="+", help="Only these organizations")
+    parser.add_argument(
+        "--max-p95", type=float, help="Fail if any check of any organization exceeds this p95 (ms)"
+    )
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    parser.add_argument(
+        "--fake-stack-orgs", type=int, default=3, help="Organizations served by the fake stack"
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                config = FakeStackConfig(orgs=args.fake_stack_orgs)
+                settings = stack.enter_context(FakeStackProcess(config)).settings()
+                orgs = [
+                    {"id": org_id, "org_key": f"org-{org_id}"}
+                    for org_id in range(1, config.orgs + 1)
+                ]
+            else:
+                settings = env_settings()
+                conn = database.connect(settings["database_url"])
+                try:
+                    orgs = database.list_orgs(conn)
+                finally:
+                    conn.close()
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        if args.org_ids:
+            unknown = set(args.org_ids) - {org["id"] for org in orgs}
+            if unknown:
+                print(f"ERROR: Organizations do not exist: {', '.join(map(str, sorted(unknown)))}")
+                sys.exit(1)
+            orgs = [org for org in orgs if org["id"] in args.org_ids]
+        if not orgs:
+            print("ERROR: No organizations found in core.org")
+            sys.exit(1)
+
+        # Every worker keeps its API and MCP connections alive
+        transport_factory = TransportFactory(
+            PoolConfig(max_connections=args.workers * 2, max_keepalive_connections=args.workers * 2)
+        )
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=settings["railway_api_url"],
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                transport_factory=transport_factory,
+            )
+        )
+        mcp_client = stack.enter_context(
+            DataKwipMCPClient(
+                base_url=settings["railway_mcp_url"],
+                transport_factory=transport_factory,
+            )
+        )
+
+        checks = {
+            **api_checks(api_client, limit=args.limit),
+            **mcp_checks(mcp_client, limit=args.limit),
+        }
+        budgets = {}
+        if args.max_p95 is not None:
+            budgets = {name: LatencyBudget(p95=args.max_p95) for name in args.checks}
+        sweep = OrgSweep(
+            {name: checks[name] for name in args.checks},
+            samples=args.samples,
+            warmup=args.warmup,
+            workers=args.workers,
+            budgets=budgets,
+        )
+
+        print("=" * 70)
+        print(
+            f"Org sweep: {len(orgs)} organization(s), {args.workers} at a time, "
+            f"{args.samples} samples per check"
+        )
+        print(f"Checks: {', '.join(args.checks)}")
+        print("=" * 70)
+
+        try:
+            # One token fetch up front instead of one per worker racing for it
+            api_client.get_token_cache()
+            results = sweep.run(orgs, on_result=print_progress)
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+    print("\n" + format_report(results))
+    print("=" * 70)
+
+    skipped = [r for r in results if r.skipped]
+    if len(skipped) == len(results):
+        print("✗ The user is not authorized for any organization")
+        sys.exit(1)
+    failed = [r for r in results if not r.ok]
+    for r in failed:
+        for problem in r.error_samples + r.violations:
+            print(f"✗ org {r.org_id}: {problem}")
+    if failed:
+        print(f"✗ {len(failed)} of {len(results)} organizations failed")
+        sys.exit(1)
+    print(
+        f"✓ All {len(results) - len(skipped)} swept organizations passed ({len(skipped)} skipped)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,37 @@
 """API endpoint functional tests."""
 
+import itertools
 import time
+from urllib.parse import urlparse
+
+import httpx
 import pytest
 
-from clients import DataKwipAPIClient
+from clients import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ClientMetrics,
+    DataKwipAPIClient,
+    MetricsServer,
+    RequestGovernor,
+    Resilience,
+    RetryPolicy,
+    Tracer,
+    TransportFactory,
+)
+from fixtures.health import OVERALL, UNREACHABLE, HealthSampler, parse_health
+from fixtures.load import LoadOperation, LoadProfile, run_load
 
 
 @pytest.mark.api
-def test_database_health(api_client: DataKwipAPIClient):
+def test_database_health(api_client: DataKwipAPIClient, config, latency_recorder):
     """Test database health endpoint (no auth required)."""
-    start_time = time.time()
-    health = api_client.get_database_health()
-    duration = time.time() - start_time
+    health = latency_recorder.measure(
+        "get_database_health",
+        api_client.get_database_health,
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
+    )
 
     # Verify response structure
     assert isinstance(health, dict), "Health response should be a dictionary"
@@ -19,26 +39,36 @@ def test_database_health(api_client: DataKwipAPIClient):
     assert "databases" in health, "Health should include databases array"
     assert health["overall_status"] in ["healthy", "degraded", "critical", "error"], "Invalid overall_status"
 
-    # Verify response time
-    assert duration < 1.0, f"Database health check should be < 1s, got {duration:.2f}s"
+    # Verify response time percentiles
+    violations = latency_recorder.violations(
+        "get_database_health", config.latency_budgets.get("get_database_health")
+    )
+    assert not violations, f"Database health check over budget: {', '.join(violations)}"
 
-    print(f"✓ Database health check passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("get_database_health")
+    print(f"✓ Database health check passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)")
     print(f"  Response: {health}")
 
 
 @pytest.mark.api
-def test_list_entities(api_client: DataKwipAPIClient, config):
+def test_list_entities(api_client: DataKwipAPIClient, config, latency_recorder):
     """Test entity listing endpoint (requires datakwip:entity:list scope)."""
-    start_time = time.time()
-    entities = api_client.list_entities(org_id=config.test_org_id, limit=config.test_entity_limit)
-    duration = time.time() - start_time
+    entities = latency_recorder.measure(
+        "list_entities",
+        lambda: api_client.list_entities(org_id=config.test_org_id, limit=config.test_entity_limit),
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
+    )
 
     # Verify response structure
     assert isinstance(entities, list), "Entities response should be a list"
     assert len(entities) <= config.test_entity_limit, "Should respect limit parameter"
 
-    # Verify response time
-    assert duration < 0.5, f"Entity list should be < 500ms, got {duration*1000:.0f}ms"
+    # Verify response time percentiles
+    violations = latency_recorder.violations(
+        "list_entities", config.latency_budgets.get("list_entities")
+    )
+    assert not violations, f"Entity list over budget: {', '.join(violations)}"
 
     # Verify entity structure (if data exists)
     if entities:
@@ -47,25 +77,32 @@ def test_list_entities(api_client: DataKwipAPIClient, config):
         assert "org_id" in entity, "Entity should have org_id"
         assert entity["org_id"] == config.test_org_id, "Entity org_id should match request"
 
-    print(f"✓ Entity listing passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("list_entities")
+    print(f"✓ Entity listing passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)")
     print(f"  Retrieved {len(entities)} entities")
     if entities:
         print(f"  First entity: {entities[0].get('key', 'N/A')} - {entities[0].get('name', 'N/A')}")
 
 
 @pytest.mark.api
-def test_list_entity_tags(api_client: DataKwipAPIClient, config):
+def test_list_entity_tags(api_client: DataKwipAPIClient, config, latency_recorder):
     """Test entity tag listing endpoint (requires datakwip:entity:tag:list scope)."""
-    start_time = time.time()
-    tags = api_client.list_entity_tags(org_id=config.test_org_id, limit=config.test_tag_limit)
-    duration = time.time() - start_time
+    tags = latency_recorder.measure(
+        "list_entity_tags",
+        lambda: api_client.list_entity_tags(org_id=config.test_org_id, limit=config.test_tag_limit),
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
+    )
 
     # Verify response structure
     assert isinstance(tags, list), "Tags response should be a list"
     assert len(tags) <= config.test_tag_limit, "Should respect limit parameter"
 
-    # Verify response time
-    assert duration < 0.8, f"Tag list should be < 800ms, got {duration*1000:.0f}ms"
+    # Verify response time percentiles
+    violations = latency_recorder.violations(
+        "list_entity_tags", config.latency_budgets.get("list_entity_tags")
+    )
+    assert not violations, f"Tag list over budget: {', '.join(violations)}"
 
     # Verify tag structure (if data exists)
     if tags:
@@ -73,7 +110,8 @@ def test_list_entity_tags(api_client: DataKwipAPIClient, config):
         assert "id" in tag or "tag_key" in tag, "Tag should have id or tag_key"
         assert "entity_id" in tag, "Tag should have entity_id"
 
-    print(f"✓ Entity tag listing passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("list_entity_tags")
+    print(f"✓ Entity tag listing passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)")
     print(f"  Retrieved {len(tags)} tags")
     if tags:
         print(f"  First tag: {tag.get('tag_key', 'N/A')} = {tag.get('tag_value', 'N/A')}")
@@ -103,32 +141,291 @@ def test_oauth2_token_caching(api_client: DataKwipAPIClient):
 
 
 @pytest.mark.api
-@pytest.mark.slow
-def test_api_stress(api_client: DataKwipAPIClient, config):
-    """Stress test: Make multiple API calls rapidly."""
-    num_requests = 10
-    results = []
+def test_connection_reuse(
+    api_client: DataKwipAPIClient, transport_factory: TransportFactory, config
+):
+    """Test that sequential requests reuse one keep-alive connection."""
+    host = urlparse(config.railway_api_url).netloc
+    before = transport_factory.stats().get(host)
+
+    for _ in range(10):
+        api_client.list_entities(org_id=config.test_org_id, limit=1)
+
+    after = transport_factory.stats()[host]
+    requests = after.requests - (before.requests if before else 0)
+    new_connections = after.new_connections - (before.new_connections if before else 0)
+
+    assert requests == 10, f"Expected 10 requests to {host}, counted {requests}"
+    assert new_connections <= 1, f"Expected at most 1 new connection, got {new_connections}"
+
+    reused = requests - new_connections
+    print(f"✓ Connection reuse: {reused}/{requests} requests on an open connection")
+    print(transport_factory.report())
+
+
+@pytest.mark.api
+def test_api_retry_and_circuit_breaker(api_client: DataKwipAPIClient, config, fake_stack):
+    """Test retries of transient errors and fail-fast once the circuit opens (fake stack only)."""
+    if fake_stack is None:
+        pytest.skip("Needs --fake-stack to inject failures")
+
+    # Transient 503s with Retry-After are retried transparently
+    retries_before = api_client.resilience.retries
+    fake_stack.inject_failures("api", 2, status=503, retry_after=0)
+    entities = api_client.list_entities(org_id=config.test_org_id, limit=1)
+    assert len(entities) == 1, "Request should succeed after retries"
+    assert api_client.resilience.retries - retries_before == 2, "Both 503s should be retried"
+
+    # Repeated failures open the circuit; calls then fail without reaching the server
+    breaker = CircuitBreaker("api", failure_threshold=2, reset_timeout=0.2)
+    client = DataKwipAPIClient(
+        base_url=config.railway_api_url,
+        token_url=config.oauth2_token_url,
+        client_id=config.functional_tests_client_id,
+        client_secret=config.functional_tests_client_secret,
+        username=config.functional_test_user_email,
+        password=config.functional_test_user_password,
+        resilience=Resilience(RetryPolicy(max_attempts=1), breaker),
+    )
+    try:
+        fake_stack.inject_failures("api", 2, status=502)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                client.get_database_health()
+        assert breaker.state == "open", "Circuit should open after 2 consecutive failures"
+
+        start = time.perf_counter()
+        with pytest.raises(CircuitOpenError):
+            client.get_database_health()
+        assert time.perf_counter() - start < 0.05, "Open circuit should fail fast"
+
+        # After the reset timeout one trial call goes through and closes the circuit
+        time.sleep(0.25)
+        assert client.get_database_health()["overall_status"] == "healthy"
+        assert breaker.state == "closed", "Successful trial call should close the circuit"
+    finally:
+        client.close()
+
+    print(f"✓ Retry and circuit breaker behave as expected")
+
+
+@pytest.mark.api
+def test_api_timeout_not_retried(config, fake_stack):
+    """Test that a read timeout fails after one timeout, without retries (fake stack only)."""
+    if fake_stack is None:
+        pytest.skip("Needs --fake-stack to inject latency")
+
+    timeout = 0.2
+    client = DataKwipAPIClient(
+        base_url=config.railway_api_url,
+        token_url=config.oauth2_token_url,
+        client_id=config.functional_tests_client_id,
+        client_secret=config.functional_tests_client_secret,
+        username=config.functional_test_user_email,
+        password=config.functional_test_user_password,
+        timeout=timeout,
+        resilience=Resilience(RetryPolicy(max_attempts=3)),
+    )
+    latency_ms = fake_stack.config.latency_ms
+    fake_stack.config.latency_ms = 1000  # Far above the client timeout
+    try:
+        start = time.perf_counter()
+        with pytest.raises(httpx.ReadTimeout):
+            client.get_database_health()
+        elapsed = time.perf_counter() - start
+    finally:
+        fake_stack.config.latency_ms = latency_ms
+        client.close()
+
+    assert client.resilience.retries == 0, "Read timeouts should not be retried"
+    assert elapsed < 2 * timeout, \
+        f"Timed out after {elapsed:.2f}s, expected one {timeout:g}s timeout"
+
+    print(f"✓ Read timeout failed after {elapsed:.2f}s without retries")
+
+
+@pytest.mark.api
+def test_api_rate_governor(config, fake_stack):
+    """Test per-host rate limiting and slow-down on 429 (fake stack only)."""
+    if fake_stack is None:
+        pytest.skip("Needs --fake-stack to inject 429s")
+
+    governor = RequestGovernor(rate=20, burst=1)
+    client = DataKwipAPIClient(
+        base_url=config.railway_api_url,
+        token_url=config.oauth2_token_url,
+        client_id=config.functional_tests_client_id,
+        client_secret=config.functional_tests_client_secret,
+        username=config.functional_test_user_email,
+        password=config.functional_test_user_password,
+        resilience=Resilience(RetryPolicy(max_attempts=2)),
+        governor=governor,
+    )
+    try:
+        # 11 back-to-back requests at 20/s with burst 1: at least 0.5s throttled
+        start = time.perf_counter()
+        for _ in range(11):
+            client.get_database_health()
+        elapsed = time.perf_counter() - start
+        assert elapsed >= 0.45, f"Governor should pace requests, took {elapsed:.2f}s"
+
+        # A 429 halves the host's rate; the retry then succeeds
+        fake_stack.inject_failures("api", 1, status=429, retry_after=0)
+        client.get_database_health()
+    finally:
+        client.close()
+
+    host = config.railway_api_url.split("://", 1)[1]
+    stats = governor.stats()[host]
+    assert stats.requests == 13, f"Expected 13 governed requests, got {stats.requests}"
+    assert stats.throttled_seconds >= 0.45, "Throttled time should be accounted"
+    assert stats.slow_downs == 1, "429 should be counted"
+    assert stats.current_rate < 20, "Rate should be reduced after a 429"
+
+    print(f"✓ Request governor paces and adapts")
+    print(governor.report())
+
+
+@pytest.mark.api
+def test_api_metrics_endpoint(config, transport_factory: TransportFactory):
+    """Test that client latencies, token refreshes and breaker state are exposed on /metrics."""
+    metrics = ClientMetrics()
+    client = DataKwipAPIClient(
+        base_url=config.railway_api_url,
+        token_url=config.oauth2_token_url,
+        client_id=config.functional_tests_client_id,
+        client_secret=config.functional_tests_client_secret,
+        username=config.functional_test_user_email,
+        password=config.functional_test_user_password,
+        tracer=Tracer(service_name="datakwip-api-client", metrics=metrics),
+        transport_factory=transport_factory,
+    )
+    metrics.track_resilience("api", client.resilience)
+    try:
+        for _ in range(3):
+            client.list_entities(org_id=config.test_org_id, limit=1)
+
+        with MetricsServer(metrics.registry, port=0) as server:
+            response = httpx.get(server.url)
+    finally:
+        client.close()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    expected = [
+        "datakwip_client_operation_duration_seconds_count"
+        '{service="datakwip-api-client",operation="list_entities",outcome="ok"} 3',
+        "datakwip_http_request_duration_seconds_count"
+        '{service="datakwip-api-client",method="GET",route="/entity",status="200"} 3',
+        'datakwip_token_refreshes_total{service="datakwip-api-client",outcome="ok"} 1',
+        'datakwip_cache_requests_total{cache="api_token",result="hit"} 2',
+        'datakwip_cache_requests_total{cache="api_token",result="miss"} 1',
+        'datakwip_circuit_state{client="api"} 0',
+    ]
+    for line in expected:
+        assert line in body, f"Missing from /metrics: {line}"
+
+    print(f"✓ Metrics endpoint exposes {len(body.splitlines())} lines")
+
+
+@pytest.mark.api
+def test_database_health_sampling(api_client: DataKwipAPIClient, config):
+    """Test that the health sampler tracks database latency, degraded periods and spikes."""
+    databases = list(parse_health(api_client.get_database_health()))
+    assert databases, "Health response should list databases"
+    target = databases[0]
+    polls = itertools.count(1)
+
+    # Injected into the real responses: target degraded on polls 12-15, a latency spike on poll 25
+    def fetch():
+        health = api_client.get_database_health()
+        poll = next(polls)
+        entry = parse_health(health)[target]
+        if 12 <= poll <= 15:
+            entry["status"] = "degraded"
+        if poll == 25:
+            entry["latency_ms"] = (entry.get("latency_ms") or 0) + 10_000
+        return health
+
+    sampler = HealthSampler(fetch, interval=config.health_sample_interval)
+    sampler.run(samples=30)
+    result = sampler.result()
+    print(f"\n{sampler.report()}")
+
+    assert result.polls == 30
+    assert all(
+        p.status != UNREACHABLE for p in sampler.series(OVERALL)
+    ), "Health endpoint unreachable"
+    for name in databases:
+        assert sampler.summary(name).latency.count > 0, f"{name}: no latency_ms reported"
+
+    assert any(
+        p.database == target and p.samples >= 4 and "degraded" in p.statuses
+        for p in result.degraded_periods
+    ), f"Injected degraded period of {target} not detected"
+    assert any(s.database == target and s.latency_ms >= 10_000 for s in result.spikes), \
+        f"Injected latency spike of {target} not detected"
+
+    print(f"✓ Database health sampling test passed ({', '.join(databases)})")
+
 
-    start_time = time.time()
-    for i in range(num_requests):
-        request_start = time.time()
-        entities = api_client.list_entities(org_id=config.test_org_id, limit=5)
-        request_duration = time.time() - request_start
-        results.append(request_duration)
+@pytest.mark.api
+def test_database_time_attribution(
+    api_client: DataKwipAPIClient, config, db_stats_sampler, request
+):
+    """Test that /entity time is attributed to database statements via pg_stat_statements."""
+    if db_stats_sampler is None:
+        pytest.skip("DB_STATS not enabled (needs DATABASE_URL and pg_stat_statements)")
+    # /entity only queries the database for orgs the user is linked to
+    request.getfixturevalue("db_test_user")
+
+    # Token fetch stays out of the window
+    api_client.list_entities(org_id=config.test_org_id, limit=1)
+
+    before = db_stats_sampler.snapshot()
+    entities = api_client.list_entities(org_id=config.test_org_id, limit=config.test_entity_limit)
+    db_time = db_stats_sampler.diff(before, db_stats_sampler.snapshot())
+
+    assert isinstance(entities, list), "Response should be a list"
+    assert db_time.calls > 0, \
+        "No statements recorded for /entity (does the API use this database and DB_STATS_ROLE?)"
+
+    print(f"✓ Database time attribution test passed")
+    print(f"  {db_time.format(config.db_stats_top)}")
 
-    total_duration = time.time() - start_time
 
-    # Calculate stats
-    avg_duration = sum(results) / len(results)
-    max_duration = max(results)
-    min_duration = min(results)
+@pytest.mark.api
+@pytest.mark.slow
+def test_api_stress(api_client: DataKwipAPIClient, config):
+    """Stress test: open-loop entity listing at a constant arrival rate."""
+    profile = LoadProfile(
+        target_rate=config.stress_rate,
+        steady=config.stress_duration,
+        ramp_up=config.stress_ramp,
+        ramp_down=config.stress_ramp,
+        workers=config.stress_workers,
+    )
+    operations = [
+        LoadOperation(
+            name="list_entities",
+            func=lambda: api_client.list_entities(org_id=config.test_org_id, limit=5),
+        ),
+    ]
+
+    result = run_load(operations, profile)
+    steady = result.phase("steady")
 
     # All requests should succeed
-    assert len(results) == num_requests, "All requests should succeed"
+    assert steady.errors == 0, f"{steady.errors} requests failed: {result.error_samples}"
+
+    # Service should keep up with the arrival rate (no growing backlog)
+    assert steady.achieved_rate >= steady.target_rate * 0.9, \
+        f"Achieved {steady.achieved_rate:.1f}/s of {steady.target_rate:.1f}/s target"
 
-    # Average should be reasonable
-    assert avg_duration < 1.0, f"Average request time should be < 1s, got {avg_duration:.2f}s"
+    # Average (from scheduled send time, including queueing) should be reasonable
+    assert steady.latency.mean < 1000, \
+        f"Average request time should be < 1s, got {steady.latency.mean:.0f}ms"
 
     print(f"✓ API stress test passed")
-    print(f"  {num_requests} requests in {total_duration:.2f}s")
-    print(f"  Avg: {avg_duration*1000:.0f}ms, Min: {min_duration*1000:.0f}ms, Max: {max_duration*1000:.0f}ms")
+    print(result.summary())
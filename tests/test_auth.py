@@ -2,7 +2,8 @@
 
 import pytest
 
-from clients import KeycloakAdminClient
+from clients import AsyncKeycloakAdminClient, KeycloakAdminClient
+from fixtures.token_bench import GRANTS, PASSWORD, TokenEndpointBenchmark, format_report
 
 
 @pytest.mark.auth
@@ -122,3 +123,93 @@ def test_keycloak_list_users(auth_client: KeycloakAdminClient):
     print(f"  Total users (max 10): {len(users)}")
     if users:
         print(f"  Sample user: {users[0].get('username', 'N/A')}")
+
+
+@pytest.mark.auth
+async def test_keycloak_realm_audit(async_auth_client: AsyncKeycloakAdminClient, config):
+    """Test concurrent realm audit (realm, client, user and role mappings)."""
+    await async_auth_client.connect()
+
+    audit = await async_auth_client.realm_audit(
+        client_id=config.functional_tests_client_id,
+        username=config.functional_test_user_email,
+    )
+
+    # Verify audit results
+    assert audit.realm.get("realm") == config.keycloak_realm, "Realm name should match"
+    assert audit.realm_enabled, "Realm should be enabled"
+    assert audit.client is not None, f"Client '{config.functional_tests_client_id}' should exist"
+    assert audit.user is not None, f"Test user '{config.functional_test_user_email}' should exist"
+    assert audit.role_mappings is not None, "Test user should have role mappings"
+
+    realm_roles = [r.get("name") for r in audit.role_mappings.get("realmMappings", [])]
+
+    print(f"✓ Keycloak realm audit test passed ({audit.duration*1000:.0f}ms)")
+    print(f"  Realm: {audit.realm.get('realm')}")
+    print(f"  Client: {audit.client.get('clientId')}")
+    print(f"  User: {audit.user.get('username')}")
+    print(f"  Realm roles: {', '.join(realm_roles) or 'none'}")
+
+
+@pytest.mark.auth
+@pytest.mark.slow
+def test_keycloak_iter_users(auth_client: KeycloakAdminClient, config):
+    """Test streaming user enumeration across all pages."""
+    auth_client.connect()
+
+    # Count-only fast path, before and after in case other runs change the shared realm
+    count_before = auth_client.count_users()
+
+    # Small pages force several prefetched requests
+    ids = []
+    test_user_found = False
+    for user in auth_client.iter_users(page_size=25, brief_representation=True):
+        ids.append(user.get("id"))
+        if user.get("email") == config.functional_test_user_email:
+            test_user_found = True
+
+    count_after = auth_client.count_users()
+
+    # Every user is visited exactly once: no page overlaps (duplicates) or gaps
+    duplicates = len(ids) - len(set(ids))
+    assert not duplicates, f"{duplicates} users enumerated more than once"
+    # Exact unless the realm changed meanwhile
+    low, high = sorted((count_before, count_after))
+    assert low <= len(ids) <= high, \
+        f"Enumerated {len(ids)} users but realm reports {count_before} (then {count_after})"
+    assert test_user_found, "Test user should be found during enumeration"
+
+    print(f"✓ Keycloak user enumeration test passed")
+    changed = f" → {count_after}" if count_after != count_before else ""
+    print(f"  Users counted: {count_before}{changed}")
+    print(f"  Users enumerated: {len(ids)}")
+
+
+@pytest.mark.auth
+@pytest.mark.slow
+def test_token_endpoint_throughput(config):
+    """Test that the token endpoint serves every grant type under concurrent logins."""
+    with TokenEndpointBenchmark(
+        token_url=config.oauth2_token_url,
+        client_id=config.functional_tests_client_id,
+        client_secret=config.functional_tests_client_secret,
+        username=config.functional_test_user_email,
+        password=config.functional_test_user_password,
+        timeout=config.auth_timeout,
+    ) as bench:
+        unavailable = bench.unavailable(GRANTS)
+        assert PASSWORD not in unavailable, f"Password grant failed: {unavailable.get(PASSWORD)}"
+        for grant, error in unavailable.items():
+            print(f"  ✗ {grant} left out: {error}")
+
+        grants = [grant for grant in GRANTS if grant not in unavailable]
+        results = bench.run(grants, config.token_bench_levels, config.token_bench_duration)
+
+    print(f"\n{format_report(results)}")
+    assert len(results) == len(grants) * len(config.token_bench_levels)
+    for r in results:
+        assert r.throughput > 0, f"{r.grant} at concurrency {r.concurrency}: no tokens issued"
+        assert not r.errors, \
+            f"{r.grant} at concurrency {r.concurrency}: {r.error_kinds} ({r.error_samples[:1]})"
+
+    print(f"✓ Token endpoint throughput test passed ({', '.join(grants)})")
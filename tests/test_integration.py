@@ -1,15 +1,32 @@
 """Full integration test suite."""
 
+import asyncio
+import contextlib
 import time
+from typing import List
+
 import pytest
 
 from clients import (
+    AsyncKeycloakAdminClient,
     DataKwipAPIClient,
     DataKwipMCPClient,
     DataKwipUIClient,
-    KeycloakAdminClient,
     UITestError,
 )
+from fixtures.freshness import DatabaseMarkerWriter, FreshnessProbe, MarkerPoint
+from fixtures.ground_truth import (
+    ENTITIES,
+    GroundTruthVerifier,
+    StreamDigest,
+    api_fetchers,
+    format_report,
+    mcp_fetchers,
+    verify,
+)
+from fixtures.org_sweep import OrgSweep, api_checks, mcp_checks
+from fixtures.org_sweep import format_report as format_sweep_report
+from fixtures.stages import Stage, format_summary, run_stages
 
 
 @pytest.mark.integration
@@ -18,67 +35,63 @@ def test_full_integration_suite(
     api_client: DataKwipAPIClient,
     mcp_client: DataKwipMCPClient,
     ui_client: DataKwipUIClient,
-    auth_client: KeycloakAdminClient,
     config,
+    latency_recorder,
 ):
-    """Run complete integration test suite in sequence.
+    """Run complete integration test suite.
 
     Tests all major components:
     1. Keycloak authentication
     2. API endpoints
     3. MCP tools
-    4. UI automation
+    4. UI automation (after Keycloak, since login goes through it)
 
-    This test provides a comprehensive validation of the entire platform.
+    Stages 1-3 are independent and run concurrently; the UI stage runs on
+    this thread (Playwright is thread-bound) once Keycloak has passed, and is
+    cancelled if it fails. This test provides a comprehensive validation of
+    the entire platform.
     """
     print("\n" + "=" * 80)
     print("DATAKWIP PLATFORM FUNCTIONAL TEST SUITE")
     print("=" * 80)
 
-    overall_start = time.time()
-    stage_results = []
-
     # =========================================================================
     # STAGE 1: Keycloak Authentication
     # =========================================================================
-    print("\n[1/4] Testing Keycloak Authentication...")
-    stage_start = time.time()
+    def keycloak_stage() -> List[str]:
+        # Audit realm, client and user concurrently (one admin round trip)
+        async def _audit_realm():
+            async with AsyncKeycloakAdminClient(
+                server_url=config.keycloak_base_url,
+                realm_name=config.keycloak_realm,
+                admin_username=config.keycloak_admin,
+                admin_password=config.keycloak_admin_password,
+                verify=False,  # Allow self-signed certs in dev
+                timeout=config.auth_timeout,
+            ) as admin:
+                return await admin.realm_audit(
+                    client_id=config.functional_tests_client_id,
+                    username=config.functional_test_user_email,
+                )
 
-    try:
-        # Connect to Keycloak admin API
-        auth_client.connect()
-        assert auth_client.verify_connection(), "Keycloak connection failed"
+        audit = asyncio.run(_audit_realm())
 
         # Verify realm configuration
-        realm_info = auth_client.get_realm_info()
-        assert realm_info.get("realm") == config.keycloak_realm
-        assert realm_info.get("enabled") is True
+        assert audit.realm.get("realm") == config.keycloak_realm, "Keycloak connection failed"
+        assert audit.realm_enabled
 
         # Verify functional-tests client exists
-        assert auth_client.verify_client_exists(config.functional_tests_client_id), \
-            "functional-tests client not found"
+        assert audit.client is not None, "functional-tests client not found"
 
         # Verify test user exists
-        assert auth_client.verify_user_exists(config.functional_test_user_email), \
-            "Test user not found"
-
-        stage_duration = time.time() - stage_start
-        stage_results.append(("Keycloak Auth", True, stage_duration))
-        print(f"✓ Keycloak authentication tests passed ({stage_duration:.2f}s)")
+        assert audit.user is not None, "Test user not found"
 
-    except Exception as e:
-        stage_duration = time.time() - stage_start
-        stage_results.append(("Keycloak Auth", False, stage_duration))
-        print(f"✗ Keycloak authentication tests failed: {e}")
-        pytest.fail(f"Stage 1 failed: {e}")
+        return [f"Realm: {config.keycloak_realm}"]
 
     # =========================================================================
     # STAGE 2: API Endpoints
     # =========================================================================
-    print("\n[2/4] Testing API Endpoints...")
-    stage_start = time.time()
-
-    try:
+    def api_stage() -> List[str]:
         # Test database health (no auth)
         health = api_client.get_database_health()
         assert isinstance(health, dict), "Invalid health response"
@@ -91,25 +104,12 @@ def test_full_integration_suite(
         tags = api_client.list_entity_tags(org_id=config.test_org_id, limit=10)
         assert isinstance(tags, list), "Invalid tags response"
 
-        stage_duration = time.time() - stage_start
-        stage_results.append(("API Endpoints", True, stage_duration))
-        print(f"✓ API endpoint tests passed ({stage_duration:.2f}s)")
-        print(f"  - Retrieved {len(entities)} entities")
-        print(f"  - Retrieved {len(tags)} tags")
-
-    except Exception as e:
-        stage_duration = time.time() - stage_start
-        stage_results.append(("API Endpoints", False, stage_duration))
-        print(f"✗ API endpoint tests failed: {e}")
-        pytest.fail(f"Stage 2 failed: {e}")
+        return [f"Retrieved {len(entities)} entities", f"Retrieved {len(tags)} tags"]
 
     # =========================================================================
     # STAGE 3: MCP Tools
     # =========================================================================
-    print("\n[3/4] Testing MCP Tools...")
-    stage_start = time.time()
-
-    try:
+    def mcp_stage() -> List[str]:
         # List available tools
         tools = mcp_client.list_tools()
         assert isinstance(tools, list), "Invalid tools response"
@@ -132,30 +132,19 @@ def test_full_integration_suite(
                 )
                 assert isinstance(values, list), "Invalid MCP values response"
 
-        stage_duration = time.time() - stage_start
-        stage_results.append(("MCP Tools", True, stage_duration))
-        print(f"✓ MCP tool tests passed ({stage_duration:.2f}s)")
-        print(f"  - Available tools: {len(tools)}")
-        print(f"  - Retrieved {len(mcp_entities)} entities via MCP")
-
-    except Exception as e:
-        stage_duration = time.time() - stage_start
-        stage_results.append(("MCP Tools", False, stage_duration))
-        print(f"✗ MCP tool tests failed: {e}")
-        pytest.fail(f"Stage 3 failed: {e}")
+        return [f"Available tools: {len(tools)}", f"Retrieved {len(mcp_entities)} entities via MCP"]
 
     # =========================================================================
     # STAGE 4: UI Automation
     # =========================================================================
-    print("\n[4/4] Testing UI Automation...")
-    stage_start = time.time()
-
-    try:
+    def ui_stage() -> List[str]:
         # Start browser
         ui_client.start()
 
         # Test login
-        login_success = ui_client.login()
+        login_start = time.perf_counter()
+        login_success = ui_client.login(reuse_session=False)
+        latency_recorder.record("ui_login", time.perf_counter() - login_start)
         assert login_success, "UI login failed"
 
         # Verify we're logged in
@@ -173,45 +162,55 @@ def test_full_integration_suite(
         except UITestError:
             data_explorer_available = False
 
-        stage_duration = time.time() - stage_start
-        stage_results.append(("UI Automation", True, stage_duration))
-        print(f"✓ UI automation tests passed ({stage_duration:.2f}s)")
-        print(f"  - Login: ✓")
-        print(f"  - Page title: {title}")
-        print(f"  - Data Explorer: {'✓' if data_explorer_available else 'Not available'}")
+        return [
+            "Login: ✓",
+            f"Page title: {title}",
+            f"Data Explorer: {'✓' if data_explorer_available else 'Not available'}",
+        ]
 
-    except Exception as e:
-        stage_duration = time.time() - stage_start
-        stage_results.append(("UI Automation", False, stage_duration))
-        print(f"✗ UI automation tests failed: {e}")
-        pytest.fail(f"Stage 4 failed: {e}")
+    stages = [
+        Stage(name="Keycloak Auth", func=keycloak_stage),
+        Stage(name="API Endpoints", func=api_stage),
+        Stage(name="MCP Tools", func=mcp_stage),
+        Stage(name="UI Automation", func=ui_stage, depends_on=["Keycloak Auth"], inline=True),
+    ]
+
+    overall_start = time.time()
+    print(f"\nRunning {len(stages)} stages (independent stages concurrently)...")
+    results = run_stages(stages)
+    overall_duration = time.time() - overall_start
+
+    # Stage details, in declaration order
+    for index, result in enumerate(results, start=1):
+        print(f"\n[{index}/{len(results)}] {result.name}")
+        if result.passed:
+            latency_recorder.record(f"stage: {result.name}", result.duration)
+            print(f"✓ {result.name} passed ({result.duration:.2f}s)")
+            for detail in result.result or []:
+                print(f"  - {detail}")
+        else:
+            print(f"✗ {result.name} {result.status}: {result.error}")
 
     # =========================================================================
     # SUMMARY
     # =========================================================================
-    overall_duration = time.time() - overall_start
-
     print("\n" + "=" * 80)
     print("TEST SUITE SUMMARY")
     print("=" * 80)
-
-    for stage_name, success, duration in stage_results:
-        status = "✓ PASS" if success else "✗ FAIL"
-        print(f"{status:<8} {stage_name:<20} {duration:>6.2f}s")
-
-    print("-" * 80)
-    print(f"Total execution time: {overall_duration:.2f}s")
+    print(format_summary(results, overall_duration))
 
     # All stages must pass
-    all_passed = all(result[1] for result in stage_results)
-    if all_passed:
+    failures = [result for result in results if not result.passed]
+    if not failures:
         print("\n🎉 ALL TESTS PASSED!")
     else:
         print("\n❌ SOME TESTS FAILED")
 
     print("=" * 80 + "\n")
 
-    assert all_passed, "Not all stages passed"
+    assert not failures, "Not all stages passed: " + "; ".join(
+        f"{result.name} {result.status}: {result.error}" for result in failures
+    )
 
 
 @pytest.mark.integration
@@ -250,6 +249,7 @@ def test_end_to_end_data_flow(
     api_client: DataKwipAPIClient,
     mcp_client: DataKwipMCPClient,
     config,
+    ground_truth,
 ):
     """Test complete data flow: Database → API → MCP."""
     print("\nTesting end-to-end data flow...")
@@ -276,4 +276,171 @@ def test_end_to_end_data_flow(
         assert "org_id" in entity, "Entity missing org_id"
         print(f"  ✓ Entity structure is valid")
 
+    # Step 5: Compare every entity and tag with the database
+    if ground_truth is None:
+        print("  - Database contents not verified (DATABASE_URL not set)")
+    else:
+        verifier = GroundTruthVerifier(
+            ground_truth,
+            {"api": api_fetchers(api_client), "mcp": mcp_fetchers(mcp_client)},
+            page_size=config.ground_truth_page_size,
+        )
+        results = verifier.verify_org(config.test_org_id)
+        report = format_report(results)
+        assert all(r.matches for r in results), f"API/MCP data differs from the database:\n{report}"
+        print(f"  ✓ API and MCP match the database\n{report}")
+
     print("✓ End-to-end data flow test passed")
+
+
+@pytest.mark.integration
+def test_ground_truth_drill_down(api_client: DataKwipAPIClient, config, fake_stack):
+    """Test that digest drill-down pinpoints the rows where a source differs from the database."""
+    if fake_stack is None:
+        pytest.skip("Needs --fake-stack (differences are injected into the ground truth)")
+
+    dataset = fake_stack.dataset
+    entities = dataset.entities(config.test_org_id, 3)
+    dropped, renamed = entities[0]["id"], entities[1]["id"]
+    extra = dict(entities[2], id=10**9, key="ground-truth-only")
+
+    # Database as the API should have served it: one row gone, one renamed, one added
+    truth_rows = [
+        dict(row, name="Renamed") if row["id"] == renamed else row
+        for row in dataset.entities(config.test_org_id, fake_stack.config.entities_per_org)
+        if row["id"] != dropped
+    ] + [extra]
+
+    def truth_page(org_id: int, limit: int, offset: int):
+        return truth_rows[offset:offset + limit]
+
+    api_entities = api_fetchers(api_client)[ENTITIES]
+    result = verify(
+        StreamDigest(ENTITIES, truth_page, config.test_org_id),
+        StreamDigest(ENTITIES, api_entities, config.test_org_id, page_size=100),
+        org_id=config.test_org_id,
+        kind=ENTITIES,
+        source="api",
+    )
+
+    problems = {d.key: d.problem for d in result.discrepancies}
+    assert not result.matches
+    assert problems == {dropped: "unexpected", renamed: "changed", extra["id"]: "missing"}, problems
+    assert result.buckets_checked < 4096, "Drill-down should compare only mismatched groups"
+
+    print(f"✓ Ground-truth drill-down found {len(problems)} rows "
+          f"({result.buckets_checked} buckets compared)")
+
+
+@pytest.mark.integration
+def test_data_freshness(
+    api_client: DataKwipAPIClient,
+    mcp_client: DataKwipMCPClient,
+    config,
+    fake_stack,
+    latency_recorder,
+):
+    """Test that points written to TimescaleDB become current values in MCP and the API."""
+    entities = api_client.list_entities(org_id=config.test_org_id, limit=1)
+    if not entities:
+        pytest.skip("No entities available for freshness markers")
+
+    with contextlib.ExitStack() as stack:
+        if fake_stack is not None:
+            dataset = fake_stack.dataset
+
+            def write(marker: MarkerPoint):
+                dataset.write_value(marker.entity_id, marker.timestamp, marker.value, marker.unit)
+
+        elif config.database_url:
+            write = stack.enter_context(DatabaseMarkerWriter(config.database_url))
+        else:
+            pytest.skip("DATABASE_URL not set")
+
+        probe = stack.enter_context(FreshnessProbe(
+            write,
+            {
+                "mcp": lambda m: mcp_client.get_current_values([m.entity_id], org_id=m.org_id),
+                "api": lambda m: api_client.get_current_values([m.entity_id], org_id=m.org_id),
+            },
+            entity_id=entities[0]["id"],
+            org_id=config.test_org_id,
+            timeout=config.freshness_timeout,
+            recorder=latency_recorder,
+        ))
+        unavailable = probe.drop_unavailable()
+        assert "mcp" not in unavailable, f"MCP get_current_values failed: {unavailable.get('mcp')}"
+        for name, error in unavailable.items():
+            print(f"  ✗ {name} left out: {error}")
+
+        probe.run(config.freshness_samples, interval=config.freshness_interval)
+
+    print(f"\n{probe.report()}")
+    for name in probe.sources:
+        timeouts = probe.timeouts(name)
+        assert not timeouts, \
+            f"{name}: {timeouts} markers not visible within {config.freshness_timeout:g}s"
+        violations = latency_recorder.violations(
+            f"freshness_{name}", config.latency_budgets.get(f"freshness_{name}")
+        )
+        assert not violations, f"{name} data freshness over budget: {', '.join(violations)}"
+
+    print(f"✓ Data freshness test passed ({', '.join(probe.sources)})")
+
+
+@pytest.mark.integration
+def test_org_sweep(
+    api_client: DataKwipAPIClient,
+    mcp_client: DataKwipMCPClient,
+    config,
+    fake_stack,
+    latency_recorder,
+    request,
+):
+    """Test that every organization is served within the latency budgets, not just the test org."""
+    if fake_stack is not None:
+        orgs = fake_stack.dataset.orgs()
+    elif config.database_url:
+        from fixtures import database
+
+        # The test org must be swept, so the user has to be linked to it
+        request.getfixturevalue("db_test_user")
+        conn = database.connect(config.database_url)
+        try:
+            orgs = database.list_orgs(conn)
+        finally:
+            conn.close()
+    else:
+        pytest.skip("DATABASE_URL not set (organizations are listed from core.org)")
+
+    sweep = OrgSweep(
+        {**api_checks(api_client, limit=config.test_entity_limit), **mcp_checks(mcp_client)},
+        samples=config.sweep_samples,
+        workers=config.sweep_workers,
+        budgets=config.latency_budgets,
+        recorder=latency_recorder,
+    )
+    if fake_stack is not None:
+        # The fake stack does not enforce org membership; deny one org as a real deployment would
+        fake_stack.inject_failures("api", 1, status=403)
+    results = sweep.run(orgs)
+
+    print(f"\n{format_sweep_report(results)}")
+    assert len(results) == len(orgs)
+    skipped = [r for r in results if r.skipped]
+    if fake_stack is not None:
+        assert len(skipped) == 1, f"Expected the denied org to be skipped, got {len(skipped)}"
+        assert not skipped[0].checks, "A skipped org must not contribute latencies"
+    else:
+        test_org = next((r for r in results if r.org_id == config.test_org_id), None)
+        reason = test_org.unauthorized if test_org else "not listed"
+        assert test_org is not None and not test_org.skipped, \
+            f"Test org {config.test_org_id} was not swept: {reason}"
+
+    failed = [r for r in results if not r.ok]
+    assert not failed, "Organizations failing the sweep: " + "; ".join(
+        f"org {r.org_id}: {', '.join(r.error_samples + r.violations)}" for r in failed
+    )
+
+    print(f"✓ Org sweep passed ({len(results) - len(skipped)} organizations swept, "
+          f"{len(skipped)} skipped as unauthorized, {config.sweep_workers} at a time)")
@@ -1,17 +1,23 @@
 """MCP tool functional tests."""
 
+import gzip
+import json
 import time
 import pytest
 
-from clients import DataKwipMCPClient, MCPError
+from clients import Cassette, CassetteMissError, DataKwipMCPClient, MCPError, TransportFactory
+from fixtures.load import LoadOperation, LoadProfile, run_load
 
 
 @pytest.mark.mcp
-def test_list_mcp_tools(mcp_client: DataKwipMCPClient):
+def test_list_mcp_tools(mcp_client: DataKwipMCPClient, config, latency_recorder):
     """Test listing available MCP tools."""
-    start_time = time.time()
-    tools = mcp_client.list_tools()
-    duration = time.time() - start_time
+    tools = latency_recorder.measure(
+        "list_tools",
+        mcp_client.list_tools,
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
+    )
 
     # Verify response structure
     assert isinstance(tools, list), "Tools response should be a list"
@@ -22,43 +28,52 @@ def test_list_mcp_tools(mcp_client: DataKwipMCPClient):
     assert "query_entities" in tool_names, "Should have query_entities tool"
     assert "get_current_values" in tool_names, "Should have get_current_values tool"
 
-    # Verify response time
-    assert duration < 1.0, f"Tool listing should be < 1s, got {duration:.2f}s"
+    # Verify response time percentiles
+    violations = latency_recorder.violations("list_tools", config.latency_budgets.get("list_tools"))
+    assert not violations, f"Tool listing over budget: {', '.join(violations)}"
 
-    print(f"✓ MCP tool listing passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("list_tools")
+    print(f"✓ MCP tool listing passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)")
     print(f"  Available tools: {', '.join(tool_names)}")
 
 
 @pytest.mark.mcp
-def test_query_entities_mcp(mcp_client: DataKwipMCPClient, config):
+def test_query_entities_mcp(mcp_client: DataKwipMCPClient, config, latency_recorder):
     """Test query_entities MCP tool."""
-    start_time = time.time()
-    entities = mcp_client.query_entities(
-        org_id=config.test_org_id,
-        limit=config.test_entity_limit,
+    entities = latency_recorder.measure(
+        "query_entities",
+        lambda: mcp_client.query_entities(
+            org_id=config.test_org_id,
+            limit=config.test_entity_limit,
+        ),
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
     )
-    duration = time.time() - start_time
 
     # Verify response structure
     assert isinstance(entities, list), "Entities response should be a list"
     assert len(entities) <= config.test_entity_limit, "Should respect limit parameter"
 
-    # Verify response time
-    assert duration < 0.5, f"Query entities should be < 500ms, got {duration*1000:.0f}ms"
+    # Verify response time percentiles
+    violations = latency_recorder.violations(
+        "query_entities", config.latency_budgets.get("query_entities")
+    )
+    assert not violations, f"Query entities over budget: {', '.join(violations)}"
 
     # Verify entity structure (if data exists)
     if entities:
         entity = entities[0]
         assert "id" in entity or "key" in entity, "Entity should have id or key"
 
-    print(f"✓ Query entities MCP tool passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("query_entities")
+    print(f"✓ Query entities MCP tool passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)")
     print(f"  Retrieved {len(entities)} entities via MCP")
     if entities:
         print(f"  First entity: {entity.get('key', 'N/A')} - {entity.get('name', 'N/A')}")
 
 
 @pytest.mark.mcp
-def test_get_current_values_mcp(mcp_client: DataKwipMCPClient, config):
+def test_get_current_values_mcp(mcp_client: DataKwipMCPClient, config, latency_recorder):
     """Test get_current_values MCP tool."""
     # First get some entities to query values for
     entities = mcp_client.query_entities(org_id=config.test_org_id, limit=3)
@@ -71,17 +86,26 @@ def test_get_current_values_mcp(mcp_client: DataKwipMCPClient, config):
     if not entity_ids:
         pytest.skip("No entity IDs found for value query test")
 
-    start_time = time.time()
-    values = mcp_client.get_current_values(entity_ids=entity_ids, org_id=config.test_org_id)
-    duration = time.time() - start_time
+    values = latency_recorder.measure(
+        "get_current_values",
+        lambda: mcp_client.get_current_values(entity_ids=entity_ids, org_id=config.test_org_id),
+        samples=config.latency_samples,
+        warmup=config.latency_warmup,
+    )
 
     # Verify response structure
     assert isinstance(values, list), "Values response should be a list"
 
-    # Verify response time
-    assert duration < 1.0, f"Get current values should be < 1s, got {duration:.2f}s"
+    # Verify response time percentiles
+    violations = latency_recorder.violations(
+        "get_current_values", config.latency_budgets.get("get_current_values")
+    )
+    assert not violations, f"Get current values over budget: {', '.join(violations)}"
 
-    print(f"✓ Get current values MCP tool passed ({duration*1000:.0f}ms)")
+    latency = latency_recorder.summary("get_current_values")
+    print(
+        f"✓ Get current values MCP tool passed (p50 {latency.p50:.0f}ms, p95 {latency.p95:.0f}ms)"
+    )
     print(f"  Queried {len(entity_ids)} entities")
     print(f"  Retrieved {len(values)} current values")
     if values:
@@ -150,3 +174,66 @@ def test_mcp_pagination(mcp_client: DataKwipMCPClient, config):
     print(f"✓ MCP pagination test passed")
     print(f"  Page 1: {len(page1)} entities")
     print(f"  Page 2: {len(page2)} entities")
+
+
+@pytest.mark.mcp
+def test_mcp_cassette_record_replay(request, config, tmp_path):
+    """Test that recorded JSON-RPC exchanges replay offline, whatever the request ids."""
+    if request.config.getoption("--replay-cassette"):
+        pytest.skip("Records against the live services")
+
+    path = tmp_path / "mcp.json.gz"
+    recorder = Cassette(path, mode="record")
+    recording = TransportFactory(cassette=recorder)
+    with DataKwipMCPClient(config.railway_mcp_url, transport_factory=recording) as client:
+        recorded_entities = client.query_entities(org_id=config.test_org_id, limit=2)
+        recorded_tools = client.list_tools()
+    recorder.save()
+
+    # Stored responses carry no request ids
+    bodies = json.load(gzip.open(path, "rt"))["bodies"]
+    assert all(json.loads(body).get("id") is None for body in bodies)
+
+    # Replayed in a different order, so request ids differ from the recording
+    replay = Cassette(path, mode="replay")
+    replaying = TransportFactory(cassette=replay)
+    with DataKwipMCPClient(config.railway_mcp_url, transport_factory=replaying) as client:
+        assert client.list_tools() == recorded_tools
+        assert client.query_entities(org_id=config.test_org_id, limit=2) == recorded_entities
+        with pytest.raises(CassetteMissError):
+            client.query_entities(org_id=config.test_org_id, limit=3)
+
+    print(f"✓ {len(replay)} MCP exchanges replayed from {path.stat().st_size} bytes")
+
+
+@pytest.mark.mcp
+@pytest.mark.slow
+def test_mcp_stress(mcp_client: DataKwipMCPClient, config):
+    """Stress test: open-loop MCP tool calls at a constant arrival rate."""
+    profile = LoadProfile(
+        target_rate=config.stress_rate,
+        steady=config.stress_duration,
+        ramp_up=config.stress_ramp,
+        ramp_down=config.stress_ramp,
+        workers=config.stress_workers,
+    )
+    operations = [
+        LoadOperation(
+            name="query_entities",
+            func=lambda: mcp_client.query_entities(org_id=config.test_org_id, limit=5),
+            weight=3,
+        ),
+        LoadOperation(name="list_tools", func=mcp_client.list_tools, weight=1),
+    ]
+
+    result = run_load(operations, profile)
+    steady = result.phase("steady")
+
+    assert steady.errors == 0, f"{steady.errors} requests failed: {result.error_samples}"
+    assert steady.achieved_rate >= steady.target_rate * 0.9, \
+        f"Achieved {steady.achieved_rate:.1f}/s of {steady.target_rate:.1f}/s target"
+    assert steady.latency.mean < 1000, \
+        f"Average tool call time should be < 1s, got {steady.latency.mean:.0f}ms"
+
+    print(f"✓ MCP stress test passed")
+    print(result.summary())
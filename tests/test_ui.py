@@ -1,18 +1,22 @@
 """UI automation functional tests."""
 
+import time
 import pytest
 
 from clients import DataKwipUIClient, UITestError
 
 
 @pytest.mark.ui
-def test_ui_login(ui_client: DataKwipUIClient):
+def test_ui_login(ui_client: DataKwipUIClient, latency_recorder):
     """Test UI login flow via Keycloak."""
     # Start browser
     ui_client.start()
 
-    # Perform login
-    success = ui_client.login()
+    # Perform login through the form (timed for the benchmark history)
+    start_time = time.perf_counter()
+    success = ui_client.login(reuse_session=False)
+    duration = time.perf_counter() - start_time
+    latency_recorder.record("ui_login", duration)
 
     assert success, "Login should succeed"
 
@@ -20,7 +24,7 @@ def test_ui_login(ui_client: DataKwipUIClient):
     current_url = ui_client.get_current_url()
     assert "realms/datakwip" not in current_url, "Should not be on Keycloak login page"
 
-    print(f"✓ UI login test passed")
+    print(f"✓ UI login test passed ({duration*1000:.0f}ms)")
     print(f"  Logged in successfully")
     print(f"  Current URL: {current_url}")
 
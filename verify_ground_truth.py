@@ -0,0 +1,157 @@
+"""
+Verify API and MCP data against the database
+
+Computes per-org row counts and order-independent hashes of entities and
+tags inside Postgres (DATABASE_URL, pooled connections), streams the same
+rows from the API (entities, tags) and MCP (entities) page by page, and
+compares the digests. Where they differ, hash-partitioned buckets are
+compared until the differing rows are found; only those rows are fetched
+from the database.
+
+With --fake-stack the synthetic dataset of the local stand-in servers is
+the ground truth.
+
+Usage:
+    python verify_ground_truth.py
+    python verify_ground_truth.py --all-orgs --workers 8
+    python verify_ground_truth.py --fake-stack --all-orgs
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+from typing import Dict
+
+from dotenv import load_dotenv
+
+from clients import DataKwipAPIClient, DataKwipMCPClient, TransportFactory
+from fixtures import database
+from fixtures.fake_stack import FakeStack, FakeStackConfig
+from fixtures.ground_truth import (
+    ENTITIES,
+    TAGS,
+    GroundTruthVerifier,
+    api_fetchers,
+    database_truth,
+    format_report,
+    mcp_fetchers,
+    stream_truth,
+)
+
+# Load environment
+load_dotenv()
+
+
+def env_settings() -> Dict[str, str]:
+    """Client settings from the environment (same names as TestConfig)."""
+    names = [
+        "railway_api_url",
+        "railway_mcp_url",
+        "oauth2_token_url",
+        "functional_tests_client_id",
+        "functional_tests_client_secret",
+        "functional_test_user_email",
+        "functional_test_user_password",
+        "database_url",
+    ]
+    missing = [name.upper() for name in names if not os.getenv(name.upper())]
+    if missing:
+        raise RuntimeError(f"Missing environment variables: {', '.join(missing)}")
+    return {name: os.environ[name.upper()] for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify API/MCP data against the database")
+    parser.add_argument("--org-id", type=int, default=int(os.getenv("TEST_ORG_ID", "1")))
+    parser.add_argument(
+        "--all-orgs", action="store_true", help="Verify every organization in core.org"
+    )
+    parser.add_argument("--page-size", type=int, default=1000, help="Rows per API/MCP request")
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Concurrent checks (and pooled DB connections)"
+    )
+    parser.add_argument("--max-rows", type=int, default=10, help="Discrepancies printed per check")
+    parser.add_argument(
+        "--fake-stack", action="store_true", help="Run against local stand-in servers"
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        try:
+            if args.fake_stack:
+                # In-process, so its dataset can serve as the ground truth
+                fake_stack = stack.enter_context(FakeStack(FakeStackConfig()))
+                settings = fake_stack.settings()
+                dataset = fake_stack.dataset
+                truth = stream_truth(
+                    {ENTITIES: dataset.entities, TAGS: dataset.tags}, args.page_size
+                )
+                org_ids = list(range(1, fake_stack.config.orgs + 1))
+            else:
+                settings = env_settings()
+                pool = database.connection_pool(settings["database_url"], maxconn=args.workers)
+                stack.callback(pool.closeall)
+                truth = database_truth(pool)
+                with database.pooled(pool) as conn:
+                    org_ids = [org["id"] for org in database.list_orgs(conn)]
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+        if not args.all_orgs:
+            if args.org_id not in org_ids:
+                print(f"ERROR: Organization with id={args.org_id} does not exist")
+                sys.exit(1)
+            org_ids = [args.org_id]
+
+        transport_factory = TransportFactory()
+        api_client = stack.enter_context(
+            DataKwipAPIClient(
+                base_url=settings["railway_api_url"],
+                token_url=settings["oauth2_token_url"],
+                client_id=settings["functional_tests_client_id"],
+                client_secret=settings["functional_tests_client_secret"],
+                username=settings["functional_test_user_email"],
+                password=settings["functional_test_user_password"],
+                transport_factory=transport_factory,
+            )
+        )
+        mcp_client = stack.enter_context(
+            DataKwipMCPClient(
+                base_url=settings["railway_mcp_url"],
+                transport_factory=transport_factory,
+            )
+        )
+
+        print("=" * 70)
+        print(
+            f"Ground-truth verification: {len(org_ids)} org(s), "
+            f"{args.workers} workers, {args.page_size} rows/page"
+        )
+        print("=" * 70)
+
+        verifier = GroundTruthVerifier(
+            truth,
+            {"api": api_fetchers(api_client), "mcp": mcp_fetchers(mcp_client)},
+            page_size=args.page_size,
+            workers=args.workers,
+        )
+        try:
+            results = verifier.verify_orgs(org_ids)
+        except Exception as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+
+    print(format_report(results, max_rows=args.max_rows))
+    print("=" * 70)
+
+    mismatches = [r for r in results if not r.matches]
+    if mismatches:
+        print(f"✗ {len(mismatches)} of {len(results)} checks differ from the database")
+        sys.exit(1)
+    print(f"✓ All {len(results)} checks match the database")
+
+
+if __name__ == "__main__":
+    main()